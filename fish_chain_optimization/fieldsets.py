@@ -0,0 +1,102 @@
+"""
+Sparse fieldsets for the read endpoints.
+
+With ``?fields=id,name`` a read endpoint returns only the named fields, and
+the query behind it loads only the columns those fields need (``.only()``),
+so a dropdown asking for ids and names does not read or encode large TEXT
+columns such as descriptions, notes or coordinates. Without the parameter
+the responses are unchanged.
+
+Serializers opt in with SparseFieldsetSerializerMixin; generic views with
+SparseFieldsetViewMixin, function views by calling sparse_queryset.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+
+FIELDS_QUERY_PARAM = 'fields'
+
+FIELDS_PARAMETER = OpenApiParameter(
+    name=FIELDS_QUERY_PARAM,
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.QUERY,
+    required=False,
+    description='Daftar field yang dikembalikan, dipisahkan koma (mis. id,name); hanya kolom yang '
+                'dibutuhkan field tersebut yang dibaca dari database. Field yang tidak dikenal dijawab 400'
+)
+
+
+def requested_fields(request):
+    """Field names asked for with ?fields=, or None when the parameter is absent"""
+    if request is None or FIELDS_QUERY_PARAM not in request.query_params:
+        return None
+    return {name.strip() for name in request.query_params[FIELDS_QUERY_PARAM].split(',') if name.strip()}
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Limits the fields of a serializer to those of ?fields= in its request.
+
+    Only the top-level serializer (or the items of a top-level list) is
+    trimmed; a field name the serializer does not have is a validation
+    error, answered with 400.
+    """
+
+    def _is_root(self):
+        parent = self.parent  # type: ignore
+        return parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+
+    def get_fields(self):
+        fields = super().get_fields()  # type: ignore
+        requested = requested_fields(self.context.get('request'))  # type: ignore
+        if requested is None or not self._is_root():
+            return fields
+        unknown = requested - fields.keys()
+        if unknown:
+            raise serializers.ValidationError({
+                FIELDS_QUERY_PARAM: [f"Unknown field(s): {', '.join(sorted(unknown))}. Available: {', '.join(fields)}"]
+            })
+        return {name: field for name, field in fields.items() if name in requested}
+
+
+def sparse_queryset(queryset, serializer):
+    """
+    Load only the columns the (trimmed) fields of ``serializer`` read.
+
+    Fields following a relation (``source='species.name'``) load that
+    column of a select_related table too. A field whose source is not a
+    model field - a method or ``source='*'`` - needs the whole row, so
+    ``queryset`` is then returned as it is.
+    """
+    if requested_fields(serializer.context.get('request')) is None:
+        return queryset
+    model = queryset.model
+    related = queryset.query.select_related
+    load = {model._meta.pk.name}
+    for field in serializer.fields.values():
+        attrs = field.source_attrs
+        if not attrs or isinstance(field, serializers.SerializerMethodField):
+            return queryset
+        try:
+            model_field = model._meta.get_field(attrs[0])
+        except FieldDoesNotExist:
+            return queryset
+        if model_field.many_to_many or model_field.one_to_many:
+            continue
+        load.add(model_field.name)
+        if model_field.is_relation and len(attrs) > 1:
+            if not (isinstance(related, dict) and model_field.name in related):
+                return queryset
+            load.add('__'.join(attrs))
+    return queryset.only(*load)
+
+
+class SparseFieldsetViewMixin:
+    """Generic view mixin applying sparse_queryset to the queryset of GET requests"""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()  # type: ignore
+        if self.request.method == 'GET':  # type: ignore
+            queryset = sparse_queryset(queryset, self.get_serializer())  # type: ignore
+        return queryset
@@ -0,0 +1,200 @@
+"""
+Keyset (cursor) pagination for the list endpoints.
+
+Pages are selected with a WHERE clause on the ordering field and the primary
+key - ``(created_at, id) > (last created_at, last id)`` - instead of an
+OFFSET, so fetching page N reads the same number of rows from the
+``(field, id)`` index as fetching page 1, however large the table is. One
+row more than the page size is read to know whether there is a next page,
+so no ``COUNT(*)`` is run unless a client asks for it with ``?count=1``.
+
+Cursors are opaque: the ``next`` and ``previous`` links carry the position
+of the last/first row of the page as url-safe base64, which the client
+passes back unchanged. Null values of a nullable ordering field sort last
+in both directions.
+"""
+import base64
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+TRUE_FLAGS = ('1', 'true', 'yes')
+
+
+def get_max_page_size():
+    """Largest page a client may ask for with ?page_size, or None for no cap (API_MAX_PAGE_SIZE)"""
+    return getattr(settings, 'API_MAX_PAGE_SIZE', None)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pages ordered by one field with the primary key as tie-breaker.
+
+    The field is the ``ordering`` passed to the paginator, else the view's
+    ``keyset_ordering``, else ``created_at``; a leading ``-`` orders it
+    descending. ``?page_size`` picks the page size, capped by
+    API_MAX_PAGE_SIZE.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering=None):
+        self.ordering = ordering
+
+    # Request handling
+
+    def get_page_size(self, request):
+        page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE') or 50
+        requested = request.query_params.get(self.page_size_query_param)
+        if requested:
+            try:
+                page_size = int(requested)
+            except ValueError:
+                pass
+        max_page_size = get_max_page_size()
+        if max_page_size:
+            page_size = min(page_size, max_page_size)
+        return max(page_size, 1)
+
+    def decode_cursor(self, request):
+        """The ``(value, pk, forward)`` position of the requested cursor, or None for the first page"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            value, pk, forward = position['v'], position['k'], position['f']
+            if value is not None:
+                value = self.field.to_python(value)
+            return value, self.pk_field.to_python(pk), bool(forward)
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, item, forward):
+        value = getattr(item, self.field.attname)
+        position = {
+            'v': None if value is None else self.field.value_to_string(item),
+            'k': self.pk_field.value_to_string(item),
+            'f': int(forward),
+        }
+        encoded = base64.urlsafe_b64encode(json.dumps(position, separators=(',', ':')).encode('ascii'))
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded.decode('ascii'))
+
+    # Queries
+
+    def _order_by(self, queryset, forward):
+        """Order ``queryset`` for reading forward from a position, or backward (reversed order)"""
+        descending = self.descending != (not forward)
+        nulls = {'nulls_last': True} if forward else {'nulls_first': True}
+        field = F(self.field.name).desc(**nulls) if descending else F(self.field.name).asc(**nulls)
+        return queryset.order_by(field, '-pk' if descending else 'pk')
+
+    def _beyond(self, value, pk, forward):
+        """Rows after the position in the read direction; nulls come after every value"""
+        descending = self.descending != (not forward)
+        op = 'lt' if descending else 'gt'
+        name = self.field.name
+        if value is None:
+            if forward:
+                return Q(**{f'{name}__isnull': True, f'pk__{op}': pk})
+            return Q(**{f'{name}__isnull': False}) | Q(**{f'{name}__isnull': True, f'pk__{op}': pk})
+        beyond = Q(**{f'{name}__{op}': value}) | Q(**{name: value, f'pk__{op}': pk})
+        if forward and self.field.null:
+            beyond |= Q(**{f'{name}__isnull': True})
+        return beyond
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = self.ordering or getattr(view, 'keyset_ordering', None) or 'created_at'
+        self.descending = ordering.startswith('-')
+        model = queryset.model
+        self.field = model._meta.get_field(ordering.lstrip('-'))
+        self.pk_field = model._meta.pk
+        # A sparse fieldset (.only()) still loads the ordering field the cursors are built from
+        loaded, deferred = queryset.query.deferred_loading
+        if loaded and not deferred and self.field.name not in loaded:
+            queryset = queryset.only(*loaded, self.field.name)
+        self.request = request
+        self.base_url = remove_query_param(request.build_absolute_uri(), self.cursor_query_param)
+        self.page_size = self.get_page_size(request)
+        self.count = queryset.count() if request.query_params.get(self.count_query_param, '').lower() in TRUE_FLAGS \
+            else None
+
+        position = self.decode_cursor(request)
+        forward = position is None or position[2]
+        page_queryset = self._order_by(queryset, forward)
+        if position is not None:
+            page_queryset = page_queryset.filter(self._beyond(position[0], position[1], forward))
+        rows = list(page_queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if not forward:
+            rows.reverse()
+
+        self.has_next = has_more if forward else position is not None
+        self.has_previous = (position is not None) if forward else has_more
+        self.page = rows
+        return rows
+
+    # Responses
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], forward=True)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], forward=False)
+
+    def get_paginated_response(self, data):
+        body = {'next': self.get_next_link(), 'previous': self.get_previous_link()}
+        if self.count is not None:
+            body['count'] = self.count
+        body['results'] = data
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'count': {'type': 'integer', 'description': 'Hanya dengan ?count=1'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Kursor halaman dari tautan next/previous respons sebelumnya',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Jumlah data per halaman (dibatasi API_MAX_PAGE_SIZE)',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Jika bernilai 1/true, respons juga memuat jumlah seluruh data (count)',
+                'schema': {'type': 'boolean'},
+            },
+        ]
@@ -45,6 +45,7 @@ INSTALLED_APPS = [
     'ships',  # Ships management app
     'fishs', # Fish management app
     'regions', # Region management app
+    'imports', # Bulk import utilities
 ]
 
 AUTH_USER_MODEL = 'users.User'  # Custom user model
@@ -165,8 +166,48 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_PAGINATION_CLASS': 'fish_chain_optimization.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
 }
 
+# Largest page a list endpoint returns for ?page_size (None: no cap)
+API_MAX_PAGE_SIZE = 500
+
+# Rows read, validated and written per chunk by the CSV/Excel importers
+IMPORT_CHUNK_SIZE = 5000
+
+# Row errors returned in an import response; the full list is in the rejected-rows CSV
+IMPORT_ERROR_SAMPLE_SIZE = 100
+
+# Days a rejected-rows report is kept before the import worker deletes it
+IMPORT_REPORT_RETENTION_DAYS = 7
+
+# A running import job without progress for this long may be resumed from its checkpoint
+IMPORT_JOB_STALE_SECONDS = 600
+
+# Days the upload of a failed import job is kept for a resume; completed jobs delete theirs at once
+IMPORT_JOB_RETENTION_DAYS = 7
+
+# Largest accepted import upload; bigger uploads are refused with 413 before they are spooled
+IMPORT_MAX_UPLOAD_SIZE = 100 * 1024 * 1024
+
+# Largest uncompressed size of a zip import; the declared sizes and the bytes actually decompressed are both checked
+IMPORT_MAX_UNCOMPRESSED_SIZE = 1024 * 1024 * 1024
+
+# Processes parsing the sheets of a multi-sheet workbook or the files of a zip import (None: one per CPU)
+IMPORT_PARSE_PROCESSES = None
+
+# Parsed chunks a parser process may hold ahead of the import, per sheet or file being parsed
+IMPORT_PARSE_QUEUE_CHUNKS = 2
+
+# How imports write rows: 'orm' (bulk_create/bulk_update) or 'staging' (a staging
+# table merged with one INSERT ... SELECT; on MySQL this uses LOAD DATA LOCAL INFILE,
+# which needs 'OPTIONS': {'local_infile': 1} above and local_infile=ON on the server)
+IMPORT_BULK_LOADER = 'orm'
+
+# Rows read per query by the streaming exports
+EXPORT_CHUNK_SIZE = 2000
+
 from datetime import timedelta
 
 SIMPLE_JWT = {
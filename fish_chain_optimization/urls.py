@@ -30,6 +30,7 @@ urlpatterns = [
     path('api/ships/', include('ships.urls')),
     path('api/fishs/', include('fishs.urls')),
     path('api/regions/', include('regions.urls')),
+    path('api/imports/', include('imports.urls')),
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
 ]
\ No newline at end of file
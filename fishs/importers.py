@@ -0,0 +1,101 @@
+from imports.specs import ForeignKey, ImportSpec
+from imports.templates import ImportTemplate
+from .models import FishSpecies, Fish
+
+# Fields written by the species importer; name is the (case-insensitive) natural key
+FISH_SPECIES_IMPORT_FIELDS = ['scientific_name', 'description']
+
+# Fields written by the fish importer besides the species
+FISH_IMPORT_FIELDS = ['name', 'notes']
+
+# Accepted header spellings per column (case and spacing are ignored)
+FISH_SPECIES_IMPORT_COLUMNS = {
+    'name': ['nama', 'nama_jenis_ikan'],
+    'scientific_name': ['nama_ilmiah'],
+    'description': ['deskripsi'],
+}
+
+FISH_IMPORT_COLUMNS = {
+    'species_name': ['jenis_ikan', 'nama_jenis_ikan'],
+    'name': ['nama', 'nama_ikan'],
+    'notes': ['catatan'],
+}
+
+
+def summarize_fish_species_import(counts, dry_run):
+    """Response body of a fish species import"""
+    created_count = counts['created']
+    updated_count = counts['updated'] + counts['repeated']
+    if dry_run:
+        return {
+            'message': f'Dry run: {created_count} fish species would be created ({updated_count} updated), nothing was saved',
+            'dry_run': True,
+            'created_count': created_count,
+            'updated_count': updated_count,
+            'unchanged_count': counts['unchanged'],
+            'duplicate_count': counts['duplicates'] + counts['repeated'],
+        }
+    return {
+        'message': f"Successfully processed {counts['processed']} fish species ({created_count} created, {updated_count} updated)",
+        'created_count': created_count,
+        'updated_count': updated_count,
+        'unchanged_count': counts['unchanged'],
+    }
+
+
+def summarize_fish_import(counts, dry_run):
+    """Response body of a fish import; unknown species are added by the engine"""
+    if dry_run:
+        return {
+            'message': f"Dry run: {counts['created']} fish would be imported, nothing was saved",
+            'dry_run': True,
+            'created_count': counts['created'],
+        }
+    return {
+        'message': f"Successfully imported {counts['created']} fish",
+        'created_count': counts['created'],
+    }
+
+
+# Names are unique regardless of case, like FishSpeciesCreateSerializer;
+# existing species keep their stored name and only changed details are written
+FISH_SPECIES_IMPORT_SPEC = ImportSpec(
+    kind='fish_species',
+    model=FishSpecies,
+    columns=FISH_SPECIES_IMPORT_COLUMNS,
+    fields=FISH_SPECIES_IMPORT_FIELDS,
+    key='name',
+    key_iexact=True,
+    required=['name'],
+    summarize=summarize_fish_species_import,
+)
+
+# Fish have no natural key, every valid row creates a fish; species must already exist
+FISH_IMPORT_SPEC = ImportSpec(
+    kind='fish',
+    model=Fish,
+    columns=FISH_IMPORT_COLUMNS,
+    fields=FISH_IMPORT_FIELDS,
+    required=['species_name'],
+    foreign_keys=[
+        ForeignKey(
+            'species', 'species_name', FishSpecies, 'name',
+            missing_message="Fish species '{value}' does not exist", unknown_key='unknown_species'
+        ),
+    ],
+    summarize=summarize_fish_import,
+)
+
+
+# Sample rows of the downloadable templates, in column order
+FISH_SPECIES_IMPORT_TEMPLATE = ImportTemplate(FISH_SPECIES_IMPORT_SPEC, 'fish_species_template', rows=[
+    ['Tuna', 'Thunnus', 'Large saltwater fish'],
+    ['Salmon', 'Salmo salar', 'Farmed fish'],
+    ['Cod', 'Gadus morhua', 'North Atlantic fish'],
+])
+
+FISH_IMPORT_TEMPLATE = ImportTemplate(FISH_IMPORT_SPEC, 'fish_template', rows=[
+    ['Tuna', 'Bluefin Tuna', 'Caught in Pacific Ocean'],
+    ['Salmon', 'Atlantic Salmon', 'Farmed in Norway'],
+    ['Cod', 'Pacific Cod', 'Caught in Alaska'],
+])
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fishs', '0002_remove_fish_scientific_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fishspecies',
+            name='import_digest',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fishs', '0003_fishspecies_import_digest'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fish',
+            index=models.Index(fields=['created_at', 'id'], name='fish_created_id_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
+from imports.models import ImportDigestModel
 
-class FishSpecies(models.Model):
+class FishSpecies(ImportDigestModel):
     """Model representing fish species"""
     name = models.CharField(max_length=100, unique=True, verbose_name="Nama Ikan")
     scientific_name = models.CharField(max_length=200, blank=True, null=True, verbose_name="Nama Ilmiah")
@@ -34,4 +35,8 @@ class Fish(models.Model):
     
     class Meta:
         verbose_name = "Ikan"
-        verbose_name_plural = "Ikan"
\ No newline at end of file
+        verbose_name_plural = "Ikan"
+        indexes = [
+            # Keyset pagination of the fish list
+            models.Index(fields=['created_at', 'id'], name='fish_created_id_idx'),
+        ]
\ No newline at end of file
@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from fish_chain_optimization.fieldsets import SparseFieldsetSerializerMixin
 from .models import FishSpecies, Fish
 
-class FishSpeciesSerializer(serializers.ModelSerializer):
+class FishSpeciesSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Serializer untuk informasi jenis ikan.
     
@@ -9,7 +10,7 @@ class FishSpeciesSerializer(serializers.ModelSerializer):
     """
     class Meta:
         model = FishSpecies
-        fields = '__all__'
+        exclude = ('import_digest',)
         read_only_fields = (
             'created_at', 
             'updated_at'
@@ -23,7 +24,7 @@ class FishSpeciesCreateSerializer(serializers.ModelSerializer):
     """
     class Meta:
         model = FishSpecies
-        fields = '__all__'
+        exclude = ('import_digest',)
         read_only_fields = (
             'created_at', 
             'updated_at'
@@ -47,13 +48,13 @@ class FishSpeciesUpdateSerializer(serializers.ModelSerializer):
     """
     class Meta:
         model = FishSpecies
-        fields = '__all__'
+        exclude = ('import_digest',)
         read_only_fields = (
             'created_at', 
             'updated_at'
         )
 
-class FishSerializer(serializers.ModelSerializer):
+class FishSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Serializer untuk informasi ikan.
     
@@ -1,11 +1,14 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 import io
 import csv
 from .models import FishSpecies, Fish
+from imports.testing import AuthenticatedClientMixin, TemporaryMediaRootMixin, csv_upload
 
 User = get_user_model()
 
@@ -93,7 +96,7 @@ class FishSpeciesAPITest(TestCase):
         self.client.force_authenticate(user=self.user)
         response = self.client.get('/api/fishs/species/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)  # type: ignore
-        self.assertEqual(len(response.data), 1)  # type: ignore
+        self.assertEqual(len(response.data['results']), 1)  # type: ignore
 
 class FishAPITest(TestCase):
     def setUp(self):
@@ -138,9 +141,9 @@ class FishAPITest(TestCase):
         self.client.force_authenticate(user=self.user)
         response = self.client.get('/api/fishs/fish/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)  # type: ignore
-        self.assertEqual(len(response.data), 1)  # type: ignore
+        self.assertEqual(len(response.data['results']), 1)  # type: ignore
 
-class FishImportTest(TestCase):
+class FishImportTest(TemporaryMediaRootMixin, TestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user(  # type: ignore
@@ -190,4 +193,142 @@ class FishImportTest(TestCase):
         self.client.force_authenticate(user=self.user)
         response = self.client.post('/api/fishs/fish/import/', {'file': csv_file})
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)  # type: ignore
-        self.assertEqual(Fish.objects.count(), 2)  # type: ignore
\ No newline at end of file
+        self.assertEqual(Fish.objects.count(), 2)  # type: ignore
+
+class FishBulkImportTest(AuthenticatedClientMixin, TemporaryMediaRootMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.tuna = FishSpecies.objects.create(name='Tuna')  # type: ignore
+        self.cod = FishSpecies.objects.create(name='Cod')  # type: ignore
+        
+    def _csv_file(self, rows):
+        return csv_upload('fish.csv', ['species_name', 'name', 'notes'], rows)
+        
+    def test_dry_run_fish_import_checks_species_without_saving(self):
+        csv_file = self._csv_file([
+            ['Tuna', 'Bluefin Tuna', 'Pacific'],
+            ['Shark', 'Great White', ''],
+        ])
+        response = self.client.post('/api/fishs/fish/import/?dry_run=1', {'file': csv_file})
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)  # type: ignore
+        self.assertTrue(response.data['dry_run'])  # type: ignore
+        self.assertEqual(response.data['created_count'], 1)  # type: ignore
+        self.assertEqual(response.data['errors'], ["Row 2: Fish species 'Shark' does not exist"])  # type: ignore
+        self.assertFalse(Fish.objects.exists())  # type: ignore
+        
+    def test_import_fish_reports_unknown_species(self):
+        csv_file = self._csv_file([
+            ['Tuna', 'Bluefin Tuna', 'Pacific'],
+            ['Shark', 'Great White', ''],
+            ['Cod', 'Pacific Cod', ''],
+            ['Shark', 'Hammerhead', ''],
+        ])
+        response = self.client.post('/api/fishs/fish/import/', {'file': csv_file})
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)  # type: ignore
+        self.assertEqual(response.data['created_count'], 2)  # type: ignore
+        self.assertEqual(response.data['unknown_species'], ['Shark'])  # type: ignore
+        self.assertEqual(len(response.data['errors']), 2)  # type: ignore
+        self.assertEqual(Fish.objects.filter(species=self.tuna).count(), 1)  # type: ignore
+        self.assertIsNone(Fish.objects.get(name='Pacific Cod').notes)  # type: ignore
+        
+    def test_import_fish_matches_species_case_insensitively(self):
+        csv_file = self._csv_file([
+            ['tuna', 'Bluefin Tuna', ''],
+            ['TUNA', 'Yellowfin Tuna', ''],
+            ['shark', 'Great White', ''],
+        ])
+        response = self.client.post('/api/fishs/fish/import/', {'file': csv_file})
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)  # type: ignore
+        self.assertEqual(response.data['created_count'], 2)  # type: ignore
+        self.assertEqual(response.data['unknown_species'], ['shark'])  # type: ignore
+        self.assertEqual(Fish.objects.filter(species=self.tuna).count(), 2)  # type: ignore
+        
+    def test_import_fish_resolves_species_once(self):
+        rows = [['Tuna' if i % 2 else 'Cod', f'Fish {i}', ''] for i in range(300)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/fishs/fish/import/', {'file': self._csv_file(rows)})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)  # type: ignore
+        self.assertEqual(Fish.objects.count(), 300)  # type: ignore
+        species_queries = [q for q in queries if 'fishs_fishspecies' in q['sql'] and q['sql'].startswith('SELECT')]
+        self.assertEqual(len(species_queries), 1)
+        
+    @override_settings(IMPORT_CHUNK_SIZE=2)
+    def test_import_fish_in_chunks_reuses_resolved_species(self):
+        csv_file = self._csv_file([
+            ['Tuna', 'Fish 1', ''],
+            ['Shark', 'Fish 2', ''],
+            ['Tuna', 'Fish 3', ''],
+            ['Shark', 'Fish 4', ''],
+            ['Cod', 'Fish 5', ''],
+        ])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/fishs/fish/import/', {'file': csv_file})
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)  # type: ignore
+        self.assertEqual(response.data['created_count'], 3)  # type: ignore
+        self.assertEqual(response.data['unknown_species'], ['Shark'])  # type: ignore
+        self.assertEqual(response.data['errors'], [  # type: ignore
+            "Row 2: Fish species 'Shark' does not exist",
+            "Row 4: Fish species 'Shark' does not exist",
+        ])
+        species_queries = [q for q in queries if 'fishs_fishspecies' in q['sql'] and q['sql'].startswith('SELECT')]
+        self.assertEqual(len(species_queries), 2)
+
+class FishSpeciesBulkImportTest(AuthenticatedClientMixin, TemporaryMediaRootMixin, TestCase):
+    def _csv_file(self, rows):
+        return csv_upload('species.csv', ['name', 'scientific_name', 'description'], rows)
+        
+    def test_import_species_matches_names_case_insensitively(self):
+        FishSpecies.objects.create(name='Tuna', scientific_name='Thunnus')  # type: ignore
+        csv_file = self._csv_file([
+            ['tuna', 'Thunnus thynnus', 'Large saltwater fish'],
+            ['Cod', 'Gadus morhua', ''],
+        ])
+        response = self.client.post('/api/fishs/species/import/', {'file': csv_file})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)  # type: ignore
+        self.assertEqual(response.data['created_count'], 1)  # type: ignore
+        self.assertEqual(response.data['updated_count'], 1)  # type: ignore
+        self.assertEqual(FishSpecies.objects.count(), 2)  # type: ignore
+        tuna = FishSpecies.objects.get(name='Tuna')  # type: ignore
+        self.assertEqual(tuna.scientific_name, 'Thunnus thynnus')
+        
+    def test_import_species_does_not_write_unchanged_rows(self):
+        species = FishSpecies.objects.create(name='Tuna', scientific_name='Thunnus', description='Large fish')  # type: ignore
+        csv_file = self._csv_file([['TUNA', 'Thunnus', 'Large fish']])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/fishs/species/import/', {'file': csv_file})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)  # type: ignore
+        self.assertEqual(response.data['unchanged_count'], 1)  # type: ignore
+        # A row saved outside the importer only gets its digest filled in
+        writes = [q['sql'] for q in queries if q['sql'].startswith(('INSERT', 'UPDATE'))]
+        self.assertEqual(len(writes), 1)
+        self.assertNotIn('"scientific_name"', writes[0])
+        self.assertEqual(FishSpecies.objects.get(pk=species.pk).updated_at, species.updated_at)  # type: ignore
+        
+        # Re-importing the same file is skipped on the stored digest
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/fishs/species/import/', {'file': self._csv_file([['TUNA', 'Thunnus', 'Large fish']])})
+        self.assertEqual(response.data['unchanged_count'], 1)  # type: ignore
+        self.assertFalse([q for q in queries if q['sql'].startswith(('INSERT', 'UPDATE'))])
+
+
+
+class FishSparseFieldsetTest(AuthenticatedClientMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        species = FishSpecies.objects.create(name='Tuna', description='Large saltwater fish')  # type: ignore
+        Fish.objects.create(species=species, name='Yellowfin', notes='Long notes')  # type: ignore
+
+    def test_species_list_does_not_read_description(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/fishs/species/', {'fields': 'id,name'})
+        self.assertEqual(response.data['results'], [{'id': FishSpecies.objects.get().id, 'name': 'Tuna'}])  # type: ignore
+        self.assertFalse([q for q in queries if '"description"' in q['sql']])
+
+    def test_fish_list_reads_related_field_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/fishs/fish/', {'fields': 'name,species_name'})
+        self.assertEqual(response.data['results'], [{'name': 'Yellowfin', 'species_name': 'Tuna'}])  # type: ignore
+        select = [q['sql'] for q in queries if 'FROM "fishs_fish"' in q['sql']]
+        self.assertEqual(len(select), 1)
+        self.assertNotIn('"notes"', select[0])
+        self.assertNotIn('"description"', select[0])
@@ -9,10 +9,13 @@ urlpatterns = [
     path('species/<int:pk>/', views.FishSpeciesRetrieveUpdateDestroyView.as_view(), name='species-detail'),
     path('species/import/', views.FishSpeciesImportView.as_view(), name='species-import'),
     path('species/template/', views.download_fish_species_template, name='species-template'),
+    path('species/export.xlsx', views.export_fish_species_xlsx, name='species-export-xlsx'),
     
     # Fish URLs
     path('fish/', views.FishListCreateView.as_view(), name='fish-list-create'),
     path('fish/<int:pk>/', views.FishRetrieveUpdateDestroyView.as_view(), name='fish-detail'),
     path('fish/import/', views.FishImportView.as_view(), name='fish-import'),
     path('fish/template/', views.download_fish_template, name='fish-template'),
+    path('fish/export.csv', views.export_fish_csv, name='fish-export-csv'),
+    path('fish/export.xlsx', views.export_fish_xlsx, name='fish-export-xlsx'),
 ]
\ No newline at end of file
@@ -1,31 +1,37 @@
-from rest_framework import generics, status
-from rest_framework.response import Response
+from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.views import APIView
 from rest_framework.decorators import api_view, permission_classes
-from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
-import pandas as pd
-import io
-from django.db import transaction
+from fish_chain_optimization.fieldsets import FIELDS_PARAMETER, SparseFieldsetViewMixin
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
-from django.http import HttpResponse
 from .models import FishSpecies, Fish
 from .serializers import (
     FishSpeciesSerializer, FishSpeciesCreateSerializer, FishSpeciesUpdateSerializer,
     FishSerializer, FishCreateSerializer, FishUpdateSerializer
 )
+from .importers import FISH_SPECIES_IMPORT_SPEC, FISH_IMPORT_SPEC
+from imports.views import csv_export_response, import_file_response, template_response, xlsx_export_response
+from imports.schema import (
+    ASYNC_IMPORT_PARAMETER, COMMIT_MODE_PARAMETER, DRY_RUN_PARAMETER, IMPORT_JOB_ACCEPTED_RESPONSE,
+    TEMPLATE_FORMAT_PARAMETER
+)
 
 # Fish Species Views
+@extend_schema_view(get=extend_schema(parameters=[FIELDS_PARAMETER]))
 @extend_schema(
     summary="Daftar dan Buat Jenis Ikan",
     description="""
     Endpoint ini digunakan untuk mendapatkan daftar semua jenis ikan atau membuat jenis ikan baru.
     
     Metode GET:
-    - Mengembalikan daftar semua jenis ikan dalam sistem
+    - Mengembalikan daftar jenis ikan dalam sistem, diurutkan menurut nama
+    - Hasil dibagi per halaman dengan pagination kursor (keyset): respons berisi next, previous, dan results;
+      ikuti tautan next untuk halaman berikutnya, ?page_size mengatur jumlah data per halaman (maksimal
+      API_MAX_PAGE_SIZE), dan ?count=1 menambahkan jumlah seluruh data
     
     Metode POST:
     - Membuat jenis ikan baru dengan data yang diberikan
@@ -49,15 +55,17 @@ from .serializers import (
         }
     }
 )
-class FishSpeciesListCreateView(generics.ListCreateAPIView):
+class FishSpeciesListCreateView(SparseFieldsetViewMixin, generics.ListCreateAPIView):
     queryset = FishSpecies.objects.all()  # type: ignore
     permission_classes = [IsAuthenticated]
+    keyset_ordering = 'name'
     
     def get_serializer_class(self):  # type: ignore
         if self.request.method == 'POST':
             return FishSpeciesCreateSerializer
         return FishSpeciesSerializer
 
+@extend_schema_view(get=extend_schema(parameters=[FIELDS_PARAMETER]))
 @extend_schema(
     summary="Detail, Update, dan Hapus Jenis Ikan",
     description="""
@@ -90,7 +98,7 @@ class FishSpeciesListCreateView(generics.ListCreateAPIView):
         }
     }
 )
-class FishSpeciesRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class FishSpeciesRetrieveUpdateDestroyView(SparseFieldsetViewMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = FishSpecies.objects.all()  # type: ignore
     permission_classes = [IsAuthenticated]
     
@@ -100,13 +108,17 @@ class FishSpeciesRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView
         return FishSpeciesSerializer
 
 # Fish Views
+@extend_schema_view(get=extend_schema(parameters=[FIELDS_PARAMETER]))
 @extend_schema(
     summary="Daftar dan Buat Ikan",
     description="""
     Endpoint ini digunakan untuk mendapatkan daftar semua ikan atau membuat ikan baru.
     
     Metode GET:
-    - Mengembalikan daftar semua ikan dalam sistem dengan informasi jenis ikan
+    - Mengembalikan daftar ikan dalam sistem dengan informasi jenis ikan, diurutkan menurut waktu dibuat
+    - Hasil dibagi per halaman dengan pagination kursor (keyset): respons berisi next, previous, dan results;
+      ikuti tautan next untuk halaman berikutnya, ?page_size mengatur jumlah data per halaman (maksimal
+      API_MAX_PAGE_SIZE), dan ?count=1 menambahkan jumlah seluruh data
     
     Metode POST:
     - Membuat ikan baru dengan data yang diberikan
@@ -131,15 +143,17 @@ class FishSpeciesRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView
         }
     }
 )
-class FishListCreateView(generics.ListCreateAPIView):
+class FishListCreateView(SparseFieldsetViewMixin, generics.ListCreateAPIView):
     queryset = Fish.objects.select_related('species').all()  # type: ignore
     permission_classes = [IsAuthenticated]
+    keyset_ordering = 'created_at'
     
     def get_serializer_class(self):  # type: ignore
         if self.request.method == 'POST':
             return FishCreateSerializer
         return FishSerializer
 
+@extend_schema_view(get=extend_schema(parameters=[FIELDS_PARAMETER]))
 @extend_schema(
     summary="Detail, Update, dan Hapus Ikan",
     description="""
@@ -172,7 +186,7 @@ class FishListCreateView(generics.ListCreateAPIView):
         }
     }
 )
-class FishRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class FishRetrieveUpdateDestroyView(SparseFieldsetViewMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Fish.objects.select_related('species').all()  # type: ignore
     serializer_class = FishSerializer
     permission_classes = [IsAuthenticated]
@@ -191,38 +205,23 @@ class FishRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     
     File yang diunduh:
     - fish_species_template.csv: Template CSV dengan kolom yang diperlukan dan opsional untuk jenis ikan
+    - fish_species_template.xlsx: Template yang sama dalam format Excel (?file_format=xlsx)
+    
+    Template dibuat sekali per proses dan dikirim dengan ETag; permintaan dengan If-None-Match
+    yang masih cocok dijawab 304 Not Modified tanpa isi.
     """,
+    parameters=[TEMPLATE_FORMAT_PARAMETER],
     responses={
-        (200, 'text/csv'): OpenApiTypes.BINARY
+        (200, 'text/csv'): OpenApiTypes.BINARY,
+        (200, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'): OpenApiTypes.BINARY,
+        304: None
     }
 )
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def download_fish_species_template(request):
-    """Download CSV template for fish species import"""
-    # Create a DataFrame with template data
-    template_data = {
-        'name': ['Tuna', 'Salmon', 'Cod'],
-        'scientific_name': ['Thunnus', 'Salmo salar', 'Gadus morhua'],
-        'description': [
-            'Large saltwater fish',
-            'Farmed fish',
-            'North Atlantic fish'
-        ]
-    }
-    
-    df = pd.DataFrame(template_data)
-    
-    # Create CSV response
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="fish_species_template.csv"'
-    
-    # Write DataFrame to response
-    csv_buffer = io.StringIO()
-    df.to_csv(csv_buffer, index=False)
-    response.write(csv_buffer.getvalue())
-    
-    return response
+    """Download the CSV or XLSX template for fish species import"""
+    return template_response(request, 'fish_species')
 
 @extend_schema(
     summary="Unduh Template CSV Ikan",
@@ -232,38 +231,90 @@ def download_fish_species_template(request):
     
     File yang diunduh:
     - fish_template.csv: Template CSV dengan kolom yang diperlukan dan opsional untuk ikan
+    - fish_template.xlsx: Template yang sama dalam format Excel (?file_format=xlsx)
+    
+    Template dibuat sekali per proses dan dikirim dengan ETag; permintaan dengan If-None-Match
+    yang masih cocok dijawab 304 Not Modified tanpa isi.
     """,
+    parameters=[TEMPLATE_FORMAT_PARAMETER],
     responses={
-        (200, 'text/csv'): OpenApiTypes.BINARY
+        (200, 'text/csv'): OpenApiTypes.BINARY,
+        (200, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'): OpenApiTypes.BINARY,
+        304: None
     }
 )
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def download_fish_template(request):
-    """Download CSV template for fish import"""
-    # Create a DataFrame with template data
-    template_data = {
-        'species_name': ['Tuna', 'Salmon', 'Cod'],
-        'name': ['Bluefin Tuna', 'Atlantic Salmon', 'Pacific Cod'],
-        'notes': [
-            'Caught in Pacific Ocean',
-            'Farmed in Norway',
-            'Caught in Alaska'
-        ]
+    """Download the CSV or XLSX template for fish import"""
+    return template_response(request, 'fish')
+
+# Export Views
+@extend_schema(
+    summary="Ekspor Data Jenis Ikan ke Excel",
+    description="""
+    Endpoint ini digunakan untuk mengekspor seluruh data jenis ikan sebagai file Excel (.xlsx).
+    
+    Kolom file sama dengan template impor jenis ikan (name, scientific_name, description), sehingga
+    file hasil ekspor dapat langsung diimpor kembali. Workbook ditulis baris demi baris dalam mode
+    write-only dan disimpan ke file sementara, sehingga penggunaan memori tetap kecil.
+    
+    File yang diunduh:
+    - fish_species.xlsx
+    """,
+    responses={
+        (200, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'): OpenApiTypes.BINARY
     }
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_fish_species_xlsx(request):
+    """Send all fish species as an XLSX workbook"""
+    return xlsx_export_response(FISH_SPECIES_IMPORT_SPEC, FishSpecies.objects.all(), 'fish_species.xlsx')  # type: ignore
+
+@extend_schema(
+    summary="Ekspor Data Ikan ke CSV",
+    description="""
+    Endpoint ini digunakan untuk mengekspor seluruh data ikan beserta nama jenis ikannya sebagai file CSV.
     
-    df = pd.DataFrame(template_data)
+    Kolom file sama dengan template impor ikan (species_name, name, notes), sehingga file hasil
+    ekspor dapat langsung diimpor kembali. Data dikirim secara streaming per potongan (chunk) tanpa
+    membangun objek model, sehingga byte pertama langsung terkirim dan penggunaan memori tetap kecil.
     
-    # Create CSV response
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="fish_template.csv"'
+    File yang diunduh:
+    - fish.csv
+    """,
+    responses={
+        (200, 'text/csv'): OpenApiTypes.BINARY
+    }
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_fish_csv(request):
+    """Stream all fish with their species name as a CSV file"""
+    return csv_export_response(FISH_IMPORT_SPEC, Fish.objects.all(), 'fish.csv')  # type: ignore
+
+@extend_schema(
+    summary="Ekspor Data Ikan ke Excel",
+    description="""
+    Endpoint ini digunakan untuk mengekspor seluruh data ikan beserta nama jenis ikannya sebagai file Excel (.xlsx).
     
-    # Write DataFrame to response
-    csv_buffer = io.StringIO()
-    df.to_csv(csv_buffer, index=False)
-    response.write(csv_buffer.getvalue())
+    Kolom file sama dengan template impor ikan (species_name, name, notes), sehingga file hasil
+    ekspor dapat langsung diimpor kembali. Workbook ditulis baris demi baris dalam mode write-only
+    dan disimpan ke file sementara, sehingga penggunaan memori tetap kecil.
     
-    return response
+    File yang diunduh:
+    - fish.xlsx
+    """,
+    responses={
+        (200, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'): OpenApiTypes.BINARY
+    }
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_fish_xlsx(request):
+    """Send all fish with their species name as an XLSX workbook"""
+    return xlsx_export_response(FISH_IMPORT_SPEC, Fish.objects.all(), 'fish.xlsx')  # type: ignore
 
 # Import Views
 @extend_schema(
@@ -273,7 +324,8 @@ def download_fish_template(request):
     Endpoint ini mendukung impor massal dengan fitur update otomatis untuk jenis ikan yang sudah ada.
     
     Format file yang didukung:
-    - CSV (.csv)
+    - CSV (.csv), juga terkompresi gzip (.csv.gz)
+    - Arsip ZIP (.zip) berisi beberapa file CSV
     - Excel (.xlsx, .xls)
     
     Kolom yang diperlukan:
@@ -284,10 +336,20 @@ def download_fish_template(request):
     - description: Deskripsi jenis ikan
     
     Fitur:
-    - Jika jenis ikan dengan nama yang sama sudah ada, data akan diperbarui
-    - Transaksi atomik (semua berhasil atau semua gagal)
-    - Laporan error per baris
+    - Jika jenis ikan dengan nama yang sama sudah ada (tidak case sensitive), data akan diperbarui
+    - Baris yang tidak berubah tidak ditulis ulang ke database; yang tidak berubah sejak impor terakhir dilewati berdasarkan digest isi baris
+    - Jenis ikan baru dan yang berubah disimpan secara massal per batch
+    - File dibaca dan diproses per potongan (chunk) sehingga penggunaan memori tetap kecil
+    - File CSV sudah diproses selagi masih diunggah; unggahan yang melebihi batas ukuran (IMPORT_MAX_UPLOAD_SIZE) langsung ditolak dengan status 413
+    - File .csv.gz didekompresi selagi dibaca; file CSV dalam arsip ZIP diurai secara paralel lalu diterapkan berurutan, dengan hasil per file pada kolom files
+    - Nama kolom dikenali tanpa memperhatikan huruf besar/kecil dan spasi, termasuk alias bahasa Indonesia
+    - Nilai angka/boolean yang tidak valid dilaporkan per baris
+    - Transaksi atomik (semua berhasil atau semua gagal); dengan ?commit=chunk setiap potongan di-commit sendiri bersama checkpoint sehingga impor yang gagal dapat dilanjutkan (/api/imports/jobs/<job_id>/resume/)
+    - Dengan ?dry_run=1 file hanya divalidasi (termasuk pengecekan ke database) tanpa menyimpan apa pun; laporan error sama dengan impor sebenarnya
+    - Dengan ?async=1 file diproses di latar belakang oleh worker impor (202 + job_id); progres dipantau di /api/imports/jobs/<job_id>/
+    - Laporan error per baris: respons memuat jumlah error (error_count) dan contoh error pertama; semua baris yang ditolak (baris asli, kolom, alasan) dapat diunduh sebagai CSV dari rejected_rows_url
     """,
+    parameters=[ASYNC_IMPORT_PARAMETER, DRY_RUN_PARAMETER, COMMIT_MODE_PARAMETER],
     request={
         'multipart/form-data': {
             'type': 'object',
@@ -300,11 +362,16 @@ def download_fish_template(request):
         }
     },
     responses={
+        202: IMPORT_JOB_ACCEPTED_RESPONSE,
         201: {
             'type': 'object',
             'properties': {
                 'message': {'type': 'string'},
                 'created_count': {'type': 'integer'},
+                'updated_count': {'type': 'integer'},
+                'unchanged_count': {'type': 'integer'},
+                'error_count': {'type': 'integer'},
+                'rejected_rows_url': {'type': 'string', 'nullable': True},
                 'errors': {
                     'type': 'array',
                     'items': {'type': 'string'}
@@ -316,6 +383,10 @@ def download_fish_template(request):
             'properties': {
                 'message': {'type': 'string'},
                 'created_count': {'type': 'integer'},
+                'updated_count': {'type': 'integer'},
+                'unchanged_count': {'type': 'integer'},
+                'error_count': {'type': 'integer'},
+                'rejected_rows_url': {'type': 'string', 'nullable': True},
                 'errors': {
                     'type': 'array',
                     'items': {'type': 'string'}
@@ -336,81 +407,8 @@ class FishSpeciesImportView(APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser)
     
-    @transaction.atomic
     def post(self, request):
-        file = request.FILES.get('file')
-        if not file:
-            return Response(
-                {'error': 'No file provided'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-            
-        try:
-            # Check file extension
-            if file.name.endswith('.csv'):
-                df = pd.read_csv(file)
-            elif file.name.endswith(('.xlsx', '.xls')):
-                df = pd.read_excel(file)
-            else:
-                return Response(
-                    {'error': 'Unsupported file format. Please upload CSV or Excel file.'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Process the data
-            created_count = 0
-            errors = []
-            
-            for index, row in df.iterrows():
-                try:
-                    # Extract data from row
-                    name = row.get('name') or row.get('Name') or row.get('nama')
-                    scientific_name = row.get('scientific_name') or row.get('Scientific Name') or row.get('nama_ilmiah')
-                    description = row.get('description') or row.get('Description') or row.get('deskripsi')
-                    
-                    # Validate required fields
-                    if not name:
-                        errors.append(f"Row {int(index) + 1}: Missing required 'name' field")  # type: ignore
-                        continue
-                    
-                    # Create or update FishSpecies
-                    species, created = FishSpecies.objects.get_or_create(  # type: ignore
-                        name=name,
-                        defaults={
-                            'scientific_name': scientific_name,
-                            'description': description
-                        }
-                    )
-                    
-                    # If species already exists, update it
-                    if not created:
-                        species.scientific_name = scientific_name
-                        species.description = description
-                        species.save()
-                    
-                    created_count += 1
-                    
-                except Exception as e:
-                    errors.append(f"Row {int(index) + 1}: {str(e)}")  # type: ignore
-            
-            # Prepare response
-            response_data = {
-                'message': f'Successfully processed {created_count} fish species',
-                'created_count': created_count,
-                'errors': errors
-            }
-            
-            if errors:
-                response_data['warning'] = 'Some rows had errors during import'
-                return Response(response_data, status=status.HTTP_206_PARTIAL_CONTENT)
-            else:
-                return Response(response_data, status=status.HTTP_201_CREATED)
-                
-        except Exception as e:
-            return Response(
-                {'error': f'Failed to process file: {str(e)}'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        return import_file_response(request, FISH_SPECIES_IMPORT_SPEC)
 
 @extend_schema(
     summary="Impor Data Ikan dari File",
@@ -418,7 +416,8 @@ class FishSpeciesImportView(APIView):
     Endpoint ini digunakan untuk mengimpor data ikan dari file CSV atau Excel.
     
     Format file yang didukung:
-    - CSV (.csv)
+    - CSV (.csv), juga terkompresi gzip (.csv.gz)
+    - Arsip ZIP (.zip) berisi beberapa file CSV
     - Excel (.xlsx, .xls)
     
     Kolom yang diperlukan:
@@ -430,10 +429,20 @@ class FishSpeciesImportView(APIView):
     
     Fitur:
     - Membuat ikan baru berdasarkan data dalam file
-    - Transaksi atomik (semua berhasil atau semua gagal)
-    - Laporan error per baris
+    - Transaksi atomik (semua berhasil atau semua gagal); dengan ?commit=chunk setiap potongan di-commit sendiri bersama checkpoint sehingga impor yang gagal dapat dilanjutkan (/api/imports/jobs/<job_id>/resume/)
+    - Dengan ?dry_run=1 file hanya divalidasi (termasuk pengecekan ke database) tanpa menyimpan apa pun; laporan error sama dengan impor sebenarnya
+    - Dengan ?async=1 file diproses di latar belakang oleh worker impor (202 + job_id); progres dipantau di /api/imports/jobs/<job_id>/
+    - Laporan error per baris: respons memuat jumlah error (error_count) dan contoh error pertama; semua baris yang ditolak (baris asli, kolom, alasan) dapat diunduh sebagai CSV dari rejected_rows_url
     - Validasi bahwa jenis ikan harus sudah ada dalam sistem
+    - Semua jenis ikan dalam file dicari dalam satu query dan ikan disimpan secara massal per batch
+    - Daftar jenis ikan yang tidak dikenal dilaporkan sekaligus (unknown_species)
+    - File dibaca dan diproses per potongan (chunk) sehingga penggunaan memori tetap kecil
+    - File CSV sudah diproses selagi masih diunggah; unggahan yang melebihi batas ukuran (IMPORT_MAX_UPLOAD_SIZE) langsung ditolak dengan status 413
+    - File .csv.gz didekompresi selagi dibaca; file CSV dalam arsip ZIP diurai secara paralel lalu diterapkan berurutan, dengan hasil per file pada kolom files
+    - Nama kolom dikenali tanpa memperhatikan huruf besar/kecil dan spasi, termasuk alias bahasa Indonesia
+    - Nilai angka/boolean yang tidak valid dilaporkan per baris
     """,
+    parameters=[ASYNC_IMPORT_PARAMETER, DRY_RUN_PARAMETER, COMMIT_MODE_PARAMETER],
     request={
         'multipart/form-data': {
             'type': 'object',
@@ -446,14 +455,21 @@ class FishSpeciesImportView(APIView):
         }
     },
     responses={
+        202: IMPORT_JOB_ACCEPTED_RESPONSE,
         201: {
             'type': 'object',
             'properties': {
                 'message': {'type': 'string'},
                 'created_count': {'type': 'integer'},
+                'error_count': {'type': 'integer'},
+                'rejected_rows_url': {'type': 'string', 'nullable': True},
                 'errors': {
                     'type': 'array',
                     'items': {'type': 'string'}
+                },
+                'unknown_species': {
+                    'type': 'array',
+                    'items': {'type': 'string'}
                 }
             }
         },
@@ -462,10 +478,16 @@ class FishSpeciesImportView(APIView):
             'properties': {
                 'message': {'type': 'string'},
                 'created_count': {'type': 'integer'},
+                'error_count': {'type': 'integer'},
+                'rejected_rows_url': {'type': 'string', 'nullable': True},
                 'errors': {
                     'type': 'array',
                     'items': {'type': 'string'}
                 },
+                'unknown_species': {
+                    'type': 'array',
+                    'items': {'type': 'string'}
+                },
                 'warning': {'type': 'string'}
             }
         },
@@ -482,77 +504,5 @@ class FishImportView(APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser)
     
-    @transaction.atomic
     def post(self, request):
-        file = request.FILES.get('file')
-        if not file:
-            return Response(
-                {'error': 'No file provided'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-            
-        try:
-            # Check file extension
-            if file.name.endswith('.csv'):
-                df = pd.read_csv(file)
-            elif file.name.endswith(('.xlsx', '.xls')):
-                df = pd.read_excel(file)
-            else:
-                return Response(
-                    {'error': 'Unsupported file format. Please upload CSV or Excel file.'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Process the data
-            created_count = 0
-            errors = []
-            
-            for index, row in df.iterrows():
-                try:
-                    # Extract data from row
-                    species_name = row.get('species_name') or row.get('Species Name') or row.get('jenis_ikan')
-                    name = row.get('name') or row.get('Name') or row.get('nama')
-                    notes = row.get('notes') or row.get('Notes') or row.get('catatan')
-                    
-                    # Validate required fields
-                    if not species_name:
-                        errors.append(f"Row {int(index) + 1}: Missing required 'species_name' field")  # type: ignore
-                        continue
-                    
-                    # Get or create the species
-                    try:
-                        species = FishSpecies.objects.get(name=species_name)  # type: ignore
-                    except Exception:
-                        errors.append(f"Row {int(index) + 1}: Fish species '{species_name}' does not exist")  # type: ignore
-                        continue
-                    
-                    # Create Fish
-                    Fish.objects.create(  # type: ignore
-                        species=species,
-                        name=name,
-                        notes=notes
-                    )
-                    
-                    created_count += 1
-                    
-                except Exception as e:
-                    errors.append(f"Row {int(index) + 1}: {str(e)}")  # type: ignore
-            
-            # Prepare response
-            response_data = {
-                'message': f'Successfully imported {created_count} fish',
-                'created_count': created_count,
-                'errors': errors
-            }
-            
-            if errors:
-                response_data['warning'] = 'Some rows had errors during import'
-                return Response(response_data, status=status.HTTP_206_PARTIAL_CONTENT)
-            else:
-                return Response(response_data, status=status.HTTP_201_CREATED)
-                
-        except Exception as e:
-            return Response(
-                {'error': f'Failed to process file: {str(e)}'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
\ No newline at end of file
+        return import_file_response(request, FISH_IMPORT_SPEC)
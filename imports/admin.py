@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import ImportJob
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'rows_processed', 'error_count', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status', 'created_at')
+    ordering = ('-created_at',)
+    readonly_fields = ('created_at', 'updated_at', 'started_at', 'finished_at')
@@ -0,0 +1,143 @@
+"""
+Zip archive imports.
+
+A .zip upload may carry several CSV (or .csv.gz) files of the same import
+kind, e.g. one per port or per month. Each member is decompressed as it is
+parsed, never extracted to disk; the members are parsed in parallel worker
+processes (see imports.parallel) and their chunks are applied one member at
+a time, in archive order, inside the caller's transaction, as they are
+parsed, so no member is ever held in memory as a whole.
+
+IMPORT_MAX_UNCOMPRESSED_SIZE caps the uncompressed size of an archive: the
+sizes its members declare are checked before anything is read, and every
+member may decompress to at most its share of the cap (in proportion to its
+declared size), which also stops a .csv.gz member that expands further than
+its zip entry says.
+"""
+import time
+import zipfile
+
+from django.conf import settings
+
+from .columns import ImportFileError
+from .engine import run_import
+from .parallel import PartParser, upload_path
+from .readers import CSV_EXTENSIONS, get_chunk_size, read_archive_member, skip_to_row
+from .rejects import get_sample_size
+
+
+def get_max_uncompressed_size():
+    """Largest uncompressed size of an archive import in bytes, configurable with IMPORT_MAX_UNCOMPRESSED_SIZE"""
+    return getattr(settings, 'IMPORT_MAX_UNCOMPRESSED_SIZE', 1024 * 1024 * 1024)
+
+
+def archive_members(path):
+    """The ZipInfo of the CSV members of the zip archive at ``path``, in archive order"""
+    with zipfile.ZipFile(path) as archive:
+        return [
+            info for info in archive.infolist()
+            if not info.is_dir()
+            and not info.filename.startswith('__MACOSX/')
+            and info.filename.lower().endswith(CSV_EXTENSIONS)
+        ]
+
+
+def member_size_limits(members, max_size):
+    """
+    Decompressed bytes each member may read: its share of ``max_size`` by declared size.
+
+    Raises ImportFileError when the declared sizes alone exceed ``max_size``.
+    """
+    declared = sum(info.file_size for info in members)
+    if declared > max_size:
+        raise ImportFileError(
+            f'The archive is too large. The maximum uncompressed size is {max_size // (1024 * 1024)} MB.'
+        )
+    return [max_size * info.file_size // declared if declared else 0 for info in members]
+
+
+def _combined_result(files, dry_run):
+    """Totals of the member results: counts are summed and error samples name their file"""
+    totals = {}
+    errors = []
+    for entry in files:
+        for key, value in entry['result'].items():
+            if isinstance(value, int) and not isinstance(value, bool):
+                totals[key] = totals.get(key, 0) + value
+        errors += [f"{entry['file']}: {error}" for error in entry['result']['errors']]
+
+    verb = 'Dry run: checked' if dry_run else 'Successfully processed'
+    result = {'message': f'{verb} {len(files)} files', **totals}
+    if dry_run:
+        result['dry_run'] = True
+    result['errors'] = errors[:get_sample_size()]
+    result.setdefault('error_count', 0)
+    result['files'] = files
+    return result
+
+
+def import_archive(spec, file, progress=None, dry_run=False, start_row=0, loader=None, resume=None, owner=None):
+    """
+    Import every CSV member of an uploaded zip archive as described by ``spec``, see run_import.
+
+    Row counts and ``start_row`` run on across the members in archive order,
+    so a checkpoint recorded by ``progress`` resumes an interrupted import at
+    the right member; its state holds the results of the members done so far
+    and the state of the current one, which ``resume`` carries on. Each
+    member keeps its own rejected-rows report; the result has the per-file
+    results under ``files`` and the summed counts. Raises ImportFileError
+    for an archive without CSV files or one larger uncompressed than
+    IMPORT_MAX_UNCOMPRESSED_SIZE allows, and wraps the ValueError of a member
+    (e.g. a file that is not UTF-8) in an ImportFileError naming the member.
+    """
+    resume = resume or {}
+    # Members an interrupted import completed are not parsed again
+    files = list(resume.get('files', []))
+    offset = sum(entry['rows'] for entry in files)
+    error_offset = sum(entry['result']['error_count'] for entry in files)
+    try:
+        with upload_path(file, '.zip') as path:
+            members = archive_members(path)
+            if not members:
+                raise ImportFileError('The archive does not contain any CSV files.')
+            limits = member_size_limits(members, get_max_uncompressed_size())
+            chunk_size = get_chunk_size()
+            arguments = [
+                (path, info.filename, chunk_size, limit)
+                for info, limit in zip(members, limits)
+            ][len(files):]
+            with PartParser(read_archive_member, arguments) as parts:
+                for info, part in zip(members[len(files):], parts):
+                    member = info.filename
+
+                    def member_progress(rows_processed, error_count, state, offset=offset, error_offset=error_offset):
+                        progress(offset + rows_processed, error_offset + error_count, {'files': list(files), 'member': state})
+
+                    started = time.perf_counter()
+                    try:
+                        chunks = iter(part)
+                        member_start = max(start_row - offset, 0)
+                        if member_start:
+                            member_start, chunks = skip_to_row(chunks, member_start)
+                        member_resume = resume.get('member') if member_start else None
+                        result = run_import(
+                            spec, chunks, member_progress if progress else None,
+                            dry_run, member_start, loader, member_resume, owner
+                        )
+                    except ValueError as e:
+                        raise ImportFileError(f"File '{member}': {e}") from e
+                    # Waiting for the parser is parse time, whether it ran in this process or a worker
+                    import_seconds = time.perf_counter() - started - part.waited
+                    files.append({
+                        'file': member,
+                        'rows': part.rows,
+                        'parse_seconds': round(part.seconds, 3),
+                        'import_seconds': round(import_seconds, 3),
+                        'result': result,
+                    })
+                    offset += part.rows
+                    error_offset += result['error_count']
+    except zipfile.BadZipFile:
+        raise ImportFileError('The uploaded file is not a valid zip archive.')
+
+    return _combined_result(files, dry_run)
@@ -0,0 +1,274 @@
+"""
+Import throughput benchmarks.
+
+Synthetic CSV and XLSX files are generated for every import kind and posted
+to its import view. Each case records the wall time, rows per second, the
+number of SQL queries and the peak memory traced while the view runs. A
+report can be compared with a saved baseline, so throughput regressions show
+up as failures instead of slower imports in production.
+
+Every case runs in a transaction that is rolled back afterwards, so running
+the benchmark leaves the database as it found it; the management command
+also runs it in a throwaway test database unless told to use the configured
+one. IMPORT_MAX_UPLOAD_SIZE is raised to the size of each generated upload, so
+the large cases measure the import rather than a 413. A case whose import
+answers an error status or rejects rows has failed: it has no throughput,
+and it fails the comparison with a baseline.
+"""
+import csv
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import django
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from django.urls import resolve, reverse
+from openpyxl import Workbook
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from fishs.models import FishSpecies
+
+from .uploads import get_max_upload_size
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+FORMATS = ['csv', 'xlsx']
+
+# Species the synthetic fish rows reference; created before the fish benchmark
+BENCHMARK_SPECIES = [f'Benchmark Species {i}' for i in range(50)]
+
+# Import URL name and header of each kind
+BENCHMARK_KINDS = {
+    'ships': {
+        'url_name': 'ships:ship-import',
+        'columns': ['name', 'reg_number', 'length', 'width', 'gross_tonnage', 'year_built', 'home_port', 'active'],
+    },
+    'fish_species': {
+        'url_name': 'fishs:species-import',
+        'columns': ['name', 'scientific_name', 'description'],
+    },
+    'fish': {
+        'url_name': 'fishs:fish-import',
+        'columns': ['species_name', 'name', 'notes'],
+    },
+    'fishing_areas': {
+        'url_name': 'import-fishing-areas',
+        'columns': ['name', 'code', 'description', 'coordinates'],
+    },
+}
+
+# Metrics compared with the baseline, and whether a higher value is better
+COMPARED_METRICS = {
+    'rows_per_second': True,
+    'queries': False,
+    'peak_memory_bytes': False,
+}
+
+
+def generate_rows(kind, row_count):
+    """Yield ``row_count`` synthetic rows for ``kind``, as lists in BENCHMARK_KINDS column order"""
+    ports = ['Jakarta', 'Surabaya', 'Makassar', 'Bitung', 'Ambon']
+    for i in range(row_count):
+        if kind == 'ships':
+            yield [
+                f'KM Benchmark {i}', f'BM-{i:07d}', round(10 + i % 900 / 10, 2), round(3 + i % 70 / 10, 2),
+                round(20 + i % 5000 / 10, 2), 1980 + i % 45, ports[i % len(ports)], i % 10 != 0
+            ]
+        elif kind == 'fish_species':
+            yield [f'Benchmark Species {i}', f'Benchmarkus speciesus {i}', f'Synthetic species number {i}']
+        elif kind == 'fish':
+            yield [BENCHMARK_SPECIES[i % len(BENCHMARK_SPECIES)], f'Fish {i}', f'Synthetic fish number {i}']
+        elif kind == 'fishing_areas':
+            lat, lng = -10 + i % 200 / 10, 95 + i % 450 / 10
+            yield [
+                f'Wilayah {i}', f'WB-{i:07d}', f'Synthetic fishing area {i}',
+                json.dumps({'type': 'Point', 'coordinates': [lng, lat]})
+            ]
+        else:
+            raise ValueError(f'Unknown benchmark kind: {kind}')
+
+
+def write_file(kind, row_count, file_format, directory):
+    """Write a synthetic import file and return its path"""
+    path = os.path.join(directory, f'{kind}_{row_count}.{file_format}')
+    columns = BENCHMARK_KINDS[kind]['columns']
+    if file_format == 'csv':
+        with open(path, 'w', encoding='utf-8', newline='') as output:
+            writer = csv.writer(output)
+            writer.writerow(columns)
+            writer.writerows(generate_rows(kind, row_count))
+    elif file_format == 'xlsx':
+        # Write-only mode streams rows to disk instead of building the sheet in memory
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(kind)
+        sheet.append(columns)
+        for row in generate_rows(kind, row_count):
+            sheet.append(row)
+        workbook.save(path)
+    else:
+        raise ValueError(f'Unknown benchmark format: {file_format}')
+    return path
+
+
+@contextmanager
+def count_queries():
+    """Count the queries run on the default connection, without keeping their SQL"""
+    counter = {'queries': 0}
+
+    def wrapper(execute, sql, params, many, context):
+        counter['queries'] += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield counter
+
+
+@contextmanager
+def benchmark_database():
+    """Run the benchmark in a throwaway test database instead of the configured one"""
+    database_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(database_name, verbosity=0)
+
+
+def _prepare(kind):
+    """Rows the kind's import depends on; created inside the case's transaction"""
+    if kind == 'fish':
+        FishSpecies.objects.bulk_create(  # type: ignore
+            [FishSpecies(name=name) for name in BENCHMARK_SPECIES], ignore_conflicts=True
+        )
+
+
+def run_case(kind, file_format, row_count, directory, trace_memory=True):
+    """
+    Import one synthetic file through its view and return the measurements.
+
+    The multipart request is built before measuring, so the numbers cover
+    the view itself: upload parsing, reading, validation and writes.
+    """
+    path = write_file(kind, row_count, file_format, directory)
+    url = reverse(BENCHMARK_KINDS[kind]['url_name'])
+    view = resolve(url).func
+
+    with transaction.atomic():
+        user = get_user_model().objects.get_or_create(username='import-benchmark')[0]  # type: ignore
+        _prepare(kind)
+        with open(path, 'rb') as upload:
+            request = APIRequestFactory().post(url, {'file': upload}, format='multipart')
+        force_authenticate(request, user=user)
+
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            # The limit applies to the declared length of the whole multipart body
+            max_upload_size = max(get_max_upload_size(), int(request.META['CONTENT_LENGTH']))
+            with override_settings(IMPORT_MAX_UPLOAD_SIZE=max_upload_size), count_queries() as counter:
+                response = view(request)
+            seconds = time.perf_counter() - started
+            peak_memory = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+        transaction.set_rollback(True)
+
+    os.unlink(path)
+    # A case that did not import every row measured something else than the import
+    failed = not 200 <= response.status_code < 300 or bool(response.data.get('error_count'))
+    case = {
+        'kind': kind,
+        'format': file_format,
+        'rows': row_count,
+        'status_code': response.status_code,
+        'error_count': response.data.get('error_count'),
+        'failed': failed,
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(row_count / seconds, 1) if seconds > 0 and not failed else None,
+        'queries': counter['queries'],
+        'peak_memory_bytes': peak_memory,
+    }
+    if failed:
+        case['error'] = response.data.get('error') or response.data.get('warning')
+    return case
+
+
+def run_benchmark(kinds=None, formats=None, sizes=None, trace_memory=True, progress=None):
+    """Run every kind/format/size combination and return the report"""
+    cases = []
+    with tempfile.TemporaryDirectory(prefix='import-benchmark-') as directory:
+        for kind in kinds or BENCHMARK_KINDS:
+            for file_format in formats or FORMATS:
+                for row_count in sizes or DEFAULT_SIZES:
+                    case = run_case(kind, file_format, row_count, directory, trace_memory)
+                    cases.append(case)
+                    if progress:
+                        progress(case)
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'trace_memory': trace_memory,
+        },
+        'cases': cases,
+    }
+
+
+def case_key(case):
+    return f"{case['kind']}/{case['format']}/{case['rows']}"
+
+
+def failed_cases(report):
+    """Cases of ``report`` whose import answered an error status or rejected rows"""
+    return [case for case in report['cases'] if case.get('failed')]
+
+
+def compare_reports(report, baseline, tolerance=0.1):
+    """
+    Compare the cases of ``report`` with the same cases of ``baseline``.
+
+    Returns one entry per compared metric with the relative change; an entry
+    is a regression when the metric got worse by more than ``tolerance``.
+    A failed case is a regression of its status code. Cases missing from the
+    baseline are not compared.
+    """
+    baseline_cases = {case_key(case): case for case in baseline.get('cases', [])}
+    comparisons = []
+    for case in report['cases']:
+        previous = baseline_cases.get(case_key(case))
+        if previous is None:
+            continue
+        if case.get('failed'):
+            comparisons.append({
+                'case': case_key(case),
+                'metric': 'status_code',
+                'baseline': previous.get('status_code'),
+                'current': case['status_code'],
+                'change': None,
+                'regression': True,
+            })
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            current, before = case.get(metric), previous.get(metric)
+            if not current or not before:
+                continue
+            change = (current - before) / before
+            worse = -change if higher_is_better else change
+            comparisons.append({
+                'case': case_key(case),
+                'metric': metric,
+                'baseline': before,
+                'current': current,
+                'change': round(change, 4),
+                'regression': worse > tolerance,
+            })
+    return comparisons
@@ -0,0 +1,196 @@
+"""
+Set-based helpers shared by the CSV/Excel import views.
+
+The importers resolve every natural key of a file in a handful of queries and
+write new and changed rows in batches, so the number of database round trips
+grows with the number of batches instead of the number of rows.
+"""
+import hashlib
+
+import pandas as pd
+from django.db import connections, router
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .models import DIGEST_FIELD
+
+# Stays below the 999 bound parameters SQLite allows in one query
+DEFAULT_BATCH_SIZE = 500
+
+
+def chunked(items, size=DEFAULT_BATCH_SIZE):
+    """Yield consecutive slices of ``items`` with at most ``size`` elements"""
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def fetch_existing(model, key_field, keys, batch_size=DEFAULT_BATCH_SIZE):
+    """Load the rows of ``model`` whose ``key_field`` is in ``keys``, keyed by that field"""
+    existing = {}
+    for batch in chunked(keys, batch_size):
+        for obj in model.objects.filter(**{f'{key_field}__in': batch}):
+            existing[getattr(obj, key_field)] = obj
+    return existing
+
+
+def fetch_existing_iexact(model, key_field, keys, batch_size=DEFAULT_BATCH_SIZE):
+    """Like fetch_existing, but matches case-insensitively and keys the result by the lower-cased value"""
+    existing = {}
+    queryset = model.objects.annotate(key_lower=Lower(key_field))
+    for batch in chunked([key.lower() for key in keys], batch_size):
+        for obj in queryset.filter(key_lower__in=batch):
+            existing[obj.key_lower] = obj
+    return existing
+
+
+def row_digests(df, fields):
+    """
+    Digest of the ``fields`` values of every row of a cleaned import frame.
+
+    The values are rendered to text column by column and joined per row, so
+    only the final hash is computed row by row. The field names are part of the
+    digest, so adding an importable field invalidates the stored digests.
+    """
+    text = pd.Series('|'.join(fields), index=df.index, dtype=object)
+    for field_name in fields:
+        column = df[field_name] if field_name in df.columns else pd.Series(None, index=df.index, dtype=object)
+        text = text.str.cat(column.astype(str).where(column.notna(), '\x00'), sep='\x1f')
+    return pd.Series(
+        [hashlib.md5(value.encode('utf-8'), usedforsecurity=False).hexdigest() for value in text],
+        index=df.index, dtype=object
+    )
+
+
+def fetch_digests(model, key_field, keys, iexact=False, batch_size=DEFAULT_BATCH_SIZE):
+    """Stored import digests of the rows whose ``key_field`` is in ``keys``, keyed like fetch_existing(_iexact)"""
+    digests = {}
+    if iexact:
+        queryset = model.objects.annotate(key_lower=Lower(key_field))
+        lookup, key_column = 'key_lower__in', 'key_lower'
+        keys = [key.lower() for key in keys]
+    else:
+        queryset = model.objects.all()
+        lookup, key_column = f'{key_field}__in', key_field
+    for batch in chunked(keys, batch_size):
+        digests.update(queryset.filter(**{lookup: batch}).values_list(key_column, DIGEST_FIELD))
+    return digests
+
+
+def skip_unchanged(model, records, key_field, iexact=False, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Drop the records whose digest matches the one stored with the row.
+
+    ``records`` values must carry their digest under DIGEST_FIELD (see
+    row_digests). Only keys and digests are read, so an unchanged file costs
+    one narrow SELECT per batch and nothing else. Returns the remaining
+    records and the number of records skipped.
+    """
+    stored = fetch_digests(model, key_field, records.keys(), iexact, batch_size)
+    changed = {
+        key: values for key, values in records.items()
+        if stored.get(key) is None or stored[key] != values[DIGEST_FIELD]
+    }
+    return changed, len(records) - len(changed)
+
+
+def drop_seen(records, seen_keys):
+    """
+    Drop the records whose key an earlier chunk of the file already had.
+
+    Used by dry runs, which write nothing, so a key repeated across chunks is
+    not in the database yet when the later chunk is checked. ``seen_keys`` is
+    updated with the keys of ``records``. Returns the remaining records and
+    the number dropped.
+    """
+    fresh = {key: values for key, values in records.items() if key not in seen_keys}
+    seen_keys.update(records.keys())
+    return fresh, len(records) - len(fresh)
+
+
+def _auto_now_fields(model):
+    return [
+        field.name for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+    ]
+
+
+def bulk_upsert(model, records, key_field, fields, existing=None, digest_field=None, dry_run=False,
+                batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Insert or update ``records`` (a dict of key -> field values) in batches.
+
+    Existing rows are resolved with one query per batch of keys, unless the
+    caller passes its own ``existing`` map (e.g. keyed case-insensitively).
+    Rows whose values already match the database are left untouched; changed
+    rows go through ``bulk_update`` for the columns that changed only, and new
+    rows through ``bulk_create``. New rows use ``update_conflicts`` so a row
+    inserted concurrently by another request is updated instead of failing
+    the batch.
+
+    With ``digest_field``, the digest carried by each record is stored with
+    the row; a row whose values match but whose digest is stale only gets
+    its digest written and still counts as unchanged.
+
+    With ``dry_run``, rows are classified exactly as for a real import but
+    nothing is written.
+
+    Returns a ``(created, updated, unchanged)`` tuple of counts.
+    """
+    if existing is None:
+        existing = fetch_existing(model, key_field, records.keys(), batch_size)
+    touch_fields = _auto_now_fields(model)
+    now = timezone.now()
+
+    to_create = []
+    # Changed rows grouped by the fields that differ, so a batch only rewrites
+    # the columns that actually changed (e.g. not a large unchanged TEXT column)
+    to_update = {}
+    # Unchanged rows whose stored digest is missing or stale
+    digest_only = []
+    unchanged = 0
+    for key, values in records.items():
+        obj = existing.get(key)
+        if obj is None:
+            to_create.append(model(**{key_field: key, **values}))
+            continue
+        changed_fields = []
+        for field_name in fields:
+            if getattr(obj, field_name) != values.get(field_name):
+                setattr(obj, field_name, values.get(field_name))
+                changed_fields.append(field_name)
+        digest_changed = digest_field is not None and getattr(obj, digest_field) != values.get(digest_field)
+        if digest_changed:
+            setattr(obj, digest_field, values.get(digest_field))
+        if changed_fields:
+            for field_name in touch_fields:
+                setattr(obj, field_name, now)
+            if digest_changed:
+                changed_fields.append(digest_field)
+            to_update.setdefault(tuple(changed_fields), []).append(obj)
+        else:
+            unchanged += 1
+            if digest_changed:
+                digest_only.append(obj)
+
+    updated = sum(len(objs) for objs in to_update.values())
+    if dry_run:
+        return len(to_create), updated, unchanged
+
+    if to_create:
+        connection = connections[router.db_for_write(model)]
+        conflict_options = {
+            'update_conflicts': True,
+            'update_fields': list(fields) + touch_fields + ([digest_field] if digest_field else []),
+        }
+        # MySQL upserts on any unique key and rejects an explicit conflict target
+        if connection.features.supports_update_conflicts_with_target:
+            conflict_options['unique_fields'] = [key_field]
+        model.objects.bulk_create(to_create, batch_size=batch_size, **conflict_options)
+
+    for changed_fields, objs in to_update.items():
+        model.objects.bulk_update(objs, list(changed_fields) + touch_fields, batch_size=batch_size)
+    if digest_only:
+        model.objects.bulk_update(digest_only, [digest_field], batch_size=batch_size)
+
+    return len(to_create), updated, unchanged
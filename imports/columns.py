@@ -0,0 +1,167 @@
+"""
+Column-wise normalisation of import chunks.
+
+Headers are mapped to canonical field names once per chunk and every column
+is coerced and validated as a whole with pandas, so the importers no longer
+do per-row lookups or per-cell conversions. Bad cells are found through the
+masks pandas returns and reported as ``Row N: ...`` messages.
+"""
+import re
+from decimal import ROUND_HALF_UP, Decimal
+
+import pandas as pd
+from django.core.exceptions import FieldDoesNotExist
+from django.core.validators import DecimalValidator, MaxLengthValidator
+from django.db import models
+
+TRUE_VALUES = {'true', 't', '1', 'yes', 'y', 'ya'}
+FALSE_VALUES = {'false', 'f', '0', 'no', 'n', 'tidak'}
+
+
+class ImportFileError(ValueError):
+    """An import file that cannot be processed at all, e.g. a required column is missing"""
+
+
+def normalize_header(value):
+    """Lower-case a header and collapse spaces, dashes and dots to underscores"""
+    return re.sub(r'[\s\-.]+', '_', str(value).strip().lower()).strip('_')
+
+
+def resolve_columns(df, aliases):
+    """
+    Rename the columns of ``df`` to canonical names.
+
+    ``aliases`` maps each canonical name to the other header spellings it
+    accepts (English or Indonesian); headers are compared after
+    normalize_header, so case and spacing do not matter. When several headers
+    map to the same canonical column, the first non-empty value wins, in alias
+    order. Columns without a matching alias are dropped.
+    """
+    lookup = {}
+    for canonical, names in aliases.items():
+        for priority, alias in enumerate([canonical, *names]):
+            lookup.setdefault(normalize_header(alias), (canonical, priority))
+
+    matches = {}
+    for column in df.columns:
+        match = lookup.get(normalize_header(column))
+        if match:
+            canonical, priority = match
+            matches.setdefault(canonical, []).append((priority, column))
+
+    resolved = pd.DataFrame(index=df.index)
+    for canonical, columns in matches.items():
+        ordered = [column for _, column in sorted(columns, key=lambda item: item[0])]
+        if len(ordered) == 1:
+            resolved[canonical] = df[ordered[0]]
+        else:
+            resolved[canonical] = df[ordered].replace('', None).bfill(axis=1).iloc[:, 0]
+    return resolved
+
+
+def _as_text(series):
+    """Strip string cells and turn blank cells into NA"""
+    text = series.astype('string').str.strip()
+    return text.mask(text == '')
+
+
+def _to_objects(series, convert=None):
+    """Object series with None for missing values, ready for to_dict()"""
+    values = series.astype(object).where(series.notna(), None)
+    if convert is not None:
+        values = pd.Series(
+            [None if value is None else convert(value) for value in values],
+            index=series.index, dtype=object
+        )
+    return values
+
+
+def _model_field(model, name):
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+def _clean_column(field, raw, report):
+    """Convert one text column to the python type of ``field``, reporting bad cells"""
+    if isinstance(field, (models.DecimalField, models.FloatField, models.IntegerField)):
+        numbers = pd.to_numeric(raw, errors='coerce')
+        invalid = raw.notna() & (numbers.isna() | (numbers.abs() == float('inf')))
+        if isinstance(field, models.IntegerField):
+            invalid |= numbers.notna() & (numbers % 1 != 0)
+        report(invalid, lambda index: field.error_messages['invalid'] % {'value': raw[index]})
+        numbers = numbers.mask(invalid)
+
+        if isinstance(field, models.DecimalField):
+            whole_digits = field.max_digits - field.decimal_places
+            too_large = numbers.notna() & (numbers.round(field.decimal_places).abs() >= 10 ** whole_digits)
+            report(too_large, lambda index: DecimalValidator.messages['max_whole_digits'] % {'max': whole_digits})
+            # Round the original text, not the float, so 12.345 becomes 12.35 as in the database
+            quantum = Decimal(1).scaleb(-field.decimal_places)
+            return _to_objects(
+                raw.mask(numbers.isna() | too_large),
+                lambda value: Decimal(value).quantize(quantum, rounding=ROUND_HALF_UP)
+            )
+        if isinstance(field, models.IntegerField):
+            return _to_objects(numbers, int)
+        return _to_objects(numbers)
+
+    if isinstance(field, models.BooleanField):
+        lowered = raw.str.lower()
+        flags = lowered.isin(TRUE_VALUES).mask(~lowered.isin(TRUE_VALUES | FALSE_VALUES))
+        invalid = raw.notna() & flags.isna()
+        report(invalid, lambda index: field.error_messages['invalid'] % {'value': raw[index]})
+        return _to_objects(flags.mask(invalid))
+
+    if isinstance(field, models.CharField) and field.max_length:
+        lengths = raw.str.len()
+        too_long = raw.notna() & (lengths > field.max_length)
+        validator = MaxLengthValidator(field.max_length)
+        report(too_long, lambda index: validator.message % {
+            'limit_value': field.max_length, 'show_value': lengths[index]
+        })
+    return _to_objects(raw)
+
+
+def clean_frame(model, df, fields, required=()):
+    """
+    Coerce and validate the ``fields`` columns of ``df`` against ``model``.
+
+    Columns named after a model field are converted to that field's type with
+    vectorised pandas operations; other columns are kept as stripped text.
+    Columns missing from the file are treated as empty, and empty cells of a
+    field with a default (e.g. ``active``) take that default. Returns the
+    valid rows and a list of ``(index, column, message)`` errors with at most
+    one error per row, in row order.
+    """
+    errors = {}
+    raw_columns = {
+        column: _as_text(df[column]) if column in df.columns else pd.Series(pd.NA, index=df.index, dtype='string')
+        for column in fields
+    }
+
+    # Required fields first, with the message the importers have always used
+    for column in required:
+        for index in df.index[raw_columns[column].isna()]:
+            errors.setdefault(index, (column, f"Missing required '{column}' field"))
+
+    result = pd.DataFrame(index=df.index)
+    for column in fields:
+        def report(mask, message, column=column):
+            for index in df.index[mask.fillna(False).astype(bool)]:
+                errors.setdefault(index, (column, f'{column}: {message(index)}'))
+
+        field = _model_field(model, column)
+        values = _clean_column(field, raw_columns[column], report)
+        if field is not None and field.has_default() and not callable(field.default):
+            values = values.where(values.notna(), field.default).astype(object)
+        result[column] = values
+
+    valid = result.drop(index=list(errors))
+    return valid, [(index, column, message) for index, (column, message) in sorted(errors.items())]
+
+
+def format_errors(errors):
+    """Render ``(index, column, message)`` errors as ``Row N: message`` strings"""
+    return [f'Row {int(index) + 1}: {message}' for index, _column, message in errors]
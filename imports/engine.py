@@ -0,0 +1,225 @@
+"""
+The import engine that runs every ImportSpec.
+
+An import is streamed one chunk at a time. For each chunk the engine:
+
+- maps the header aliases and coerces every column as a whole (clean_frame)
+- resolves each foreign key column in one query, for the values no earlier
+  chunk had
+- for keyed imports, drops rows repeating a key and skips the rows whose
+  stored digest matches, reading only keys and digests
+- writes the remaining rows in batches (bulk_upsert, or bulk_create for
+  imports without a natural key), or with the opt-in staging loader
+  through a staging table and one set-based merge (imports.staging)
+
+Each chunk is written in its own atomic block, so it is a savepoint when the
+caller holds a transaction and a commit when it does not; ``progress`` runs
+inside that block, so a checkpoint it records commits with the chunk. The
+checkpoint carries the state of the import - its counts, the rejected rows
+stored so far and the unknown foreign key values - from which a resumed run
+continues, so its result covers the whole file.
+Rejected rows go to a downloadable CSV report (RejectedRows).
+"""
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from .bulk import (
+    DEFAULT_BATCH_SIZE, bulk_upsert, chunked, drop_seen, fetch_existing_iexact, row_digests, skip_unchanged
+)
+from .columns import ImportFileError, clean_frame, resolve_columns
+from .models import DIGEST_FIELD
+from .readers import read_chunks
+from .rejects import RejectedRows
+from .staging import get_loader, staging_load, supports_staging
+
+
+class _ForeignKeyResolver:
+    """
+    Resolves the values of one ForeignKey column to primary keys, caching them for the whole file.
+
+    Values are matched case-insensitively, as the natural keys are by
+    fetch_existing_iexact, so 'tuna' names the species stored as 'Tuna' on
+    every database, whatever the collation of the lookup column.
+    """
+
+    def __init__(self, spec, foreign_key):
+        self.foreign_key = foreign_key
+        self.attname = spec.model._meta.get_field(foreign_key.field).attname
+        # Lower-cased value -> primary key
+        self.resolved = {}
+        # Lower-cased value -> the value as first spelled in the file
+        self.unknown = {}
+
+    def resolve(self, df, raw, rejects):
+        """Add the ``<field>_id`` column to ``df``; rows naming an unknown related row are rejected"""
+        foreign_key = self.foreign_key
+        values = df[foreign_key.column]
+        folded = values.where(values.isna(), values.astype(str).str.lower())
+        present = folded.dropna()
+        new_values = set(present) - self.resolved.keys() - self.unknown.keys()
+        # Only the looked-up value and the primary key are read
+        queryset = foreign_key.related_model.objects.annotate(lookup_lower=Lower(foreign_key.lookup_field))  # type: ignore
+        for batch in chunked(new_values):
+            self.resolved.update(queryset.filter(lookup_lower__in=batch).values_list('lookup_lower', 'pk'))
+        first = ~present.duplicated()
+        for key, value in zip(present[first], values[present.index][first]):
+            if key in new_values and key not in self.resolved:
+                self.unknown[key] = value
+
+        unknown = values.notna() & ~folded.isin(self.resolved.keys())
+        rejects.add(raw, [
+            (index, foreign_key.column, foreign_key.missing_message.format(value=value))
+            for index, value in values[unknown].items()
+        ])
+        df = df[~unknown]
+        return df.assign(**{self.attname: folded[~unknown].map(self.resolved).astype(object)})
+
+
+def _keyed_records(spec, df, counts):
+    """Records of a cleaned chunk keyed by the natural key, the last row winning for a repeated key"""
+    keys = df[spec.key].str.lower() if spec.key_iexact else df[spec.key]
+    duplicates = keys.duplicated(keep='last')
+    counts['duplicates'] += int(duplicates.sum())
+    df = df.loc[~duplicates, [spec.key, *spec.write_fields]]
+    df = df.assign(**{DIGEST_FIELD: row_digests(df, spec.write_fields)})
+    return dict(zip(keys[~duplicates], df.to_dict('records')))
+
+
+def _checkpoint_state(counts, rejects, resolvers):
+    """JSON-serialisable state of an import after a committed chunk, see run_import's ``resume``"""
+    return {
+        'counts': dict(counts),
+        'rejects': rejects.checkpoint(counts['rows']),
+        'unknown': {resolver.foreign_key.field: sorted(resolver.unknown.values()) for resolver in resolvers},
+    }
+
+
+def run_import(spec, chunks, progress=None, dry_run=False, start_row=0, loader=None, resume=None, owner=None):
+    """
+    Import the chunks of an import file or workbook sheet as described by ``spec``.
+
+    ``progress`` is called after each chunk with the number of rows read and
+    rejected so far and the state of the import at that checkpoint; the
+    rejected rows are then stored as a part of the report. ``start_row`` is
+    the first data row of ``chunks`` when a previous, interrupted run
+    already committed the rows before it, and ``resume`` the state of its
+    last checkpoint: its counts and rejected rows are carried on. Raises
+    ImportFileError when ``spec.require_header`` is set and the header lacks
+    a required column.
+
+    ``loader`` is ``orm`` or ``staging`` and defaults to the
+    IMPORT_BULK_LOADER setting; dry runs and specs the staging loader cannot
+    merge always use the ORM.
+
+    ``owner`` is the id of the user running the import; only that user (and
+    staff) can download its rejected-rows report.
+
+    With ``dry_run`` the file is validated and checked against the database
+    as for a real import, but nothing is written; rows whose key an earlier
+    chunk had count as updates, since the earlier chunk would have created
+    them.
+
+    Returns ``spec.summarize(counts, dry_run)`` with the error fields of the
+    rejected-rows report and the unknown foreign key values added.
+    """
+    resume = resume or {}
+    counts = {
+        'rows': start_row,
+        # Rows left after dropping rows repeating a key within a chunk
+        'processed': 0,
+        'created': 0,
+        'updated': 0,
+        'unchanged': 0,
+        # Rows repeating a key of the same chunk
+        'duplicates': 0,
+        # Dry runs only: rows repeating a key of an earlier chunk
+        'repeated': 0,
+        **resume.get('counts', {}),
+    }
+    use_staging = get_loader(loader) == 'staging' and not dry_run and supports_staging(spec)
+    rejects = RejectedRows(state=resume.get('rejects'), owner=owner)
+    resolvers = [_ForeignKeyResolver(spec, foreign_key) for foreign_key in spec.foreign_keys]
+    for resolver in resolvers:
+        unknown = resume.get('unknown', {}).get(resolver.foreign_key.field, [])
+        resolver.unknown.update((str(value).lower(), value) for value in unknown)
+    # Keys of earlier chunks, only kept for dry runs
+    seen_keys = set()
+
+    try:
+        for chunk_number, raw in enumerate(chunks):
+            counts['rows'] += len(raw)
+
+            # Map header aliases once per chunk; every chunk shares the header
+            df = resolve_columns(raw, spec.columns)
+            if spec.require_header and chunk_number == 0:
+                missing_columns = [column for column in spec.required if column not in df.columns]
+                if missing_columns:
+                    raise ImportFileError(f'Missing required columns: {missing_columns}')
+
+            # Coerce and validate whole columns at once
+            df, chunk_errors = clean_frame(spec.model, df, spec.clean_columns, required=spec.required)
+            rejects.add(raw, chunk_errors)
+            for resolver in resolvers:
+                df = resolver.resolve(df, raw, rejects)
+
+            if spec.key is None:
+                rows = df[spec.write_fields].to_dict('records')
+                with transaction.atomic():
+                    if use_staging:
+                        staging_load(spec, rows)
+                    elif not dry_run:
+                        spec.model.objects.bulk_create(  # type: ignore
+                            [spec.model(**values) for values in rows], batch_size=DEFAULT_BATCH_SIZE
+                        )
+                    counts['processed'] += len(rows)
+                    counts['created'] += len(rows)
+                    if progress:
+                        progress(counts['rows'], rejects.count, _checkpoint_state(counts, rejects, resolvers))
+                continue
+
+            records = _keyed_records(spec, df, counts)
+            counts['processed'] += len(records)
+            if dry_run:
+                records, chunk_repeated = drop_seen(records, seen_keys)
+                counts['repeated'] += chunk_repeated
+
+            # Rows whose stored digest matches are skipped without loading them
+            records, chunk_skipped = skip_unchanged(spec.model, records, spec.key, iexact=spec.key_iexact)
+            counts['unchanged'] += chunk_skipped
+
+            # Only new and changed rows are written; a case-insensitive key keeps the stored spelling
+            with transaction.atomic():
+                if use_staging:
+                    chunk_created, chunk_updated, chunk_unchanged = staging_load(spec, records)
+                else:
+                    existing = fetch_existing_iexact(spec.model, spec.key, records.keys()) if spec.key_iexact else None
+                    chunk_created, chunk_updated, chunk_unchanged = bulk_upsert(
+                        spec.model, records, spec.key, spec.write_fields,
+                        existing=existing, digest_field=DIGEST_FIELD, dry_run=dry_run
+                    )
+                counts['created'] += chunk_created
+                counts['updated'] += chunk_updated
+                counts['unchanged'] += chunk_unchanged
+                if progress:
+                    progress(counts['rows'], rejects.count, _checkpoint_state(counts, rejects, resolvers))
+
+        rejects.close()
+    finally:
+        # Nothing is stored for a failed import, and its temporary file is removed
+        rejects.discard()
+    result = {**spec.summarize(counts, dry_run), **rejects.summary()}
+    for resolver in resolvers:
+        if resolver.foreign_key.unknown_key:
+            result[resolver.foreign_key.unknown_key] = sorted(resolver.unknown.values())
+    return result
+
+
+def import_file(spec, file, progress=None, dry_run=False, start_row=0, loader=None, resume=None, owner=None):
+    """Import an uploaded CSV, .csv.gz, zip archive or Excel file as described by ``spec``, see run_import"""
+    if file.name.lower().endswith('.zip'):
+        # imports.archives runs its members through run_import
+        from .archives import import_archive
+        return import_archive(spec, file, progress, dry_run, start_row, loader, resume, owner)
+    return run_import(
+        spec, read_chunks(file, start_row=start_row), progress, dry_run, start_row, loader, resume, owner
+    )
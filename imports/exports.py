@@ -0,0 +1,106 @@
+"""
+Streaming exports of the imported tables.
+
+An export has the columns of the matching import (ImportSpec.export_lookups),
+so an exported file can be imported again as it is. Rows are read as plain
+tuples with ``values_list`` - no model instances are built - in batches of
+EXPORT_CHUNK_SIZE rows, and every batch is encoded and sent before the next
+one is read, so the first bytes go out immediately and memory does not grow
+with the size of the table.
+
+Batches are read by primary key ranges (keyset) rather than with
+``QuerySet.iterator()``: the MySQL driver buffers the whole result set of
+a query client-side, so a single iterated query would still hold every row.
+
+XLSX exports are written with an openpyxl write-only workbook, which keeps
+only the current row in memory, and saved to a temporary file that is then
+sent; the sheet is titled with the import kind, so the multi-sheet workbook
+import recognises it too. NDJSON exports stream one JSON object per line.
+"""
+import csv
+import tempfile
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from openpyxl import Workbook
+
+
+def get_export_chunk_size():
+    """Rows read per query by the exports, configurable with EXPORT_CHUNK_SIZE"""
+    return getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+
+def iter_values(queryset, lookups, chunk_size=None):
+    """Yield the ``lookups`` of every row of ``queryset`` as tuples, in primary key order"""
+    chunk_size = chunk_size or get_export_chunk_size()
+    queryset = queryset.order_by('pk').values_list('pk', *lookups)
+    last_pk = None
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(batch[:chunk_size])
+        for row in rows:
+            yield row[1:]
+        if len(rows) < chunk_size:
+            return
+        last_pk = rows[-1][0]
+
+
+def export_value(value):
+    """A cell value as the importers read it back: blank for null, true/false for booleans"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return value
+
+
+class _Echo:
+    """A file whose write returns what was written, so csv.writer produces lines one at a time"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(spec, queryset, chunk_size=None):
+    """Yield the CSV export of ``queryset`` with the columns of ``spec``, one encoded line at a time"""
+    writer = csv.writer(_Echo())
+    columns = spec.export_lookups
+    yield writer.writerow([column for column, _lookup in columns]).encode('utf-8')
+    for row in iter_values(queryset, [lookup for _column, lookup in columns], chunk_size):
+        yield writer.writerow([export_value(value) for value in row]).encode('utf-8')
+
+
+def iter_ndjson(queryset, fields, converters=None, chunk_size=None):
+    """
+    Yield ``fields`` of every row of ``queryset`` as NDJSON, one encoded object per line.
+
+    ``converters`` maps a field to a function applied to its value, e.g. to
+    send a JSON text column as real JSON. Converters must not produce NaN or
+    infinite floats: they have no JSON form and raise ValueError.
+    """
+    converters = converters or {}
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'), allow_nan=False)
+    for row in iter_values(queryset, fields, chunk_size):
+        item = {
+            field: converters[field](value) if field in converters else value
+            for field, value in zip(fields, row)
+        }
+        yield (encoder.encode(item) + '\n').encode('utf-8')
+
+
+def write_xlsx(spec, queryset, chunk_size=None):
+    """Write the XLSX export of ``queryset`` with the columns of ``spec`` to a temporary file, rewound"""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(spec.kind)
+    columns = spec.export_lookups
+    sheet.append([column for column, _lookup in columns])
+    for row in iter_values(queryset, [lookup for _column, lookup in columns], chunk_size):
+        sheet.append(row)
+    output = tempfile.TemporaryFile(suffix='.xlsx')
+    try:
+        workbook.save(output)
+    except Exception:
+        output.close()
+        raise
+    output.seek(0)
+    return output
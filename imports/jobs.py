@@ -0,0 +1,209 @@
+"""
+Background and chunked-commit import jobs.
+
+An import endpoint called with ``?async=1`` stores the upload as an ImportJob
+and answers 202 straight away; ``python manage.py run_import_worker`` claims
+pending jobs one at a time and runs the same importer the synchronous
+endpoint uses. With ``?commit=chunk`` the job runs in the request instead.
+
+Either way every chunk commits in its own transaction together with the
+job's checkpoint, so a job that failed or whose worker was killed can be
+resumed and continues after the last committed row.
+
+The stored upload is deleted once its job completes; the upload of a failed
+job is kept for a resume until the worker's retention sweep
+(purge_expired_uploads) deletes it IMPORT_JOB_RETENTION_DAYS later.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .engine import import_file
+from .models import ImportJob
+from .options import query_flag
+from .specs import get_spec
+
+logger = logging.getLogger(__name__)
+
+
+def is_async_request(request):
+    """True when the client asked for a background import with ?async=1"""
+    return query_flag(request, 'async')
+
+
+def is_chunked_commit_request(request):
+    """True when the client asked for one transaction per chunk with ?commit=chunk"""
+    return request.query_params.get('commit', '').lower() == 'chunk'
+
+
+def create_job(kind, file, user=None):
+    """Store the uploaded file and queue a pending job for the worker"""
+    return ImportJob.objects.create(  # type: ignore
+        kind=kind,
+        file=file,
+        created_by=user if user is not None and user.is_authenticated else None
+    )
+
+
+def user_jobs(user):
+    """Jobs ``user`` may see and resume: their own, or every job for staff"""
+    jobs = ImportJob.objects.all()  # type: ignore
+    if not user.is_staff:
+        jobs = jobs.filter(created_by=user)
+    return jobs
+
+
+def job_status_url(request, job):
+    return request.build_absolute_uri(reverse('imports:import-job-detail', args=[job.pk]))
+
+
+def job_accepted_data(request, job):
+    """Body of the 202 response returned for a queued job"""
+    return {
+        'message': 'Import queued',
+        'job_id': job.pk,
+        'status': job.status,
+        'status_url': job_status_url(request, job),
+    }
+
+
+def claim_next_job():
+    """
+    Mark the oldest pending job as running and return it, or None.
+
+    The status is switched with a conditional UPDATE, so when several workers
+    poll the same table only one of them gets each job.
+    """
+    pending = ImportJob.objects.filter(status='pending').order_by('created_at', 'pk')  # type: ignore
+    for job in pending[:10]:
+        if claim_job(job):
+            return job
+    return None
+
+
+def claim_job(job):
+    """Mark a pending job as running for this process; False if someone else got it"""
+    now = timezone.now()
+    claimed = ImportJob.objects.filter(pk=job.pk, status='pending').update(  # type: ignore
+        status='running', started_at=now, updated_at=now
+    )
+    if claimed:
+        job.status, job.started_at = 'running', now
+    return bool(claimed)
+
+
+def is_resumable(job):
+    """
+    A failed job, or a running job whose worker stopped reporting progress
+    for IMPORT_JOB_STALE_SECONDS (e.g. because it was killed)
+    """
+    if not job.file:
+        # The upload was deleted by the retention sweep
+        return False
+    if job.status == 'failed':
+        return True
+    stale_after = timedelta(seconds=getattr(settings, 'IMPORT_JOB_STALE_SECONDS', 600))
+    return job.status == 'running' and job.updated_at < timezone.now() - stale_after
+
+
+def resume_job(job):
+    """Queue a failed or stale job again; the worker continues from its checkpoint"""
+    resumed = ImportJob.objects.filter(pk=job.pk, status=job.status, updated_at=job.updated_at).update(  # type: ignore
+        status='pending', message=None, finished_at=None, updated_at=timezone.now()
+    )
+    if resumed:
+        job.refresh_from_db()
+    return bool(resumed)
+
+
+def run_job(job):
+    """Run the import of a claimed job and store its result"""
+    spec = get_spec(job.kind)
+
+    def progress(rows_processed, error_count, state):
+        # Runs inside the chunk's transaction, so the checkpoint commits with its rows
+        ImportJob.objects.filter(pk=job.pk).update(  # type: ignore
+            rows_processed=rows_processed, checkpoint_offset=rows_processed, checkpoint_state=state,
+            error_count=error_count, updated_at=timezone.now()
+        )
+        job.rows_processed = job.checkpoint_offset = rows_processed
+        job.checkpoint_state = state
+        job.error_count = error_count
+
+    start_row = job.checkpoint_offset
+    try:
+        with job.file.open('rb') as file:
+            # A resumed job carries on the counts and rejected rows of the interrupted run
+            result = import_file(
+                spec, file, progress=progress, start_row=start_row, resume=job.checkpoint_state, owner=job.created_by_id
+            )
+    except Exception as e:
+        logger.exception('Import job %s failed', job.pk)
+        job.status = 'failed'
+        job.message = str(e)
+    else:
+        job.status = 'completed'
+        # The first row errors are kept in their own field rather than twice
+        job.errors = result.pop('errors', [])
+        job.error_count = result.get('error_count', len(job.errors))
+        if start_row:
+            result['resumed_from_row'] = start_row + 1
+        job.result = result
+        job.message = result.get('message')
+        job.checkpoint_state = None
+        # A completed job is never resumed, so its upload is not needed any more
+        job.file.delete(save=False)
+    job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+def get_retention_days():
+    """Days the upload of a failed job is kept for a resume, configurable with IMPORT_JOB_RETENTION_DAYS"""
+    return getattr(settings, 'IMPORT_JOB_RETENTION_DAYS', 7)
+
+
+def purge_expired_uploads():
+    """
+    Delete the uploads of jobs that finished more than IMPORT_JOB_RETENTION_DAYS
+    ago; their jobs can no longer be resumed. Returns the number deleted.
+    """
+    cutoff = timezone.now() - timedelta(days=get_retention_days())
+    expired = ImportJob.objects.filter(finished_at__lt=cutoff).exclude(file='')  # type: ignore
+    purged = 0
+    for job in expired.exclude(status__in=('pending', 'running')):
+        job.file.delete(save=False)
+        ImportJob.objects.filter(pk=job.pk).update(file='')  # type: ignore
+        purged += 1
+    return purged
+
+
+def run_job_now(job):
+    """Claim a freshly created job and run it in this process, e.g. for ?commit=chunk"""
+    claim_job(job)
+    return run_job(job)
+
+
+def chunked_import_response_data(request, job):
+    """
+    Body of the response to a ?commit=chunk import that ran in the request.
+
+    Returns the body and whether the import failed; a failed job keeps its
+    checkpoint and can be resumed from resume_url.
+    """
+    job_data = {
+        'job_id': job.pk,
+        'status': job.status,
+        'checkpoint_offset': job.checkpoint_offset,
+        'status_url': job_status_url(request, job),
+    }
+    if job.status == 'failed':
+        return {
+            'error': f'Failed to process file: {job.message}',
+            'resume_url': request.build_absolute_uri(reverse('imports:import-job-resume', args=[job.pk])),
+            **job_data
+        }, True
+    return {**job.result, 'errors': job.errors, **job_data}, False
@@ -0,0 +1,67 @@
+import json
+from contextlib import nullcontext
+from django.core.management.base import BaseCommand, CommandError
+from imports.benchmark import (
+    BENCHMARK_KINDS, DEFAULT_SIZES, FORMATS, benchmark_database, compare_reports, failed_cases, run_benchmark
+)
+
+class Command(BaseCommand):
+    help = 'Benchmark the import views with synthetic CSV and XLSX files'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--kinds', nargs='+', choices=list(BENCHMARK_KINDS), help='Import kinds to benchmark (default: all)')
+        parser.add_argument('--formats', nargs='+', choices=FORMATS, help='File formats to benchmark (default: all)')
+        parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES, help='Row counts of the generated files')
+        parser.add_argument('--output', help='Write the JSON report to this file')
+        parser.add_argument('--baseline', help='Compare the run with this JSON report and fail on regressions')
+        parser.add_argument('--tolerance', type=float, default=0.1, help='Relative change allowed before a metric counts as a regression')
+        parser.add_argument('--no-trace-memory', action='store_true', help='Skip tracemalloc, which slows the imports down, to measure raw throughput')
+        parser.add_argument('--use-database', action='store_true', help='Run against the configured database instead of a throwaway test database (every case is still rolled back)')
+    
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as baseline_file:
+                baseline = json.load(baseline_file)
+        
+        with nullcontext() if options['use_database'] else benchmark_database():
+            report = run_benchmark(
+                kinds=options['kinds'],
+                formats=options['formats'],
+                sizes=options['sizes'],
+                trace_memory=not options['no_trace_memory'],
+                progress=self._write_case
+            )
+        
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+        
+        failed = failed_cases(report)
+        for case in failed:
+            self.stdout.write(self.style.ERROR(
+                f"{case['kind']}/{case['format']}/{case['rows']} failed with HTTP {case['status_code']}: {case.get('error')}"
+            ))
+        
+        if baseline is not None:
+            regressions = [comparison for comparison in compare_reports(report, baseline, options['tolerance']) if comparison['regression']]
+            for comparison in regressions:
+                change = f"{comparison['change']:+.1%}" if comparison['change'] is not None else 'failed'
+                self.stdout.write(self.style.ERROR(
+                    f"{comparison['case']} {comparison['metric']}: {comparison['baseline']} -> {comparison['current']} ({change})"
+                ))
+            if regressions:
+                raise CommandError(f'{len(regressions)} metrics regressed against the baseline')
+        if failed:
+            raise CommandError(f'{len(failed)} benchmark cases failed')
+        if baseline is not None:
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
+    
+    def _write_case(self, case):
+        memory = f"{case['peak_memory_bytes'] / 1024 / 1024:.1f} MiB" if case['peak_memory_bytes'] is not None else 'n/a'
+        throughput = f"{case['rows_per_second']:>10} rows/s" if not case['failed'] else f"{'FAILED':>17}"
+        self.stdout.write(
+            f"{case['kind']:<14} {case['format']:<5} {case['rows']:>8} rows: {case['seconds']:>8.3f}s "
+            f"{throughput} {case['queries']:>6} queries {memory} peak (HTTP {case['status_code']})"
+        )
@@ -0,0 +1,29 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from imports.columns import ImportFileError
+from imports.engine import import_file
+from imports.specs import IMPORT_SPECS, get_spec
+from imports.staging import LOADERS
+
+class Command(BaseCommand):
+    help = 'Import a CSV or Excel file from disk, e.g. for a backfill too large to upload'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(IMPORT_SPECS), help='What the file contains')
+        parser.add_argument('path', help='Path of the .csv, .csv.gz, .zip or .xlsx file')
+        parser.add_argument('--loader', choices=LOADERS, help='How rows are written (default: the IMPORT_BULK_LOADER setting)')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without saving anything')
+    
+    def handle(self, *args, **options):
+        spec = get_spec(options['kind'])
+        if not options['path'].endswith(spec.extensions):
+            raise CommandError('Unsupported file format. Please use a CSV or Excel file.')
+        
+        try:
+            with open(options['path'], 'rb') as file, transaction.atomic():
+                result = import_file(spec, file, dry_run=options['dry_run'], loader=options['loader'])
+        except (OSError, ImportFileError) as e:
+            raise CommandError(str(e))
+        
+        self.stdout.write(json.dumps(result, indent=2, default=str))
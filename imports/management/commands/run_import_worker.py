@@ -0,0 +1,41 @@
+import time
+from django.core.management.base import BaseCommand
+from imports.jobs import claim_next_job, purge_expired_uploads, run_job
+from imports.rejects import purge_expired_reports
+
+class Command(BaseCommand):
+    help = 'Process queued background import jobs'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Process the queued jobs and exit instead of polling')
+        parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds to wait between polls when the queue is empty')
+        parser.add_argument('--purge-interval', type=float, default=3600.0, help='Seconds between sweeps deleting expired import files')
+    
+    def purge(self):
+        purged = purge_expired_uploads()
+        if purged:
+            self.stdout.write(f'Deleted {purged} expired import uploads')
+        purged = purge_expired_reports()
+        if purged:
+            self.stdout.write(f'Deleted {purged} expired rejected-rows reports')
+    
+    def handle(self, *args, **options):
+        self.purge()
+        last_purge = time.monotonic()
+        while True:
+            job = claim_next_job()
+            if job is None:
+                if options['once']:
+                    break
+                if time.monotonic() - last_purge >= options['purge_interval']:
+                    self.purge()
+                    last_purge = time.monotonic()
+                time.sleep(options['poll_interval'])
+                continue
+            
+            self.stdout.write(f'Running import job {job.pk} ({job.kind})...')
+            job = run_job(job)
+            if job.status == 'completed':
+                self.stdout.write(self.style.SUCCESS(f'Import job {job.pk} completed: {job.rows_processed} rows, {job.error_count} errors'))  # type: ignore
+            else:
+                self.stdout.write(self.style.ERROR(f'Import job {job.pk} failed: {job.message}'))  # type: ignore
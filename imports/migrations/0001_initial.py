@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('ships', 'Kapal'), ('fish_species', 'Jenis Ikan'), ('fish', 'Ikan'), ('fishing_areas', 'Wilayah Penangkapan')], max_length=20, verbose_name='Jenis Impor')),
+                ('file', models.FileField(upload_to='imports/', verbose_name='File')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20, verbose_name='Status')),
+                ('rows_processed', models.PositiveIntegerField(default=0, verbose_name='Baris Diproses')),
+                ('error_count', models.PositiveIntegerField(default=0, verbose_name='Jumlah Error')),
+                ('errors', models.JSONField(blank=True, default=list, verbose_name='Error')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='Hasil')),
+                ('message', models.TextField(blank=True, null=True, verbose_name='Pesan')),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='import_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Dibuat Oleh')),
+            ],
+            options={
+                'verbose_name': 'Pekerjaan Impor',
+                'verbose_name_plural': 'Pekerjaan Impor',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='checkpoint_offset',
+            field=models.PositiveIntegerField(default=0, verbose_name='Checkpoint'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 22:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imports', '0002_importjob_checkpoint_offset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='checkpoint_state',
+            field=models.JSONField(blank=True, null=True, verbose_name='Status Checkpoint'),
+        ),
+    ]
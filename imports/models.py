@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+# Column holding the digest of a row's importable fields, see imports.bulk.row_digests
+DIGEST_FIELD = 'import_digest'
+
+
+class ImportDigestModel(models.Model):
+    """
+    Abstract base for models maintained by the bulk importers.
+
+    The importers store a digest of the imported values with each row and skip
+    rows whose digest has not changed on re-import. Saving a row any other way
+    (API, admin) clears the digest, so the next import compares and rewrites
+    it instead of trusting a digest that no longer matches the row.
+    """
+    import_digest = models.CharField(max_length=32, blank=True, null=True, editable=False)
+
+    def save(self, *args, **kwargs):
+        self.import_digest = None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and DIGEST_FIELD not in update_fields:
+            kwargs['update_fields'] = [*update_fields, DIGEST_FIELD]
+        super().save(*args, **kwargs)
+
+    class Meta:
+        abstract = True
+
+
+class ImportJob(models.Model):
+    """
+    An uploaded import file processed in the background by the import worker
+    (``python manage.py run_import_worker``) or chunk by chunk in the request
+    (``?commit=chunk``); either way each chunk commits with the checkpoint
+    """
+    KIND_CHOICES = (
+        ('ships', 'Kapal'),
+        ('fish_species', 'Jenis Ikan'),
+        ('fish', 'Ikan'),
+        ('fishing_areas', 'Wilayah Penangkapan'),
+    )
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name="Jenis Impor")
+    file = models.FileField(upload_to='imports/', verbose_name="File")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="Status")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, blank=True, null=True,
+        related_name='import_jobs', verbose_name="Dibuat Oleh"
+    )
+    rows_processed = models.PositiveIntegerField(default=0, verbose_name="Baris Diproses")  # type: ignore
+    # Data rows committed so far; a resumed job starts reading after them
+    checkpoint_offset = models.PositiveIntegerField(default=0, verbose_name="Checkpoint")  # type: ignore
+    # Counts and rejected-rows report of the committed rows, carried on by a resumed job
+    checkpoint_state = models.JSONField(blank=True, null=True, verbose_name="Status Checkpoint")
+    error_count = models.PositiveIntegerField(default=0, verbose_name="Jumlah Error")  # type: ignore
+    errors = models.JSONField(default=list, blank=True, verbose_name="Error")
+    result = models.JSONField(blank=True, null=True, verbose_name="Hasil")
+    message = models.TextField(blank=True, null=True, verbose_name="Pesan")
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.status})"  # type: ignore
+
+    @property
+    def rows_per_second(self):
+        """Average throughput since the worker picked the job up"""
+        if not self.started_at:
+            return None
+        elapsed = ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+        if elapsed <= 0:
+            return None
+        return round(self.rows_processed / elapsed, 1)
+
+    class Meta:
+        verbose_name = "Pekerjaan Impor"
+        verbose_name_plural = "Pekerjaan Impor"
+        ordering = ['-created_at']
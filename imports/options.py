@@ -0,0 +1,13 @@
+"""Query-string switches shared by the import endpoints"""
+
+TRUE_FLAGS = ('1', 'true', 'yes')
+
+
+def query_flag(request, name):
+    """True when the query parameter ``name`` is 1/true/yes"""
+    return request.query_params.get(name, '').lower() in TRUE_FLAGS
+
+
+def is_dry_run_request(request):
+    """True when the client only wants the file validated with ?dry_run=1"""
+    return query_flag(request, 'dry_run')
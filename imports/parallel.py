@@ -0,0 +1,185 @@
+"""
+Worker processes for parsing multi-part imports.
+
+Parsing is the CPU-bound part of an import, so the parts of a multi-sheet
+workbook or a zip archive are parsed in parallel worker processes, while
+the parsed chunks are still written one part at a time in the request's
+transaction. The workers use the spawn start method, because forking a web
+worker that holds database connections and threads is not safe.
+
+PartParser streams the chunks of each part from its worker process through
+a bounded queue, so a worker parsing ahead of the part being written holds
+at most IMPORT_PARSE_QUEUE_CHUNKS parsed chunks and memory does not grow
+with the size of a sheet or file. With one process the parts are read in
+the calling process as they are consumed, like a plain file import.
+"""
+import multiprocessing
+import os
+import pickle
+import queue as queues
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+def get_process_count(task_count):
+    """Worker processes for parsing, capped by IMPORT_PARSE_PROCESSES and the number of parts"""
+    limit = getattr(settings, 'IMPORT_PARSE_PROCESSES', None) or os.cpu_count() or 1
+    return max(1, min(limit, task_count))
+
+
+def get_queue_chunks():
+    """Parsed chunks a worker process may hold ahead of the importer, configurable with IMPORT_PARSE_QUEUE_CHUNKS"""
+    return getattr(settings, 'IMPORT_PARSE_QUEUE_CHUNKS', 2)
+
+
+def _timed_chunks(chunks):
+    """Yield ``(chunk, seconds spent producing it)`` for the chunks of a parser"""
+    while True:
+        started = time.perf_counter()
+        chunk = next(chunks, None)
+        seconds = time.perf_counter() - started
+        if chunk is None:
+            return
+        yield chunk, seconds
+
+
+def _parse_into_queue(queue, parse, args):
+    """Worker process: put the chunks of ``parse(*args)`` on ``queue``, then ('done', seconds) or ('error', exception)"""
+    total = 0.0
+    try:
+        for chunk, seconds in _timed_chunks(parse(*args)):
+            total += seconds
+            queue.put(('chunk', chunk))
+    except Exception as e:
+        try:
+            pickle.dumps(e)
+        except Exception:
+            e = RuntimeError(str(e))
+        queue.put(('error', e))
+    else:
+        queue.put(('done', total))
+
+
+class ParsedPart:
+    """
+    The chunks of one part, iterated once as they are parsed.
+
+    Once the chunks have been consumed, ``rows`` is their number of rows,
+    ``seconds`` the time spent parsing them (without the time a worker
+    waited for the importer) and ``waited`` the time the consumer waited
+    for them.
+    """
+
+    def __init__(self, parse, args):
+        self.parse = parse
+        self.args = args
+        self.rows = 0
+        self.seconds = 0.0
+        self.waited = 0.0
+        self.process = None
+        self.queue = None
+
+    def start(self, context, queue_chunks):
+        """Parse the part in a worker process of ``context``"""
+        self.queue = context.Queue(queue_chunks)
+        self.process = context.Process(target=_parse_into_queue, args=(self.queue, self.parse, self.args), daemon=True)
+        self.process.start()
+
+    def __iter__(self):
+        if self.process is None:
+            for chunk, seconds in _timed_chunks(self.parse(*self.args)):
+                self.seconds += seconds
+                self.waited += seconds
+                self.rows += len(chunk)
+                yield chunk
+            return
+        while True:
+            started = time.perf_counter()
+            kind, value = self._get()
+            self.waited += time.perf_counter() - started
+            if kind == 'chunk':
+                self.rows += len(value)
+                yield value
+            elif kind == 'error':
+                raise value
+            else:
+                self.seconds = value
+                self.process.join()
+                return
+
+    def _get(self):
+        """Next item from the worker; a worker that died without finishing (e.g. killed) is an error"""
+        while True:
+            try:
+                return self.queue.get(timeout=1)
+            except queues.Empty:
+                if self.process.is_alive():
+                    continue
+            # Whatever the worker put before exiting is in the pipe by now
+            try:
+                return self.queue.get(timeout=1)
+            except queues.Empty:
+                raise RuntimeError(f'The parser process stopped with exit code {self.process.exitcode}')
+
+    def stop(self):
+        if self.process is not None:
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process.join()
+            self.queue.close()
+
+
+class PartParser:
+    """
+    Parses the parts ``parse(*args)`` of one upload, one ``args`` per part.
+
+    Iterating yields a ParsedPart per part in order; while one part is
+    consumed, the next parts (up to the process count in total) are parsed
+    ahead in worker processes. Use as a context manager, so workers still
+    parsing when the import stops are terminated.
+    """
+
+    def __init__(self, parse, arguments):
+        self.parts = [ParsedPart(parse, args) for args in arguments]
+        self.processes = get_process_count(len(self.parts))
+        self.context = multiprocessing.get_context('spawn') if self.processes > 1 else None
+        self.started = 0
+
+    def __iter__(self):
+        for index, part in enumerate(self.parts):
+            if self.context is not None:
+                # The part being consumed and the next ones, up to the process count, are parsing
+                while self.started < min(index + self.processes, len(self.parts)):
+                    self.parts[self.started].start(self.context, get_queue_chunks())
+                    self.started += 1
+            yield part
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        for part in self.parts:
+            part.stop()
+
+
+@contextmanager
+def upload_path(file, suffix):
+    """
+    Path of an uploaded file on disk, for readers that need one (worker processes, zip).
+
+    Uploads spooled by the upload handler already have one; others are copied
+    to a temporary file that is removed again on exit.
+    """
+    if hasattr(file, 'temporary_file_path'):
+        yield file.temporary_file_path()
+        return
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as copy:
+        for chunk in file.chunks() if hasattr(file, 'chunks') else [file.read()]:
+            copy.write(chunk)
+    try:
+        yield copy.name
+    finally:
+        os.unlink(copy.name)
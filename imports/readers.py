@@ -0,0 +1,181 @@
+"""
+Chunked readers for uploaded import files.
+
+Each reader yields pandas DataFrames of at most ``chunk_size`` rows, so the
+importers validate and write one chunk before the next one is read and the
+memory used by an import does not grow with the size of the file. The index
+of every chunk continues where the previous chunk stopped, so ``index + 1``
+is still the row number in the file.
+
+CSV files may be gzip-compressed (``.csv.gz``); they are decompressed while
+they are read, so the uncompressed file is never held in memory or on disk.
+"""
+import gzip
+import io
+import itertools
+import zipfile
+
+import pandas as pd
+from django.conf import settings
+from openpyxl import load_workbook
+
+from .columns import ImportFileError
+
+CSV_EXTENSIONS = ('.csv', '.csv.gz')
+
+
+def get_chunk_size():
+    """Rows per chunk, configurable with the IMPORT_CHUNK_SIZE setting"""
+    return getattr(settings, 'IMPORT_CHUNK_SIZE', 5000)
+
+
+def open_csv(file, name=None):
+    """A binary stream of the CSV text of ``file``, decompressing it on the fly when ``name`` ends in .gz"""
+    name = (name or getattr(file, 'name', None) or '').lower()
+    if name.endswith('.gz'):
+        return gzip.GzipFile(fileobj=file, mode='rb')
+    return file
+
+
+def read_csv_chunks(file, chunk_size=None):
+    """
+    Yield DataFrames from a CSV file without loading the whole file.
+
+    Cells are read as text; imports.columns.clean_frame converts each column
+    to its field type, so pandas does not guess dtypes chunk by chunk.
+    """
+    yield from pd.read_csv(file, chunksize=chunk_size or get_chunk_size(), dtype=str)
+
+
+def _header_names(header_row):
+    """Column names for a sheet header, named the way pandas names blank headers"""
+    return [
+        str(value).strip() if value is not None else f'Unnamed: {position}'
+        for position, value in enumerate(header_row)
+    ]
+
+
+def read_xlsx_chunks(file, chunk_size=None, sheet_name=None):
+    """
+    Yield DataFrames from a sheet of an .xlsx workbook, the first one by default.
+
+    The workbook is opened with openpyxl in read-only mode and its rows are
+    iterated lazily, so only one chunk of rows is held in memory at a time
+    and the first chunk is available before the rest of the sheet is parsed.
+    Fully blank rows are skipped, as pandas does.
+    """
+    chunk_size = chunk_size or get_chunk_size()
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name is not None else workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        header_row = next(rows, None)
+        if header_row is None:
+            return
+        columns = _header_names(header_row)
+        width = len(columns)
+        offset = 0
+        chunk = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            chunk.append((tuple(row) + (None,) * width)[:width])
+            if len(chunk) == chunk_size:
+                yield pd.DataFrame(chunk, columns=columns, index=range(offset, offset + len(chunk)))
+                offset += len(chunk)
+                chunk = []
+        if chunk or offset == 0:
+            yield pd.DataFrame(chunk, columns=columns, index=range(offset, offset + len(chunk)))
+    finally:
+        workbook.close()
+
+
+class SizeLimitedStream(io.RawIOBase):
+    """
+    A binary stream reading ``stream`` that fails once more than ``limit`` bytes were read.
+
+    Counts the decompressed bytes of an archive member, so a zip or gzip bomb
+    is stopped by ImportFileError instead of being read until memory runs out.
+    """
+
+    def __init__(self, stream, limit):
+        self.stream = stream
+        self.limit = limit
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.stream.read(len(buffer))
+        self.bytes_read += len(data)
+        if self.bytes_read > self.limit:
+            raise ImportFileError(f'The file is larger than the {self.limit} bytes allowed for it uncompressed.')
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def read_archive_member(path, member, chunk_size=None, max_size=None):
+    """
+    Yield DataFrames from a CSV (or .csv.gz) member of the zip archive at ``path``, decompressing it as it is read.
+
+    With ``max_size``, reading more than that many decompressed bytes raises
+    ImportFileError. Runs in the parser processes of the archive importer,
+    so it only takes picklable arguments and does not touch settings.
+    """
+    with zipfile.ZipFile(path) as archive, archive.open(member) as stream:
+        stream = open_csv(stream, member)
+        if max_size is not None:
+            stream = SizeLimitedStream(stream, max_size)
+        yield from read_csv_chunks(stream, chunk_size)
+
+
+def read_xls_chunks(file, chunk_size=None):
+    """Yield DataFrames from a legacy .xls workbook, which openpyxl cannot stream"""
+    chunk_size = chunk_size or get_chunk_size()
+    df = pd.read_excel(file)
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+def skip_rows(chunks, start_row):
+    """Drop the rows before ``start_row`` (a 0-based data row index) from a chunk iterator"""
+    for chunk in chunks:
+        if len(chunk) and chunk.index[-1] < start_row:
+            continue
+        yield chunk[chunk.index >= start_row]
+
+
+def skip_to_row(chunks, start_row):
+    """
+    Drop the rows before ``start_row`` from a chunk iterator, reading only as far as that row.
+
+    Returns the number of rows dropped - ``start_row``, or fewer when the
+    chunks end before it - and an iterator of the remaining chunks.
+    """
+    dropped = 0
+    for chunk in chunks:
+        if len(chunk) and chunk.index[-1] >= start_row:
+            return start_row, itertools.chain([chunk[chunk.index >= start_row]], chunks)
+        dropped += len(chunk)
+    return dropped, iter(())
+
+
+def read_chunks(file, chunk_size=None, start_row=0):
+    """
+    Yield DataFrames of at most ``chunk_size`` rows from an uploaded CSV, .csv.gz or Excel file.
+
+    With ``start_row``, rows before that data row are skipped, e.g. to resume
+    an import from its last checkpoint; row numbers are unchanged. Raises
+    ValueError for an unsupported file extension.
+    """
+    name = file.name.lower()
+    if name.endswith(CSV_EXTENSIONS):
+        chunks = read_csv_chunks(open_csv(file, name), chunk_size)
+    elif name.endswith('.xlsx'):
+        chunks = read_xlsx_chunks(file, chunk_size)
+    elif name.endswith('.xls'):
+        chunks = read_xls_chunks(file, chunk_size)
+    else:
+        raise ValueError('Unsupported file format. Please upload CSV or Excel file.')
+    return skip_rows(chunks, start_row) if start_row else chunks
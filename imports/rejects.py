@@ -0,0 +1,203 @@
+"""
+Rejected-rows reports for the importers.
+
+Instead of collecting one error string per failing row in memory and
+returning them all in the JSON body, the importers hand every rejected row
+to a RejectedRows report. Rejected rows are written to a CSV file as they
+are found (row number, column, reason and the row as it appeared in the
+file); the response only carries the error count, the first few messages
+and the URL the full report can be downloaded from. Reports are deleted by
+the import worker's retention sweep (purge_expired_reports)
+IMPORT_REPORT_RETENTION_DAYS after they were stored.
+
+A report holds the rejected input as it was uploaded, so the report of an
+import run for a user is stored in a directory of that user (its ``owner``)
+and only that user, or staff, can download it (find_rejected_rows_report).
+
+A resumable import job stores the rows rejected so far as a part of the
+report at every checkpoint (RejectedRows.checkpoint), so a resumed run
+appends to the report of the interrupted one instead of losing it.
+"""
+import csv
+import io
+import shutil
+import tempfile
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils import timezone
+
+from .columns import format_errors
+
+REJECTED_ROWS_DIR = 'imports/rejected'
+
+
+def get_sample_size():
+    """Error messages returned in the response, configurable with IMPORT_ERROR_SAMPLE_SIZE"""
+    return getattr(settings, 'IMPORT_ERROR_SAMPLE_SIZE', 100)
+
+
+def get_report_retention_days():
+    """Days a rejected-rows report is kept, configurable with IMPORT_REPORT_RETENTION_DAYS"""
+    return getattr(settings, 'IMPORT_REPORT_RETENTION_DAYS', 7)
+
+
+def _owner_dir(owner):
+    """Directory of the reports of the user with id ``owner``, or of reports without an owner"""
+    return REJECTED_ROWS_DIR if owner is None else f'{REJECTED_ROWS_DIR}/{owner}'
+
+
+def rejected_rows_path(report_id, owner=None):
+    """Storage path of a rejected-rows report of the user with id ``owner``"""
+    return f'{_owner_dir(owner)}/{report_id}.csv'
+
+
+def rejected_rows_part_path(report_id, rows_processed, owner=None):
+    """Storage path of the part of a report stored at the checkpoint after ``rows_processed`` rows"""
+    return f'{_owner_dir(owner)}/{report_id}-{rows_processed}.part.csv'
+
+
+def find_rejected_rows_report(report_id, user):
+    """
+    Storage path of the report ``report_id`` if ``user`` may download it, else None.
+
+    Users find their own reports; staff find the reports of every user and
+    those of imports run without one (e.g. the import_file command).
+    """
+    path = rejected_rows_path(report_id, user.pk)
+    if default_storage.exists(path):
+        return path
+    if not user.is_staff or not default_storage.exists(REJECTED_ROWS_DIR):
+        return None
+    directories, _files = default_storage.listdir(REJECTED_ROWS_DIR)
+    for owner in [None, *directories]:
+        path = rejected_rows_path(report_id, owner)
+        if default_storage.exists(path):
+            return path
+    return None
+
+
+def purge_expired_reports(directory=REJECTED_ROWS_DIR):
+    """Delete the reports stored more than IMPORT_REPORT_RETENTION_DAYS ago; returns the number deleted"""
+    if not default_storage.exists(directory):
+        return 0
+    cutoff = timezone.now() - timedelta(days=get_report_retention_days())
+    directories, files = default_storage.listdir(directory)
+    purged = sum(purge_expired_reports(f'{directory}/{name}') for name in directories)
+    for name in files:
+        path = f'{directory}/{name}'
+        if default_storage.get_modified_time(path) < cutoff:
+            default_storage.delete(path)
+            purged += 1
+    return purged
+
+
+class RejectedRows:
+    """
+    Collects the rejected rows of one import.
+
+    The CSV is spooled to a temporary file and only moved to the default
+    storage by close(), so nothing is stored for a file without errors.
+    ``state`` is the checkpoint() result of an interrupted import of the same
+    file; the report then continues from the parts that import stored.
+    ``owner`` is the id of the user the report is stored for.
+    """
+
+    def __init__(self, sample_size=None, state=None, owner=None):
+        self.sample_size = get_sample_size() if sample_size is None else sample_size
+        self.owner = owner
+        state = state or {}
+        self.count = state.get('count', 0)
+        self.samples = list(state.get('samples', []))
+        self.report_id = state.get('report_id')
+        # Storage paths of the parts stored by earlier checkpoints, in row order
+        self.parts = list(state.get('parts', []))
+        self._file = None
+        self._writer = None
+
+    def add(self, raw, errors):
+        """
+        Record ``(index, column, message)`` errors for rows of the chunk ``raw``.
+
+        ``raw`` is the chunk as read from the file, before its headers are
+        resolved, so the report shows each row exactly as it was uploaded.
+        """
+        if not errors:
+            return
+        self.count += len(errors)
+        if len(self.samples) < self.sample_size:
+            self.samples.extend(format_errors(errors[:self.sample_size - len(self.samples)]))
+
+        if self._writer is None:
+            self._file = tempfile.TemporaryFile(mode='w+', encoding='utf-8', newline='')
+            self._writer = csv.writer(self._file)
+            if not self.parts:
+                self._writer.writerow(['row', 'column', 'reason', *[str(column) for column in raw.columns]])
+        values = raw.astype(object).where(raw.notna(), '')
+        for index, column, message in errors:
+            self._writer.writerow([int(index) + 1, column, message, *values.loc[index].tolist()])
+
+    def checkpoint(self, rows_processed):
+        """
+        Store the rows added since the last checkpoint as a part of the report
+        and return the state to continue the report from, see __init__
+        """
+        if self._file is not None:
+            if self.report_id is None:
+                self.report_id = uuid.uuid4().hex
+            self._file.seek(0)
+            self.parts.append(
+                default_storage.save(rejected_rows_part_path(self.report_id, rows_processed, self.owner), File(self._file))
+            )
+            self.discard()
+        return {'report_id': self.report_id, 'count': self.count, 'samples': self.samples, 'parts': self.parts}
+
+    def close(self):
+        """Store the report, if any row was rejected, and return its id"""
+        if self._file is None and not self.parts:
+            return None
+        if self.report_id is None:
+            self.report_id = uuid.uuid4().hex
+        if self.parts:
+            # The parts and the rows since the last checkpoint make up the report
+            report = tempfile.TemporaryFile(mode='w+', encoding='utf-8', newline='')
+            for part in self.parts:
+                with default_storage.open(part, 'rb') as stored:
+                    shutil.copyfileobj(io.TextIOWrapper(stored, encoding='utf-8', newline=''), report)
+            if self._file is not None:
+                self._file.seek(0)
+                shutil.copyfileobj(self._file, report)
+                self._file.close()
+            self._file = report
+        self._file.seek(0)
+        default_storage.save(rejected_rows_path(self.report_id, self.owner), File(self._file))
+        self._file.close()
+        self._file = self._writer = None
+        for part in self.parts:
+            default_storage.delete(part)
+        self.parts = []
+        return self.report_id
+
+    def discard(self):
+        """Drop the rows not stored yet, e.g. when the import failed; the temporary file is removed"""
+        if self._file is not None:
+            self._file.close()
+            self._file = self._writer = None
+
+    @property
+    def url(self):
+        if self.report_id is None:
+            return None
+        return reverse('imports:rejected-rows', args=[uuid.UUID(self.report_id)])
+
+    def summary(self):
+        """Error fields of an import result: the count, the first messages and the report URL"""
+        return {
+            'errors': self.samples,
+            'error_count': self.count,
+            'rejected_rows_url': self.url,
+        }
@@ -0,0 +1,51 @@
+"""OpenAPI pieces shared by the import endpoints"""
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+
+ASYNC_IMPORT_PARAMETER = OpenApiParameter(
+    name='async',
+    type=OpenApiTypes.BOOL,
+    location=OpenApiParameter.QUERY,
+    required=False,
+    description='Jika bernilai 1/true, file disimpan dan diproses di latar belakang; '
+                'respons 202 berisi job_id dan status_url untuk memantau progres'
+)
+
+DRY_RUN_PARAMETER = OpenApiParameter(
+    name='dry_run',
+    type=OpenApiTypes.BOOL,
+    location=OpenApiParameter.QUERY,
+    required=False,
+    description='Jika bernilai 1/true, file hanya divalidasi dan dicek terhadap database tanpa '
+                'menyimpan apa pun; respons berisi jumlah dan error yang sama dengan impor sebenarnya'
+)
+
+COMMIT_MODE_PARAMETER = OpenApiParameter(
+    name='commit',
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.QUERY,
+    required=False,
+    enum=['chunk'],
+    description='chunk: setiap potongan (chunk) di-commit dalam transaksi sendiri dan checkpoint '
+                'disimpan pada pekerjaan impor (job_id), sehingga impor yang gagal dapat dilanjutkan'
+)
+
+TEMPLATE_FORMAT_PARAMETER = OpenApiParameter(
+    name='file_format',
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.QUERY,
+    required=False,
+    enum=['csv', 'xlsx'],
+    description='Format template: csv (bawaan) atau xlsx. Respons memuat ETag; kirim kembali nilainya '
+                'pada header If-None-Match untuk mendapat 304 Not Modified selama template tidak berubah'
+)
+
+IMPORT_JOB_ACCEPTED_RESPONSE = {
+    'type': 'object',
+    'properties': {
+        'message': {'type': 'string'},
+        'job_id': {'type': 'integer'},
+        'status': {'type': 'string'},
+        'status_url': {'type': 'string'}
+    }
+}
@@ -0,0 +1,17 @@
+from rest_framework import serializers
+from .models import ImportJob
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the status of a background import job
+    """
+    rows_per_second = serializers.FloatField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = ImportJob
+        fields = (
+            'id', 'kind', 'status', 'rows_processed', 'checkpoint_offset', 'error_count', 'rows_per_second',
+            'message', 'result', 'errors', 'created_by', 'started_at', 'finished_at',
+            'created_at', 'updated_at'
+        )
+        read_only_fields = fields
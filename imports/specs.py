@@ -0,0 +1,95 @@
+"""
+Declarative descriptions of the CSV/Excel imports.
+
+Every import kind is an ImportSpec: the model, the importable columns and
+their header aliases, the natural key and the foreign keys to resolve. The
+engine (imports.engine) runs any spec, so the ships, fish species, fish and
+fishing-area imports share one streaming, vectorised, set-based code path.
+Column types are not declared; they come from the model fields.
+"""
+from django.utils.module_loading import import_string
+
+# Spec of each import kind; the kinds are also the ImportJob kinds
+IMPORT_SPECS = {
+    'ships': 'ships.importers.SHIP_IMPORT_SPEC',
+    'fish_species': 'fishs.importers.FISH_SPECIES_IMPORT_SPEC',
+    'fish': 'fishs.importers.FISH_IMPORT_SPEC',
+    'fishing_areas': 'regions.importers.FISHING_AREA_IMPORT_SPEC',
+}
+
+
+def get_spec(kind):
+    """ImportSpec of an import kind"""
+    return import_string(IMPORT_SPECS[kind])
+
+
+class ForeignKey:
+    """
+    A file column naming a related row, e.g. the species name of a fish.
+
+    The values of ``column`` are looked up on ``lookup_field`` of
+    ``related_model`` and written to the ``field`` foreign key. Rows naming a
+    related row that does not exist are rejected with ``missing_message``
+    (formatted with ``value``), and the unknown values are listed in the
+    result under ``unknown_key``.
+    """
+
+    def __init__(self, field, column, related_model, lookup_field, missing_message, unknown_key=None):
+        self.field = field
+        self.column = column
+        self.related_model = related_model
+        self.lookup_field = lookup_field
+        self.missing_message = missing_message
+        self.unknown_key = unknown_key
+
+
+class ImportSpec:
+    """
+    Everything the import engine needs to know about one import kind.
+
+    ``columns`` maps each canonical column to its accepted header aliases;
+    ``fields`` are the model fields the import writes. With a ``key`` the
+    import is an upsert on that natural key (compared case-insensitively with
+    ``key_iexact``) that skips rows whose digest is unchanged; without one,
+    every valid row is inserted. ``required`` columns must have a value, and
+    with ``require_header`` a file whose header lacks one is refused as a
+    whole. ``summarize(counts, dry_run)`` turns the engine's counts into the
+    response body, without the error fields the engine adds itself.
+    """
+
+    def __init__(self, kind, model, columns, fields, summarize, key=None, key_iexact=False, required=(),
+                 foreign_keys=(), require_header=False, extensions=('.csv', '.csv.gz', '.zip', '.xlsx', '.xls')):
+        self.kind = kind
+        self.model = model
+        self.columns = columns
+        self.fields = list(fields)
+        self.summarize = summarize
+        self.key = key
+        self.key_iexact = key_iexact
+        self.required = list(required)
+        self.foreign_keys = list(foreign_keys)
+        self.require_header = require_header
+        self.extensions = tuple(extensions)
+
+    @property
+    def clean_columns(self):
+        """Columns coerced and validated by clean_frame, key first"""
+        columns = [self.key] if self.key else []
+        columns += [foreign_key.column for foreign_key in self.foreign_keys]
+        return columns + [field for field in self.fields if field not in columns]
+
+    @property
+    def write_fields(self):
+        """Model attributes written per row, with foreign keys by their ``<field>_id`` attribute"""
+        return [
+            *[self.model._meta.get_field(foreign_key.field).attname for foreign_key in self.foreign_keys],
+            *self.fields
+        ]
+
+    @property
+    def export_lookups(self):
+        """Lookup of every column in column order, so an export can be imported again as it is"""
+        related = {
+            foreign_key.column: f'{foreign_key.field}__{foreign_key.lookup_field}' for foreign_key in self.foreign_keys
+        }
+        return [(column, related.get(column, column)) for column in self.columns]
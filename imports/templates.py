@@ -0,0 +1,114 @@
+"""
+Downloadable import templates.
+
+A template is a small sample file with the columns of an import spec. Its
+CSV and XLSX bytes never change while the code does not, so they are built
+once per process, on first use, and served from memory afterwards.
+
+The SHA-256 of the bytes of each format makes the strong ETag of its
+download, the same in every worker process, and a client revalidating with
+If-None-Match gets 304 Not Modified without a body until a deploy changes
+the template. openpyxl stamps the save time into an XLSX file (the document
+properties and the date of every zip entry), so the XLSX template is written
+with a fixed timestamp instead, keeping its bytes - and so its ETag - the
+same from one build to the next.
+"""
+import csv
+import hashlib
+import io
+import zipfile
+from datetime import datetime
+from functools import cached_property
+
+from django.utils.module_loading import import_string
+from openpyxl import Workbook
+from openpyxl.writer.excel import ExcelWriter
+
+from .exports import export_value
+
+# Template of each import kind
+IMPORT_TEMPLATES = {
+    'ships': 'ships.importers.SHIP_IMPORT_TEMPLATE',
+    'fish_species': 'fishs.importers.FISH_SPECIES_IMPORT_TEMPLATE',
+    'fish': 'fishs.importers.FISH_IMPORT_TEMPLATE',
+    'fishing_areas': 'regions.importers.FISHING_AREA_IMPORT_TEMPLATE',
+}
+
+TEMPLATE_FORMATS = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+# Written into the XLSX templates in place of the save time
+TEMPLATE_TIMESTAMP = datetime(2000, 1, 1)
+
+
+def get_template(kind):
+    """ImportTemplate of an import kind"""
+    return import_string(IMPORT_TEMPLATES[kind])
+
+
+class ImportTemplate:
+    """
+    The sample file of an import spec.
+
+    ``rows`` hold the sample values in the order of ``spec.columns``; the
+    header is the spec's canonical columns, so the template always matches
+    what the importer reads. ``filename`` is the download name without its
+    extension.
+    """
+
+    def __init__(self, spec, filename, rows):
+        self.spec = spec
+        self.filename = filename
+        self.rows = [list(row) for row in rows]
+
+    @property
+    def columns(self):
+        return list(self.spec.columns)
+
+    @cached_property
+    def csv_bytes(self):
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(self.columns)
+        writer.writerows([export_value(value) for value in row] for row in self.rows)
+        return output.getvalue().encode('utf-8')
+
+    @cached_property
+    def xlsx_bytes(self):
+        # Titled with the import kind, so the multi-sheet workbook import recognises the sheet
+        workbook = Workbook(write_only=True)
+        workbook.properties.created = workbook.properties.modified = TEMPLATE_TIMESTAMP
+        sheet = workbook.create_sheet(self.spec.kind)
+        sheet.append(self.columns)
+        for row in self.rows:
+            sheet.append(row)
+        # Written with ExcelWriter rather than Workbook.save, which sets the modified time to now
+        saved = io.BytesIO()
+        with zipfile.ZipFile(saved, 'w', zipfile.ZIP_DEFLATED) as archive:
+            ExcelWriter(workbook, archive).save()
+        # The zip entries carry the time they were written; rewrite them with the fixed one
+        output = io.BytesIO()
+        with zipfile.ZipFile(saved) as source, zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for info in source.infolist():
+                entry = zipfile.ZipInfo(info.filename, date_time=TEMPLATE_TIMESTAMP.timetuple()[:6])
+                archive.writestr(entry, source.read(info), compress_type=zipfile.ZIP_DEFLATED)
+        return output.getvalue()
+
+    def content(self, file_format):
+        """Bytes of the template in ``file_format`` (csv or xlsx)"""
+        return self.xlsx_bytes if file_format == 'xlsx' else self.csv_bytes
+
+    @cached_property
+    def etags(self):
+        """Strong ETag of each format: a hash of its bytes"""
+        return {
+            file_format: f'"{self.spec.kind}-{hashlib.sha256(self.content(file_format)).hexdigest()[:32]}-{file_format}"'
+            for file_format in TEMPLATE_FORMATS
+        }
+
+    def etag(self, file_format):
+        """Strong ETag of the template in ``file_format``"""
+        return self.etags[file_format]
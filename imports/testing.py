@@ -0,0 +1,48 @@
+import csv
+import io
+import shutil
+import tempfile
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+
+def csv_upload(name, header, rows):
+    """An uploaded CSV file called ``name`` with the ``header`` row and the ``rows``"""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return SimpleUploadedFile(name, output.getvalue().encode('utf-8'), content_type='text/csv')
+
+
+class TemporaryMediaRootMixin:
+    """Test case mixin storing uploads and import reports in a throwaway MEDIA_ROOT"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls._media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls._media_override.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+
+class AuthenticatedClientMixin:
+    """Test case mixin with ``self.client`` authenticated as a fresh ``self.user``"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(  # type: ignore
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)  # type: ignore
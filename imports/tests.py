@@ -0,0 +1,954 @@
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection, transaction
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from openpyxl import Workbook, load_workbook
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from unittest import mock
+from datetime import timedelta
+from decimal import Decimal
+import pandas as pd
+from ships.models import Ship
+from fishs.models import Fish, FishSpecies
+from regions.models import FishingArea
+from .models import ImportJob
+from .archives import import_archive
+from .benchmark import compare_reports, run_case
+from .bulk import bulk_upsert
+from .columns import clean_frame, format_errors, resolve_columns
+from .engine import run_import
+from .jobs import purge_expired_uploads
+from .parallel import PartParser
+from .rejects import REJECTED_ROWS_DIR, RejectedRows, purge_expired_reports, rejected_rows_path
+from .readers import read_archive_member, read_chunks, read_csv_chunks
+from .specs import IMPORT_SPECS, get_spec
+from .staging import staging_load
+from .templates import ImportTemplate, get_template
+from .uploads import StreamingImportUploadHandler, UploadPipe, UploadTooLarge
+from .testing import AuthenticatedClientMixin, TemporaryMediaRootMixin, csv_upload
+
+
+class ReadChunksTest(TestCase):
+    def _csv_file(self, row_count, name='data.csv'):
+        return csv_upload(name, ['name', 'code'], ([f'Area {i}', f'C{i:03d}'] for i in range(row_count)))
+
+    @override_settings(IMPORT_CHUNK_SIZE=4)
+    def test_csv_is_read_in_chunks_with_continuous_index(self):
+        chunks = list(read_chunks(self._csv_file(10)))
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 2])
+        self.assertEqual(list(chunks[2].index), [8, 9])
+
+    def test_header_only_file_yields_empty_chunk_with_columns(self):
+        chunks = list(read_chunks(self._csv_file(0)))
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(list(chunks[0].columns), ['name', 'code'])
+
+    @override_settings(IMPORT_CHUNK_SIZE=4)
+    def test_start_row_skips_rows_and_keeps_row_numbers(self):
+        chunks = list(read_chunks(self._csv_file(10), start_row=6))
+        self.assertEqual([list(chunk.index) for chunk in chunks], [[6, 7], [8, 9]])
+        self.assertEqual(chunks[0].iloc[0]['code'], 'C006')
+
+    def test_unsupported_extension_is_rejected(self):
+        with self.assertRaises(ValueError):
+            read_chunks(self._csv_file(1, name='data.txt'))
+
+
+class ReadXlsxChunksTest(TestCase):
+    def _xlsx_file(self, rows):
+        workbook = Workbook()
+        sheet = workbook.active
+        for row in rows:
+            sheet.append(row)
+        output = io.BytesIO()
+        workbook.save(output)
+        return SimpleUploadedFile('data.xlsx', output.getvalue())
+
+    @override_settings(IMPORT_CHUNK_SIZE=2)
+    def test_xlsx_is_streamed_in_chunks(self):
+        xlsx_file = self._xlsx_file([
+            ['name', 'length', None],
+            ['Ship 1', 20.5],
+            [None, None, None],
+            ['Ship 2', 25],
+            ['Ship 3', None, 'extra'],
+        ])
+        chunks = list(read_chunks(xlsx_file))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        self.assertEqual(list(chunks[0].columns), ['name', 'length', 'Unnamed: 2'])
+        self.assertEqual(list(chunks[1].index), [2])
+        self.assertEqual(chunks[1].iloc[0]['name'], 'Ship 3')
+        self.assertEqual(chunks[0].iloc[1]['length'], 25)
+
+    def test_header_only_xlsx_yields_empty_chunk_with_columns(self):
+        chunks = list(read_chunks(self._xlsx_file([['name', 'code']])))
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(list(chunks[0].columns), ['name', 'code'])
+
+
+class ColumnsTest(TestCase):
+    aliases = {
+        'name': ['nama_kapal'],
+        'reg_number': ['nomor_registrasi'],
+        'length': ['panjang'],
+        'year_built': ['tahun_dibuat'],
+        'active': ['aktif'],
+    }
+    fields = ['name', 'reg_number', 'length', 'year_built', 'active']
+
+    def test_resolve_columns_ignores_case_and_spacing(self):
+        df = pd.DataFrame({'Nama Kapal': ['KM Bahari'], ' REG-NUMBER ': ['R1'], 'Panjang': ['12.5'], 'other': ['x']})
+        resolved = resolve_columns(df, self.aliases)
+        self.assertEqual(sorted(resolved.columns), ['length', 'name', 'reg_number'])
+        self.assertEqual(resolved.iloc[0]['name'], 'KM Bahari')
+
+    def test_resolve_columns_falls_back_to_next_alias_when_empty(self):
+        df = pd.DataFrame({'name': ['', 'KM Satu'], 'Nama Kapal': ['KM Dua', 'KM Tiga']})
+        resolved = resolve_columns(df, self.aliases)
+        self.assertEqual(list(resolved['name']), ['KM Dua', 'KM Satu'])
+
+    def test_clean_frame_coerces_columns_and_reports_bad_cells(self):
+        df = pd.DataFrame({
+            'name': ['KM Satu', 'KM Dua', None, 'KM Empat', 'KM Lima'],
+            'reg_number': ['R1', 'R2', 'R3', 'R4', 'R5'],
+            'length': ['12.345', 'abc', '1', '100', None],
+            'year_built': ['2020', '2021', '2022', '2023.5', '2024'],
+            'active': ['ya', 'True', None, '0', None],
+        })
+        valid, errors = clean_frame(Ship, df, self.fields, required=['name', 'reg_number'])
+        self.assertEqual(format_errors(errors), [
+            'Row 2: length: “abc” value must be a decimal number.',
+            "Row 3: Missing required 'name' field",
+            'Row 4: year_built: “2023.5” value must be an integer.',
+        ])
+        records = valid.to_dict('records')
+        self.assertEqual(records[0]['length'], Decimal('12.35'))
+        self.assertEqual(records[0]['year_built'], 2020)
+        self.assertTrue(records[0]['active'])
+        self.assertIsNone(records[1]['length'])
+        self.assertTrue(records[1]['active'])
+
+    def test_clean_frame_reports_values_too_large_for_field(self):
+        df = pd.DataFrame({'name': ['x' * 201], 'reg_number': ['R1'], 'length': ['5'], 'year_built': [None], 'active': [None]})
+        valid, errors = clean_frame(Ship, df, self.fields)
+        self.assertTrue(valid.empty)
+        self.assertEqual(errors[0][1], 'name')
+        self.assertTrue(errors[0][2].startswith('name: Ensure this value has at most 200 characters'))
+
+
+class ImportEngineTest(TemporaryMediaRootMixin, TestCase):
+    def test_every_import_kind_has_a_spec(self):
+        for kind in IMPORT_SPECS:
+            self.assertEqual(get_spec(kind).kind, kind)
+
+    def test_foreign_keys_are_written_by_id_and_unknown_values_listed(self):
+        spec = get_spec('fish')
+        self.assertEqual(spec.clean_columns, ['species_name', 'name', 'notes'])
+        self.assertEqual(spec.write_fields, ['species_id', 'name', 'notes'])
+
+        FishSpecies.objects.create(name='Tuna')  # type: ignore
+        chunks = [
+            pd.DataFrame({'species_name': ['Tuna', 'Shark'], 'name': ['A', 'B']}),
+            pd.DataFrame({'species_name': ['Tuna', 'Shark'], 'name': ['C', 'D']}, index=[2, 3]),
+        ]
+        # One species lookup for the values of the first chunk, none for the second
+        with CaptureQueriesContext(connection) as queries:
+            result = run_import(spec, iter(chunks), dry_run=True)
+        self.assertEqual(len([query for query in queries if 'fishs_fishspecies' in query['sql']]), 1)
+        self.assertEqual(result['created_count'], 2)
+        self.assertEqual(result['error_count'], 2)
+        self.assertEqual(result['unknown_species'], ['Shark'])
+
+
+class RejectedRowsTest(TemporaryMediaRootMixin, TestCase):
+    def _chunks(self):
+        return iter([
+            pd.DataFrame({'name': ['A', 'B'], 'reg_number': ['R1', 'R2'], 'length': ['x', '1']}),
+            pd.DataFrame({'name': ['C'], 'reg_number': ['R3'], 'length': ['y']}, index=[2]),
+        ])
+
+    def test_failed_import_stores_no_report_and_removes_its_temporary_file(self):
+        reports = []
+
+        class RecordedRejectedRows(RejectedRows):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                reports.append(self)
+
+        calls = []
+
+        def upsert(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 2:
+                raise Exception('database went away')
+            return bulk_upsert(*args, **kwargs)
+
+        with mock.patch('imports.engine.RejectedRows', RecordedRejectedRows), \
+                mock.patch('imports.engine.bulk_upsert', side_effect=upsert):
+            with self.assertRaises(Exception):
+                run_import(get_spec('ships'), self._chunks())
+        self.assertEqual(reports[0].count, 2)
+        self.assertIsNone(reports[0]._file)
+        self.assertIsNone(reports[0].report_id)
+
+    def test_expired_reports_are_purged(self):
+        result = run_import(get_spec('ships'), self._chunks(), dry_run=True)
+        path = rejected_rows_path(result['rejected_rows_url'].rstrip('/').rsplit('/', 1)[1].replace('-', ''))
+        self.assertTrue(default_storage.exists(path))
+        self.assertEqual(purge_expired_reports(), 0)
+
+        expired = (timezone.now() - timedelta(days=8)).timestamp()
+        os.utime(default_storage.path(path), (expired, expired))
+        self.assertEqual(purge_expired_reports(), 1)
+        self.assertFalse(default_storage.exists(path))
+
+
+class StagingLoaderTest(TemporaryMediaRootMixin, TestCase):
+    def _csv(self, content, name='data.csv'):
+        return SimpleUploadedFile(name, content.encode('utf-8'), content_type='text/csv')
+
+    def _ships_csv(self):
+        return self._csv(
+            'name,reg_number,length,active\n'
+            'KM Satu,R1,12.5,ya\n'
+            'KM Dua Baru,R2,20,tidak\n'
+            'KM Tiga,R3,,\n'
+            'KM Tiga Lagi,R3,8,\n'
+        )
+
+    def _seed_ships(self):
+        # R1 matches the file but has no digest yet, R2 differs from it
+        Ship.objects.create(name='KM Satu', reg_number='R1', length=Decimal('12.50'))  # type: ignore
+        Ship.objects.create(name='KM Dua', reg_number='R2', length=Decimal('20'))  # type: ignore
+        return Ship.objects.get(reg_number='R1').updated_at  # type: ignore
+
+    def test_staging_upsert_matches_orm_loader(self):
+        self._seed_ships()
+        with transaction.atomic():
+            expected = run_import(get_spec('ships'), read_chunks(self._ships_csv()), loader='orm')
+            expected_rows = list(Ship.objects.order_by('reg_number').values_list(  # type: ignore
+                'reg_number', 'name', 'length', 'active', 'import_digest'
+            ))
+            transaction.set_rollback(True)
+
+        result = run_import(get_spec('ships'), read_chunks(self._ships_csv()), loader='staging')
+        self.assertEqual(result, expected)
+        self.assertEqual(list(Ship.objects.order_by('reg_number').values_list(  # type: ignore
+            'reg_number', 'name', 'length', 'active', 'import_digest'
+        )), expected_rows)
+
+    def test_staging_upsert_keeps_updated_at_of_unchanged_rows(self):
+        updated_at = self._seed_ships()
+        result = run_import(get_spec('ships'), read_chunks(self._ships_csv()), loader='staging')
+
+        self.assertEqual((result['created_count'], result['updated_count']), (1, 3))
+        ship = Ship.objects.get(reg_number='R1')  # type: ignore
+        self.assertEqual(ship.updated_at, updated_at)
+        self.assertIsNotNone(ship.import_digest)
+        self.assertGreater(Ship.objects.get(reg_number='R2').updated_at, updated_at)  # type: ignore
+        self.assertEqual(Ship.objects.get(reg_number='R3').length, Decimal('8.00'))  # type: ignore
+
+    @override_settings(IMPORT_BULK_LOADER='staging')
+    def test_staging_insert_resolves_foreign_keys(self):
+        tuna = FishSpecies.objects.create(name='Tuna')  # type: ignore
+        content = 'species_name,name,notes\nTuna,Bluefin,"line\twith tab"\nShark,Great White,\n'
+        result = run_import(get_spec('fish'), read_chunks(self._csv(content)))
+
+        self.assertEqual(result['created_count'], 1)
+        self.assertEqual(result['unknown_species'], ['Shark'])
+        fish = Fish.objects.get()  # type: ignore
+        self.assertEqual((fish.species_id, fish.name, fish.notes), (tuna.pk, 'Bluefin', 'line\twith tab'))
+        self.assertIsNotNone(fish.created_at)
+
+    def test_import_file_command_uses_requested_loader(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'ships.csv')
+            with open(path, 'w', encoding='utf-8') as output:
+                output.write('name,reg_number\nKM Satu,R1\n')
+            with mock.patch('imports.engine.staging_load', wraps=staging_load) as load:
+                call_command('import_file', 'ships', path, loader='staging', stdout=io.StringIO())
+        load.assert_called_once()
+        self.assertTrue(Ship.objects.filter(reg_number='R1').exists())  # type: ignore
+
+
+class StreamingUploadTest(AuthenticatedClientMixin, TemporaryMediaRootMixin, TestCase):
+    def _ships_csv(self, row_count):
+        return csv_upload('ships.csv', ['name', 'reg_number', 'home_port'], (
+            [f'KM Kapal {i}', f'REG-{i:06d}', f'Pelabuhan Perikanan Samudera Nomor {i}'] for i in range(row_count)
+        ))
+
+    def test_pipe_streams_blocks_to_csv_reader_and_raises_errors(self):
+        pipe = UploadPipe(max_blocks=1)
+
+        def upload():
+            for block in [b'name,code\nArea 1,', b'C1\nArea 2,C2\n', b'Area 3,C3\n']:
+                pipe.write_block(block)
+            pipe.finish()
+
+        thread = threading.Thread(target=upload)
+        thread.start()
+        chunks = list(read_csv_chunks(io.BufferedReader(pipe), chunk_size=2))
+        thread.join()
+        self.assertEqual([list(chunk['code']) for chunk in chunks], [['C1', 'C2'], ['C3']])
+
+        failing = UploadPipe()
+        failing.write_block(b'name,code\n')
+        failing.finish(UploadTooLarge(1024 * 1024))
+        with self.assertRaises(UploadTooLarge):
+            io.BufferedReader(failing).read()
+
+    @override_settings(IMPORT_CHUNK_SIZE=500)
+    def test_csv_is_imported_while_upload_arrives(self):
+        events = []
+        receive = StreamingImportUploadHandler.receive_data_chunk
+
+        def record_receive(handler, raw_data, start):
+            events.append('receive')
+            return receive(handler, raw_data, start)
+
+        def record_write(*args, **kwargs):
+            events.append('write')
+            return bulk_upsert(*args, **kwargs)
+
+        with mock.patch('imports.uploads.PIPE_BLOCKS', 1), \
+                mock.patch.object(StreamingImportUploadHandler, 'receive_data_chunk', record_receive), \
+                mock.patch('imports.engine.bulk_upsert', side_effect=record_write):
+            response = self.client.post('/api/ships/import/', {'file': self._ships_csv(20000)}, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created_count'], 20000)
+        # The first chunk was written before the last block of the file was received
+        self.assertLess(events.index('write'), len(events) - 1 - events[::-1].index('receive'))
+
+    def test_upper_case_extension_is_streamed_too(self):
+        upload = self._ships_csv(3)
+        upload.name = 'SHIPS.CSV'
+        response = self.client.post('/api/ships/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['created_count'], 3)
+
+    @override_settings(IMPORT_MAX_UPLOAD_SIZE=1024)
+    def test_oversized_upload_is_refused(self):
+        with mock.patch.object(StreamingImportUploadHandler, 'receive_data_chunk') as receive:
+            response = self.client.post('/api/ships/import/', {'file': self._ships_csv(100)}, format='multipart')
+        self.assertEqual(response.status_code, 413)
+        self.assertIn('File is too large', response.data['error'])
+        # Refused on the declared length, before any block was received
+        receive.assert_not_called()
+        self.assertFalse(Ship.objects.exists())  # type: ignore
+
+    @override_settings(IMPORT_MAX_UPLOAD_SIZE=4096)
+    def test_upload_passing_the_limit_midway_rolls_back(self):
+        with mock.patch.object(StreamingImportUploadHandler, 'handle_raw_input', return_value=None), \
+                override_settings(IMPORT_CHUNK_SIZE=10):
+            response = self.client.post('/api/ships/import/', {'file': self._ships_csv(200)}, format='multipart')
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(Ship.objects.exists())  # type: ignore
+
+
+class ImportJobTest(AuthenticatedClientMixin, TemporaryMediaRootMixin, TestCase):
+    def _ship_file(self, rows):
+        return csv_upload('ships.csv', ['name', 'reg_number', 'length'], rows)
+
+    def test_async_import_is_queued(self):
+        response = self.client.post(
+            '/api/ships/import/?async=1', {'file': self._ship_file([('Kapal A', 'A1', '10')])}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 202)
+        job = ImportJob.objects.get(pk=response.data['job_id'])  # type: ignore
+        self.assertEqual(job.status, 'pending')
+        self.assertEqual(job.kind, 'ships')
+        self.assertEqual(job.created_by, self.user)
+        self.assertTrue(response.data['status_url'].endswith(f'/api/imports/jobs/{job.pk}/'))
+        self.assertFalse(Ship.objects.exists())  # type: ignore
+
+    @override_settings(IMPORT_CHUNK_SIZE=2)
+    def test_worker_runs_job_and_reports_progress(self):
+        response = self.client.post(
+            '/api/ships/import/?async=true',
+            {'file': self._ship_file([('Kapal A', 'A1', '10'), ('Kapal B', 'B1', 'x'), ('Kapal C', 'C1', '12')])},
+            format='multipart'
+        )
+        job_id = response.data['job_id']
+
+        call_command('run_import_worker', '--once', stdout=io.StringIO())
+
+        self.assertEqual(Ship.objects.count(), 2)  # type: ignore
+        response = self.client.get(f'/api/imports/jobs/{job_id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'completed')
+        self.assertEqual(response.data['rows_processed'], 3)
+        self.assertEqual(response.data['error_count'], 1)
+        self.assertTrue(response.data['errors'][0].startswith('Row 2: length:'))
+        self.assertEqual(response.data['result']['created_count'], 2)
+        self.assertIsNotNone(response.data['finished_at'])
+
+    def test_failed_job_keeps_message(self):
+        response = self.client.post(
+            '/api/regions/import/?async=1',
+            {'file': SimpleUploadedFile('areas.csv', b'name,description\nUtara,x\n', content_type='text/csv')},
+            format='multipart'
+        )
+        call_command('run_import_worker', '--once', stdout=io.StringIO())
+
+        job = ImportJob.objects.get(pk=response.data['job_id'])  # type: ignore
+        self.assertEqual(job.status, 'failed')
+        self.assertIn("Missing required columns: ['code']", job.message)
+        self.assertFalse(FishingArea.objects.exists())  # type: ignore
+
+    def test_unknown_job_returns_404(self):
+        response = self.client.get('/api/imports/jobs/999/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_completed_job_deletes_its_upload(self):
+        response = self.client.post(
+            '/api/ships/import/?async=1', {'file': self._ship_file([('Kapal A', 'A1', '10')])}, format='multipart'
+        )
+        path = ImportJob.objects.get(pk=response.data['job_id']).file.path  # type: ignore
+        self.assertTrue(os.path.exists(path))
+        call_command('run_import_worker', '--once', stdout=io.StringIO())
+        job = ImportJob.objects.get(pk=response.data['job_id'])  # type: ignore
+        self.assertEqual(job.status, 'completed')
+        self.assertFalse(job.file)
+        self.assertFalse(os.path.exists(path))
+
+    def test_jobs_are_only_visible_to_their_owner_and_staff(self):
+        response = self.client.post(
+            '/api/regions/import/?async=1',
+            {'file': SimpleUploadedFile('areas.csv', b'name,description\nUtara,x\n', content_type='text/csv')},
+            format='multipart'
+        )
+        call_command('run_import_worker', '--once', stdout=io.StringIO())
+        job_id = response.data['job_id']
+        User = get_user_model()
+        other = APIClient()
+        other.force_authenticate(user=User.objects.create_user(username='other', password='testpass123'))  # type: ignore
+        self.assertEqual(other.get(f'/api/imports/jobs/{job_id}/').status_code, 404)
+        self.assertEqual(other.post(f'/api/imports/jobs/{job_id}/resume/').status_code, 404)
+        self.assertEqual(ImportJob.objects.get(pk=job_id).status, 'failed')  # type: ignore
+
+        staff = APIClient()
+        staff.force_authenticate(user=User.objects.create_user(username='admin', password='testpass123', is_staff=True))  # type: ignore
+        self.assertEqual(staff.get(f'/api/imports/jobs/{job_id}/').status_code, 200)
+
+    def test_retention_sweep_deletes_uploads_of_old_failed_jobs(self):
+        response = self.client.post(
+            '/api/regions/import/?async=1',
+            {'file': SimpleUploadedFile('areas.csv', b'name,description\nUtara,x\n', content_type='text/csv')},
+            format='multipart'
+        )
+        call_command('run_import_worker', '--once', stdout=io.StringIO())
+        job = ImportJob.objects.get(pk=response.data['job_id'])  # type: ignore
+        path = job.file.path
+        self.assertEqual(purge_expired_uploads(), 0)
+
+        ImportJob.objects.filter(pk=job.pk).update(finished_at=job.finished_at - timedelta(days=8))  # type: ignore
+        self.assertEqual(purge_expired_uploads(), 1)
+        self.assertFalse(os.path.exists(path))
+        response = self.client.post(f'/api/imports/jobs/{job.pk}/resume/')
+        self.assertEqual(response.status_code, 409)
+
+
+@override_settings(IMPORT_CHUNK_SIZE=2)
+class ChunkedCommitTest(AuthenticatedClientMixin, TemporaryMediaRootMixin, TestCase):
+    def _ship_file(self, count):
+        return csv_upload('ships.csv', ['name', 'reg_number'], ([f'Kapal {i}', f'R{i}'] for i in range(count)))
+
+    def _failing_second_chunk(self):
+        """Make the write of the second chunk fail like a lost database connection"""
+        calls = []
+
+        def upsert(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 2:
+                raise Exception('database went away')
+            return bulk_upsert(*args, **kwargs)
+
+        return mock.patch('imports.engine.bulk_upsert', side_effect=upsert)
+
+    def test_chunked_commit_records_checkpoint(self):
+        response = self.client.post('/api/ships/import/?commit=chunk', {'file': self._ship_file(5)}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created_count'], 5)
+        job = ImportJob.objects.get(pk=response.data['job_id'])  # type: ignore
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.checkpoint_offset, 5)
+
+    def test_failed_chunked_import_resumes_from_checkpoint(self):
+        with self._failing_second_chunk():
+            response = self.client.post('/api/ships/import/?commit=chunk', {'file': self._ship_file(5)}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('database went away', response.data['error'])
+        self.assertEqual(response.data['checkpoint_offset'], 2)
+        self.assertEqual(Ship.objects.count(), 2)  # type: ignore
+
+        response = self.client.post(response.data['resume_url'])
+        self.assertEqual(response.status_code, 202)
+        call_command('run_import_worker', '--once', stdout=io.StringIO())
+
+        job = ImportJob.objects.get(pk=response.data['job_id'])  # type: ignore
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.checkpoint_offset, 5)
+        self.assertEqual(job.result['resumed_from_row'], 3)
+        self.assertEqual(job.result['created_count'], 5)
+        self.assertEqual(Ship.objects.count(), 5)  # type: ignore
+
+    def test_resumed_job_carries_on_counts_and_rejected_rows(self):
+        content = 'name,reg_number,length\nKapal 0,R0,x\nKapal 1,R1,\nKapal 2,R2,\nKapal 3,R3,\nKapal 4,R4,y\n'
+        upload = SimpleUploadedFile('ships.csv', content.encode('utf-8'), content_type='text/csv')
+        with self._failing_second_chunk():
+            response = self.client.post('/api/ships/import/?commit=chunk', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        job = ImportJob.objects.get(pk=response.data['job_id'])  # type: ignore
+        self.assertEqual((job.checkpoint_offset, job.error_count), (2, 1))
+
+        self.client.post(response.data['resume_url'])
+        call_command('run_import_worker', '--once', stdout=io.StringIO())
+
+        job = ImportJob.objects.get(pk=job.pk)  # type: ignore
+        self.assertEqual(job.status, 'completed')
+        self.assertIsNone(job.checkpoint_state)
+        self.assertEqual(job.result['created_count'], 3)
+        self.assertEqual(job.error_count, 2)
+        self.assertEqual([error.split(':')[0] for error in job.errors], ['Row 1', 'Row 5'])
+        download = self.client.get(job.result['rejected_rows_url'])
+        report = list(csv.reader(io.StringIO(b''.join(download.streaming_content).decode('utf-8'))))
+        self.assertEqual([line[:2] for line in report], [['row', 'column'], ['1', 'length'], ['5', 'length']])
+        # The parts stored at the checkpoints are merged into the report
+        stored = default_storage.listdir(f'{REJECTED_ROWS_DIR}/{self.user.pk}')[1]
+        self.assertFalse([name for name in stored if name.endswith('.part.csv')])
+
+    def test_completed_job_cannot_be_resumed(self):
+        response = self.client.post('/api/ships/import/?commit=chunk', {'file': self._ship_file(1)}, format='multipart')
+        response = self.client.post(f"/api/imports/jobs/{response.data['job_id']}/resume/")
+        self.assertEqual(response.status_code, 409)
+
+    def test_default_mode_rolls_back_the_whole_file_on_error(self):
+        with self._failing_second_chunk():
+            response = self.client.post('/api/ships/import/', {'file': self._ship_file(5)}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Ship.objects.exists())  # type: ignore
+
+
+class WorkbookImportTest(AuthenticatedClientMixin, TemporaryMediaRootMixin, TestCase):
+    def _workbook(self):
+        workbook = Workbook()
+        fish = workbook.active
+        fish.title = 'Ikan'
+        fish.append(['species_name', 'name'])
+        fish.append(['Tuna', 'Bluefin'])
+        fish.append(['Shark', 'Great White'])
+        species = workbook.create_sheet('Jenis Ikan')
+        species.append(['name', 'scientific_name'])
+        species.append(['Tuna', 'Thunnus'])
+        ships = workbook.create_sheet('Kapal')
+        ships.append(['name', 'reg_number', 'length'])
+        ships.append(['KM Satu', 'R1', 12.5])
+        workbook.create_sheet('Catatan').append(['anything'])
+        output = io.BytesIO()
+        workbook.save(output)
+        return SimpleUploadedFile('data.xlsx', output.getvalue())
+
+    def _assert_imported(self, response):
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual([sheet['kind'] for sheet in response.data['sheets']], ['fish_species', 'fish', 'ships'])
+        self.assertEqual(response.data['ignored_sheets'], ['Catatan'])
+        fish_sheet = response.data['sheets'][1]
+        self.assertEqual(fish_sheet['rows'], 2)
+        self.assertEqual(fish_sheet['result']['created_count'], 1)
+        self.assertEqual(fish_sheet['result']['errors'], ["Row 2: Fish species 'Shark' does not exist"])
+        self.assertIn('rows_per_second', fish_sheet)
+        self.assertEqual(response.data['error_count'], 1)
+        self.assertEqual(Fish.objects.get().species.name, 'Tuna')  # type: ignore
+        self.assertEqual(Ship.objects.get().length, Decimal('12.50'))  # type: ignore
+
+    @override_settings(IMPORT_PARSE_PROCESSES=1)
+    def test_sheets_are_applied_in_dependency_order(self):
+        self._assert_imported(self.client.post('/api/imports/workbook/', {'file': self._workbook()}, format='multipart'))
+
+    @override_settings(IMPORT_PARSE_PROCESSES=2)
+    def test_sheets_are_parsed_in_a_process_pool(self):
+        self._assert_imported(self.client.post('/api/imports/workbook/', {'file': self._workbook()}, format='multipart'))
+
+    @override_settings(IMPORT_PARSE_PROCESSES=1)
+    def test_parts_are_parsed_as_their_chunks_are_consumed(self):
+        produced = []
+
+        def parse(name):
+            for row in range(3):
+                produced.append((name, row))
+                yield pd.DataFrame({'value': [row]}, index=[row])
+
+        with PartParser(parse, [('first',), ('second',)]) as parser:
+            parts = iter(parser)
+            first = next(parts)
+            chunks = iter(first)
+            next(chunks)
+            self.assertEqual(produced, [('first', 0)])
+            self.assertEqual(len(list(chunks)), 2)
+            self.assertEqual(first.rows, 3)
+            self.assertEqual(list(next(parts))[0]['value'].tolist(), [0])
+
+    @override_settings(IMPORT_PARSE_PROCESSES=1)
+    def test_sheet_error_that_takes_several_arguments_names_the_sheet(self):
+        error = UnicodeDecodeError('utf-8', b'\xd1', 0, 1, 'invalid continuation byte')
+        with mock.patch('imports.workbook.run_import', side_effect=error):
+            response = self.client.post('/api/imports/workbook/', {'file': self._workbook()}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.data['error'].startswith("Sheet 'Jenis Ikan': "), response.data['error'])
+
+    def test_workbook_without_known_sheets_is_rejected(self):
+        workbook = Workbook()
+        workbook.active.title = 'Catatan'
+        output = io.BytesIO()
+        workbook.save(output)
+        response = self.client.post(
+            '/api/imports/workbook/', {'file': SimpleUploadedFile('data.xlsx', output.getvalue())}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('No importable sheets found', response.data['error'])
+
+
+class CompressedUploadTest(AuthenticatedClientMixin, TemporaryMediaRootMixin, TestCase):
+    def _archive(self):
+        output = io.BytesIO()
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('bitung.csv', 'name,reg_number\nKM Satu,R1\nKM Dua,R2\n')
+            archive.writestr('ambon/ships.csv.gz', gzip.compress(b'name,reg_number,length\nKM Tiga,R3,abc\nKM Empat,R4,10\n'))
+            archive.writestr('README.txt', 'not imported')
+            archive.writestr('__MACOSX/._bitung.csv', 'metadata')
+        return SimpleUploadedFile('ships.zip', output.getvalue())
+
+    def test_gzipped_csv_is_decompressed_while_streamed(self):
+        upload = SimpleUploadedFile('ships.csv.gz', gzip.compress(b'name,reg_number\nKM Satu,R1\nKM Dua,R2\n'))
+        response = self.client.post('/api/ships/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['created_count'], 2)
+        self.assertEqual(Ship.objects.count(), 2)  # type: ignore
+
+    def _assert_archive_imported(self, response):
+        self.assertEqual(response.status_code, 206, response.data)
+        self.assertEqual([entry['file'] for entry in response.data['files']], ['bitung.csv', 'ambon/ships.csv.gz'])
+        self.assertEqual([entry['rows'] for entry in response.data['files']], [2, 2])
+        self.assertEqual(response.data['created_count'], 3)
+        self.assertEqual(response.data['error_count'], 1)
+        self.assertEqual(len(response.data['errors']), 1)
+        self.assertTrue(response.data['errors'][0].startswith('ambon/ships.csv.gz: Row 1:'))
+        self.assertIsNotNone(response.data['files'][1]['result']['rejected_rows_url'])
+        self.assertEqual(
+            sorted(Ship.objects.values_list('reg_number', flat=True)), ['R1', 'R2', 'R4']  # type: ignore
+        )
+
+    @override_settings(IMPORT_PARSE_PROCESSES=1)
+    def test_zip_members_are_imported_in_archive_order(self):
+        self._assert_archive_imported(self.client.post('/api/ships/import/', {'file': self._archive()}, format='multipart'))
+
+    @override_settings(IMPORT_PARSE_PROCESSES=2)
+    def test_zip_members_are_parsed_in_a_process_pool(self):
+        self._assert_archive_imported(self.client.post('/api/ships/import/', {'file': self._archive()}, format='multipart'))
+
+    @override_settings(IMPORT_PARSE_PROCESSES=1)
+    def test_start_row_runs_on_across_members(self):
+        progress = mock.Mock()
+        result = import_archive(get_spec('ships'), self._archive(), progress=progress, start_row=3)
+        self.assertEqual(list(Ship.objects.values_list('reg_number', flat=True)), ['R4'])  # type: ignore
+        self.assertEqual(result['created_count'], 1)
+        rows_processed, error_count, state = progress.call_args.args
+        self.assertEqual((rows_processed, error_count), (4, 0))
+        self.assertEqual(state['member']['counts']['created'], 1)
+
+    @override_settings(IMPORT_PARSE_PROCESSES=1)
+    def test_resumed_archive_carries_on_completed_members(self):
+        progress = mock.Mock()
+        with mock.patch('imports.engine.bulk_upsert', side_effect=[(2, 0, 0), Exception('database went away')]):
+            with self.assertRaises(Exception):
+                import_archive(get_spec('ships'), self._archive(), progress=progress)
+        rows_processed, _error_count, state = progress.call_args.args
+
+        result = import_archive(get_spec('ships'), self._archive(), start_row=rows_processed, resume=state)
+        self.assertEqual([entry['result']['created_count'] for entry in result['files']], [2, 1])
+        self.assertEqual(result['created_count'], 3)
+        self.assertEqual(result['error_count'], 1)
+
+    @override_settings(IMPORT_PARSE_PROCESSES=1, IMPORT_CHUNK_SIZE=1)
+    def test_members_are_read_as_their_chunks_are_imported(self):
+        produced = []
+
+        def read(*args):
+            for chunk in read_archive_member(*args):
+                produced.append(args[1])
+                yield chunk
+
+        seen = []
+        with mock.patch('imports.archives.read_archive_member', read):
+            import_archive(get_spec('ships'), self._archive(), progress=lambda *args: seen.append(list(produced)))
+        self.assertEqual(seen[0], ['bitung.csv'])
+        self.assertEqual(len(produced), 4)
+
+    @override_settings(IMPORT_MAX_UNCOMPRESSED_SIZE=50)
+    def test_archive_declaring_more_than_the_uncompressed_limit_is_rejected(self):
+        response = self.client.post('/api/ships/import/', {'file': self._archive()}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.data['error'].startswith('The archive is too large.'))
+        self.assertEqual(Ship.objects.count(), 0)  # type: ignore
+
+    def _gzip_bomb(self):
+        output = io.BytesIO()
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED) as archive:
+            archive.writestr('bitung.csv', 'name,reg_number\nKM Satu,R1\n')
+            archive.writestr('bomb.csv.gz', gzip.compress(b'name,reg_number\n' + b'KM Bom,R9\n' * 100000))
+        return SimpleUploadedFile('ships.zip', output.getvalue())
+
+    @override_settings(IMPORT_MAX_UNCOMPRESSED_SIZE=10000, IMPORT_PARSE_PROCESSES=1)
+    def test_member_decompressing_past_its_share_of_the_limit_is_rejected(self):
+        response = self.client.post('/api/ships/import/', {'file': self._gzip_bomb()}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.data['error'].startswith("File 'bomb.csv.gz': The file is larger than"))
+        self.assertEqual(Ship.objects.count(), 0)  # type: ignore
+
+    @override_settings(IMPORT_MAX_UNCOMPRESSED_SIZE=10000, IMPORT_PARSE_PROCESSES=2)
+    def test_member_decompressing_past_its_share_of_the_limit_is_rejected_in_a_worker(self):
+        response = self.client.post('/api/ships/import/', {'file': self._gzip_bomb()}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.data['error'].startswith("File 'bomb.csv.gz': The file is larger than"))
+
+    @override_settings(IMPORT_PARSE_PROCESSES=1)
+    def test_member_that_is_not_utf8_is_rejected_with_its_name(self):
+        output = io.BytesIO()
+        with zipfile.ZipFile(output, 'w') as archive:
+            archive.writestr('bitung.csv', 'name,reg_number\nKM Satu,R1\n')
+            archive.writestr('ambon.csv', 'name,reg_number,home_port\nKM Dua,R2,Pelabuhan Ñ\n'.encode('latin-1'))
+        response = self.client.post(
+            '/api/ships/import/', {'file': SimpleUploadedFile('ships.zip', output.getvalue())}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.data['error'].startswith("File 'ambon.csv': "), response.data['error'])
+        self.assertIn('utf-8', response.data['error'])
+        self.assertEqual(Ship.objects.count(), 0)  # type: ignore
+
+    def test_archive_without_csv_files_is_rejected(self):
+        output = io.BytesIO()
+        with zipfile.ZipFile(output, 'w') as archive:
+            archive.writestr('README.txt', 'nothing to import')
+        response = self.client.post(
+            '/api/ships/import/', {'file': SimpleUploadedFile('ships.zip', output.getvalue())}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], 'The archive does not contain any CSV files.')
+
+
+class ExportTest(AuthenticatedClientMixin, TestCase):
+    def _content(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_ships_are_streamed_in_keyset_batches(self):
+        for number in range(5):
+            Ship.objects.create(  # type: ignore
+                name=f'KM {number}', reg_number=f'R{number}', length=Decimal('12.50'), active=number % 2 == 0
+            )
+        response = self.client.get('/api/ships/export.csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="ships.csv"')
+        with CaptureQueriesContext(connection) as queries:
+            lines = self._content(response).splitlines()
+        self.assertEqual(len(queries), 3)
+        self.assertEqual(lines[0], 'name,reg_number,length,width,gross_tonnage,year_built,home_port,active')
+        self.assertEqual(lines[1], 'KM 0,R0,12.50,,,,,true')
+        self.assertEqual(lines[2], 'KM 1,R1,12.50,,,,,false')
+        self.assertEqual(len(lines), 6)
+
+    def test_exported_ships_can_be_imported_again(self):
+        Ship.objects.create(name='KM Satu', reg_number='R1', gross_tonnage=Decimal('30.25'), home_port='Bitung')  # type: ignore
+        exported = self._content(self.client.get('/api/ships/export.csv'))
+        result = run_import(get_spec('ships'), read_csv_chunks(io.StringIO(exported)))
+        self.assertEqual(result['error_count'], 0)
+        self.assertEqual(result['updated_count'], 1)
+        self.assertEqual(Ship.objects.get().gross_tonnage, Decimal('30.25'))  # type: ignore
+
+    def test_fish_are_exported_with_their_species_name(self):
+        tuna = FishSpecies.objects.create(name='Tuna')  # type: ignore
+        Fish.objects.create(species=tuna, name='Bluefin', notes='Caught, then released')  # type: ignore
+        lines = self._content(self.client.get('/api/fishs/fish/export.csv')).splitlines()
+        self.assertEqual(lines, ['species_name,name,notes', 'Tuna,Bluefin,"Caught, then released"'])
+
+    def test_fishing_areas_are_exported_with_import_columns(self):
+        FishingArea.objects.create(name='Utara', code='N001', coordinates='[[106.8, -6.2]]')  # type: ignore
+        lines = self._content(self.client.get('/api/regions/export.csv')).splitlines()
+        self.assertEqual(lines, ['name,code,description,coordinates', 'Utara,N001,,"[[106.8, -6.2]]"'])
+
+    def _sheet_rows(self, response):
+        content = b''.join(response.streaming_content)
+        workbook = load_workbook(io.BytesIO(content), read_only=True)
+        try:
+            return workbook.sheetnames, list(workbook.worksheets[0].iter_rows(values_only=True))
+        finally:
+            workbook.close()
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_ships_are_exported_as_a_reimportable_workbook(self):
+        for number in range(3):
+            Ship.objects.create(name=f'KM {number}', reg_number=f'R{number}', length=Decimal('12.50'))  # type: ignore
+        response = self.client.get('/api/ships/export.xlsx')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="ships.xlsx"')
+        titles, rows = self._sheet_rows(response)
+        self.assertEqual(titles, ['ships'])
+        self.assertEqual(rows[0], ('name', 'reg_number', 'length', 'width', 'gross_tonnage', 'year_built', 'home_port', 'active'))
+        self.assertEqual(rows[1], ('KM 0', 'R0', 12.5, None, None, None, None, True))
+        self.assertEqual(len(rows), 4)
+
+        exported = self.client.get('/api/ships/export.xlsx')
+        upload = SimpleUploadedFile('ships.xlsx', b''.join(exported.streaming_content))
+        result = run_import(get_spec('ships'), read_chunks(upload))
+        self.assertEqual(result['error_count'], 0)
+        self.assertEqual(result['updated_count'], 3)
+
+    def test_species_and_fish_are_exported_as_workbooks(self):
+        tuna = FishSpecies.objects.create(name='Tuna', description='Pelagic')  # type: ignore
+        Fish.objects.create(species=tuna, notes='Tagged')  # type: ignore
+        titles, rows = self._sheet_rows(self.client.get('/api/fishs/species/export.xlsx'))
+        self.assertEqual(titles, ['fish_species'])
+        self.assertEqual(rows, [('name', 'scientific_name', 'description'), ('Tuna', None, 'Pelagic')])
+        titles, rows = self._sheet_rows(self.client.get('/api/fishs/fish/export.xlsx'))
+        self.assertEqual(titles, ['fish'])
+        self.assertEqual(rows, [('species_name', 'name', 'notes'), ('Tuna', None, 'Tagged')])
+
+
+class TemplateTest(AuthenticatedClientMixin, TestCase):
+    def test_template_is_served_with_etag_and_revalidated_with_304(self):
+        response = self.client.get('/api/ships/template/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="ship_template.csv"')
+        self.assertTrue(response.content.startswith(b'name,reg_number,length,width,gross_tonnage'))
+        etag = response['ETag']
+        self.assertFalse(etag.startswith('W/'))
+
+        response = self.client.get('/api/ships/template/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get('/api/ships/template/', HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_bytes_are_built_once_per_process(self):
+        template = get_template('fish')
+        self.client.get('/api/fishs/fish/template/')
+        with mock.patch('imports.templates.csv.writer') as writer:
+            response = self.client.get('/api/fishs/fish/template/')
+        writer.assert_not_called()
+        self.assertEqual(response.content, template.csv_bytes)
+
+    def test_templates_can_be_imported(self):
+        for kind in ['fish_species', 'fish', 'ships', 'fishing_areas']:
+            template = get_template(kind)
+            for file_format in ['csv', 'xlsx']:
+                upload = SimpleUploadedFile(f'{template.filename}.{file_format}', template.content(file_format))
+                result = run_import(get_spec(kind), read_chunks(upload))
+                self.assertEqual(result['error_count'], 0, (kind, file_format, result))
+
+    def test_xlsx_template_has_its_own_etag(self):
+        csv_etag = self.client.get('/api/regions/download-template/')['ETag']
+        response = self.client.get('/api/regions/download-template/', {'file_format': 'xlsx'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="fishing_area_template.xlsx"')
+        self.assertNotEqual(response['ETag'], csv_etag)
+        workbook = load_workbook(io.BytesIO(response.content), read_only=True)
+        self.assertEqual(workbook.sheetnames, ['fishing_areas'])
+        workbook.close()
+        self.assertEqual(self.client.get('/api/regions/download-template/', {'file_format': 'pdf'}).status_code, 400)
+
+
+    def test_xlsx_template_bytes_stay_the_same_with_their_etag(self):
+        template = get_template('ships')
+        first = ImportTemplate(template.spec, template.filename, template.rows)
+        second = ImportTemplate(template.spec, template.filename, template.rows)
+        first_bytes = first.content('xlsx')
+        # Built an hour later, as another worker process would
+        later = time.localtime(time.time() + 3600)
+        with mock.patch('zipfile.time.localtime', return_value=later):
+            second_bytes = second.content('xlsx')
+        self.assertEqual(second_bytes, first_bytes)
+        self.assertEqual(second.etag('xlsx'), first.etag('xlsx'))
+        self.assertIn(hashlib.sha256(first_bytes).hexdigest()[:32], first.etag('xlsx'))
+
+class BenchmarkTest(TemporaryMediaRootMixin, TestCase):
+    def test_benchmark_writes_report_and_rolls_back(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'report.json')
+            call_command('benchmark_imports', sizes=[25], output=output, use_database=True, stdout=io.StringIO())
+            with open(output, encoding='utf-8') as report_file:
+                report = json.load(report_file)
+
+        self.assertEqual(len(report['cases']), 8)
+        for case in report['cases']:
+            self.assertIn(case['status_code'], (200, 201), case)
+            self.assertEqual(case['error_count'], 0, case)
+            self.assertGreater(case['rows_per_second'], 0)
+            self.assertGreater(case['queries'], 0)
+            self.assertGreater(case['peak_memory_bytes'], 0)
+        self.assertFalse(Ship.objects.exists())  # type: ignore
+        self.assertFalse(Fish.objects.exists())  # type: ignore
+
+    def test_compare_reports_flags_regressions_beyond_tolerance(self):
+        case = {'kind': 'ships', 'format': 'csv', 'rows': 1000}
+        baseline = {'cases': [{**case, 'rows_per_second': 1000, 'queries': 10, 'peak_memory_bytes': 100}]}
+        report = {'cases': [{**case, 'rows_per_second': 850, 'queries': 10, 'peak_memory_bytes': 105}]}
+        comparisons = {comparison['metric']: comparison for comparison in compare_reports(report, baseline, tolerance=0.1)}
+        self.assertTrue(comparisons['rows_per_second']['regression'])
+        self.assertFalse(comparisons['queries']['regression'])
+        self.assertFalse(comparisons['peak_memory_bytes']['regression'])
+
+    def test_baseline_regression_fails_the_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = os.path.join(directory, 'baseline.json')
+            with open(baseline, 'w', encoding='utf-8') as baseline_file:
+                json.dump({'cases': [{'kind': 'ships', 'format': 'csv', 'rows': 10, 'queries': 1}]}, baseline_file)
+            with self.assertRaises(CommandError):
+                call_command(
+                    'benchmark_imports', kinds=['ships'], formats=['csv'], sizes=[10],
+                    baseline=baseline, use_database=True, stdout=io.StringIO()
+                )
+
+    def test_failed_case_has_no_throughput_and_fails_the_command(self):
+        stdout = io.StringIO()
+        # Without their species the fish rows are rejected
+        with mock.patch('imports.benchmark._prepare'), self.assertRaises(CommandError):
+            call_command(
+                'benchmark_imports', kinds=['fish'], formats=['csv'], sizes=[10], use_database=True, stdout=stdout
+            )
+        self.assertIn('FAILED', stdout.getvalue())
+        self.assertIn('fish/csv/10 failed with HTTP 206', stdout.getvalue())
+
+    @override_settings(IMPORT_MAX_UPLOAD_SIZE=100)
+    def test_upload_limit_is_raised_for_the_generated_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            case = run_case('ships', 'csv', 20, directory, trace_memory=False)
+        self.assertEqual(case['status_code'], 201)
+        self.assertFalse(case['failed'])
+        self.assertFalse(Ship.objects.exists())  # type: ignore
+
+    def test_command_uses_a_throwaway_database_by_default(self):
+        with mock.patch('imports.benchmark.connection.creation.create_test_db') as create, \
+                mock.patch('imports.benchmark.connection.creation.destroy_test_db') as destroy:
+            call_command('benchmark_imports', kinds=['ships'], formats=['csv'], sizes=[5], stdout=io.StringIO())
+        create.assert_called_once()
+        destroy.assert_called_once()
@@ -0,0 +1,225 @@
+"""
+Streaming uploads for the import endpoints.
+
+Django's multipart parser reads the whole request body before
+``request.FILES`` is available, so an import over a slow connection
+normally cannot start until the last byte has arrived. For a CSV import the
+endpoints instead parse the multipart body in a background thread with
+StreamingImportUploadHandler, which passes every received block of the file
+on to an UploadPipe; the request thread reads its CSV chunks from the pipe,
+so validating and writing the first chunks overlaps with receiving the
+rest of the file. The thread only reads the request body; everything that
+touches the database stays in the request thread.
+
+The handler also enforces IMPORT_MAX_UPLOAD_SIZE: a request whose declared
+length is over the limit is refused before any of its body is read, and an
+upload without a declared length is stopped as soon as it passes the limit,
+instead of being spooled first.
+"""
+import io
+import queue
+import threading
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from rest_framework.request import Empty
+
+from .readers import CSV_EXTENSIONS
+
+# Received blocks buffered between the upload thread and the importer (64 KiB each)
+PIPE_BLOCKS = 64
+
+_EOF = object()
+
+
+class UploadTooLarge(Exception):
+    """An upload over IMPORT_MAX_UPLOAD_SIZE"""
+
+    def __init__(self, max_size):
+        super().__init__(f'File is too large. The maximum upload size is {max_size // (1024 * 1024)} MB.')
+        self.max_size = max_size
+
+
+def get_max_upload_size():
+    """Largest accepted import upload in bytes, configurable with IMPORT_MAX_UPLOAD_SIZE"""
+    return getattr(settings, 'IMPORT_MAX_UPLOAD_SIZE', 100 * 1024 * 1024)
+
+
+class UploadPipe(io.RawIOBase):
+    """
+    A read-only file fed with the blocks of an upload as they arrive.
+
+    ``read`` blocks until data is available and returns b'' once the upload
+    is complete; an error passed to ``finish`` is raised in the reader. The
+    buffer is bounded, so a slow reader slows the upload down instead of
+    the upload piling up in memory. Closing the pipe from the reading side
+    makes further writes no-ops.
+    """
+
+    def __init__(self, max_blocks=None):
+        super().__init__()
+        self._queue = queue.Queue(maxsize=max_blocks or PIPE_BLOCKS)
+        self._pending = b''
+        self._done = False
+
+    def readable(self):
+        return True
+
+    def _put(self, item):
+        while not self.closed:
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def write_block(self, data):
+        self._put(bytes(data))
+
+    def finish(self, error=None):
+        """Mark the end of the upload, or the error that ended it"""
+        self._put(_EOF if error is None else error)
+
+    def readinto(self, buffer):
+        while not self._pending and not self._done:
+            item = self._queue.get()
+            if item is _EOF:
+                self._done = True
+            elif isinstance(item, BaseException):
+                self._done = True
+                raise item
+            else:
+                self._pending = item
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+class StreamingImportUploadHandler(TemporaryFileUploadHandler):
+    """
+    Spools uploads to a temporary file, enforcing IMPORT_MAX_UPLOAD_SIZE.
+
+    With ``on_csv_file``, the blocks of the CSV ``file`` part are also
+    written to an UploadPipe as they arrive; ``on_csv_file(name, pipe)`` is
+    called when that part starts.
+    """
+
+    def __init__(self, request=None, on_csv_file=None):
+        super().__init__(request)
+        self.max_size = get_max_upload_size()
+        self.on_csv_file = on_csv_file
+        self.pipe = None
+        self.received = 0
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length and content_length > self.max_size:
+            raise UploadTooLarge(self.max_size)
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        if self.on_csv_file and field_name == 'file' and file_name.lower().endswith(CSV_EXTENSIONS):
+            self.pipe = UploadPipe()
+            self.on_csv_file(file_name, self.pipe)
+            self.on_csv_file = None
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            raise UploadTooLarge(self.max_size)
+        if self.pipe is not None:
+            self.pipe.write_block(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if self.pipe is not None:
+            self.pipe.finish()
+            self.pipe = None
+        return super().file_complete(file_size)
+
+    def upload_interrupted(self):
+        if self.pipe is not None:
+            self.pipe.finish(ValueError('The upload was interrupted'))
+            self.pipe = None
+        return super().upload_interrupted()
+
+
+class StreamingUpload:
+    """
+    The multipart body of an import request, received in a background thread.
+
+    After ``start``, ``csv_stream`` is a binary file streaming the CSV
+    ``file`` part while it arrives, or None when the request has no CSV
+    file (or was not streamed); ``wait`` returns once the whole body has
+    been parsed and re-raises a parse error such as UploadTooLarge.
+    """
+
+    def __init__(self, request, stream=True):
+        self.request = request
+        self.file_name = None
+        self.csv_stream = None
+        self.error = None
+        self._started = threading.Event()
+        self._thread = None
+        self._handler = StreamingImportUploadHandler(request._request, self._csv_file if stream else None)
+        self._stream = stream
+
+    def _csv_file(self, file_name, pipe):
+        self.file_name = file_name
+        self._pipe = pipe
+        self.csv_stream = io.BufferedReader(pipe)
+        self._started.set()
+
+    def _parse(self):
+        try:
+            self.request.FILES
+        except Exception as e:
+            self.error = e
+            if self._handler.pipe is not None:
+                self._handler.pipe.finish(e)
+        finally:
+            self._started.set()
+
+    def start(self):
+        """Install the handler and start parsing; returns when the CSV file starts or parsing has ended"""
+        self.request._request.upload_handlers = [self._handler]
+        if not self._stream:
+            self._parse()
+            return self
+        self._thread = threading.Thread(target=self._parse, name='import-upload', daemon=True)
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    def close(self):
+        """Stop streaming and wait until the rest of the body has been received"""
+        if self.csv_stream is not None:
+            # Nothing reads the pipe any more; the thread only spools the rest of the upload
+            self._pipe.close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def wait(self):
+        """Wait for the whole body, raising the error that stopped parsing it"""
+        self.close()
+        if self.error is not None:
+            raise self.error
+
+
+def check_upload_size(file):
+    """Raise UploadTooLarge for a received file over IMPORT_MAX_UPLOAD_SIZE"""
+    max_size = get_max_upload_size()
+    if file.size > max_size:
+        raise UploadTooLarge(max_size)
+
+
+def receive_upload(request, stream=True):
+    """
+    Start receiving the upload of an import request, see StreamingUpload.
+
+    Returns None when the body was already parsed (e.g. by a middleware),
+    in which case the size limit is checked on the parsed file instead.
+    """
+    if hasattr(request._request, '_files') or getattr(request, '_files', Empty) is not Empty:
+        return None
+    return StreamingUpload(request, stream).start()
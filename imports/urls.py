@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+app_name = 'imports'
+
+urlpatterns = [
+    path('workbook/', views.import_workbook_view, name='import-workbook'),
+    path('jobs/<int:job_id>/', views.get_import_job, name='import-job-detail'),
+    path('jobs/<int:job_id>/resume/', views.resume_import_job, name='import-job-resume'),
+    path('rejected/<uuid:report_id>/', views.download_rejected_rows, name='rejected-rows'),
+]
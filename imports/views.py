@@ -0,0 +1,379 @@
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.types import OpenApiTypes
+
+from .columns import ImportFileError
+from .engine import import_file, run_import
+from .exports import iter_csv, iter_ndjson, write_xlsx
+from .jobs import (
+    chunked_import_response_data, create_job, is_async_request, is_chunked_commit_request, is_resumable,
+    job_accepted_data, resume_job, run_job_now, user_jobs
+)
+from .models import ImportJob
+from .options import is_dry_run_request
+from .readers import open_csv, read_csv_chunks
+from .rejects import find_rejected_rows_report
+from .schema import DRY_RUN_PARAMETER
+from .workbook import SHEET_KINDS, import_workbook
+from .serializers import ImportJobSerializer
+from .templates import TEMPLATE_FORMATS, get_template
+from .uploads import UploadTooLarge, check_upload_size, receive_upload
+
+
+def import_file_response(request, spec, created_status=status.HTTP_201_CREATED,
+                         partial_status=status.HTTP_206_PARTIAL_CONTENT):
+    """
+    Handle a file upload to the import endpoint of ``spec``.
+
+    Shared by every import view: the upload is queued with ?async=1, run as a
+    resumable job with ?commit=chunk, or otherwise imported as one
+    transaction that is rolled back on any error. A CSV imported directly is
+    parsed while it is still being uploaded (see imports.uploads); uploads
+    over IMPORT_MAX_UPLOAD_SIZE answer 413. ``created_status`` answers an
+    import without rejected rows and ``partial_status`` one with them; dry
+    runs without rejected rows answer 200.
+    """
+    # Large files can be queued and processed by the import worker;
+    # dry runs write nothing and always answer directly
+    dry_run = is_dry_run_request(request)
+    queued = (is_async_request(request) or is_chunked_commit_request(request)) and not dry_run
+    upload = None
+    try:
+        # Queued imports store the whole file first, so only direct imports are streamed
+        upload = receive_upload(request, stream=not queued)
+        streamed = upload is not None and upload.csv_stream is not None
+        if streamed:
+            file, file_name = None, upload.file_name
+        else:
+            if upload is not None:
+                upload.wait()
+            file = request.FILES.get('file')
+            if not file:
+                return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
+            check_upload_size(file)
+            file_name = file.name
+        if not file_name.lower().endswith(spec.extensions):
+            return Response(
+                {'error': 'Unsupported file format. Please upload CSV or Excel file.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if is_async_request(request) and not dry_run:
+            job = create_job(spec.kind, file, request.user)
+            return Response(job_accepted_data(request, job), status=status.HTTP_202_ACCEPTED)
+
+        # Chunked-commit mode: every chunk commits on its own together with the
+        # job's checkpoint, so a failed import can be resumed instead of restarted
+        if is_chunked_commit_request(request) and not dry_run:
+            job = run_job_now(create_job(spec.kind, file, request.user))
+            response_data, failed = chunked_import_response_data(request, job)
+            if failed:
+                return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            # Process the data one chunk at a time so memory stays bounded; the
+            # whole file is one transaction that is rolled back on any error
+            with transaction.atomic():
+                if streamed:
+                    response_data = run_import(
+                        spec, read_csv_chunks(open_csv(upload.csv_stream, file_name)), dry_run=dry_run,
+                        owner=request.user.pk
+                    )
+                    # The rest of the body must arrive intact for the import to count
+                    upload.wait()
+                else:
+                    response_data = import_file(spec, file, dry_run=dry_run, owner=request.user.pk)
+
+    except UploadTooLarge as e:
+        return Response({'error': str(e)}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+    except ImportFileError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({'error': f'Failed to process file: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
+    finally:
+        if upload is not None:
+            upload.close()
+
+    if response_data['error_count']:
+        response_data['warning'] = 'Some rows had errors during import'
+        return Response(response_data, status=partial_status)
+    return Response(response_data, status=status.HTTP_200_OK if dry_run else created_status)
+
+
+def template_response(request, kind):
+    """
+    Send the import template of ``kind`` as CSV, or as XLSX with ?file_format=xlsx.
+
+    The bytes are built once per process (see imports.templates); a request
+    whose If-None-Match names the current ETag answers 304 without a body.
+    """
+    file_format = request.query_params.get('file_format', 'csv').lower()
+    if file_format not in TEMPLATE_FORMATS:
+        return Response(
+            {'error': f"Unsupported template format. Use one of: {', '.join(TEMPLATE_FORMATS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    template = get_template(kind)
+    etag = template.etag(file_format)
+    if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+    if etag in if_none_match or '*' in if_none_match:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(template.content(file_format), content_type=TEMPLATE_FORMATS[file_format])
+        response['Content-Disposition'] = f'attachment; filename="{template.filename}.{file_format}"'
+    response['ETag'] = etag
+    # Clients revalidate on every use, which costs a 304 while the template is unchanged
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def csv_export_response(spec, queryset, filename):
+    """Stream ``queryset`` as a CSV file with the import columns of ``spec``, see imports.exports"""
+    response = StreamingHttpResponse(iter_csv(spec, queryset), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def ndjson_export_response(queryset, fields, filename, converters=None):
+    """Stream ``fields`` of ``queryset`` as NDJSON (one JSON object per line), see imports.exports"""
+    response = StreamingHttpResponse(
+        iter_ndjson(queryset, fields, converters), content_type='application/x-ndjson; charset=utf-8'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def xlsx_export_response(spec, queryset, filename):
+    """Send ``queryset`` as an XLSX workbook with the import columns of ``spec``, see imports.exports"""
+    return FileResponse(
+        write_xlsx(spec, queryset), as_attachment=True, filename=filename,
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+
+
+@extend_schema(
+    summary="Status Pekerjaan Impor",
+    description="""
+    Mengambil status pekerjaan impor yang dijalankan di latar belakang
+    (endpoint impor dengan parameter ?async=1). Pengguna hanya dapat melihat
+    pekerjaan impor miliknya sendiri; staf dapat melihat semua pekerjaan.
+    
+    Status: pending, running, completed, failed. Selama impor berjalan,
+    rows_processed dan error_count diperbarui setiap potongan (chunk) selesai;
+    rows_per_second menunjukkan kecepatan rata-rata. checkpoint_offset adalah jumlah
+    baris yang sudah di-commit; pekerjaan yang gagal dapat dilanjutkan dari sana.
+    Setelah selesai, result berisi ringkasan yang sama dengan respons impor sinkron
+    dan errors berisi daftar error per baris.
+    """,
+    responses={200: ImportJobSerializer}
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_import_job(request, job_id):
+    """
+    Get the status of a background import job by ID; users only see their own jobs, staff every job
+    """
+    try:
+        job = user_jobs(request.user).get(id=job_id)
+    except ImportJob.DoesNotExist:  # type: ignore
+        return Response({'error': 'Import job not found'}, status=status.HTTP_404_NOT_FOUND)
+    serializer = ImportJobSerializer(job)
+    return Response(serializer.data)
+
+@extend_schema(
+    summary="Lanjutkan Pekerjaan Impor",
+    description="""
+    Mengantrekan kembali pekerjaan impor yang gagal, atau yang berhenti melaporkan
+    progres (misalnya karena worker dimatikan), agar dilanjutkan oleh worker impor.
+    
+    Setiap potongan (chunk) di-commit bersama checkpoint_offset, sehingga impor
+    dilanjutkan dari baris setelah checkpoint terakhir, bukan dari baris pertama.
+    Hanya pemilik pekerjaan (atau staf) yang dapat melanjutkannya, dan hanya selama
+    file unggahannya masih disimpan (IMPORT_JOB_RETENTION_DAYS).
+    """,
+    request=None,
+    responses={
+        202: {
+            'type': 'object',
+            'properties': {
+                'message': {'type': 'string'},
+                'job_id': {'type': 'integer'},
+                'status': {'type': 'string'},
+                'status_url': {'type': 'string'}
+            }
+        },
+        409: {
+            'type': 'object',
+            'properties': {
+                'error': {'type': 'string'}
+            }
+        }
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def resume_import_job(request, job_id):
+    """
+    Queue a failed or stale import job again from its checkpoint; users only resume their own jobs
+    """
+    try:
+        job = user_jobs(request.user).get(id=job_id)
+    except ImportJob.DoesNotExist:  # type: ignore
+        return Response({'error': 'Import job not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    if not is_resumable(job) or not resume_job(job):
+        return Response(
+            {'error': f'Import job cannot be resumed while it is {job.status}'},
+            status=status.HTTP_409_CONFLICT
+        )
+    data = job_accepted_data(request, job)
+    data['checkpoint_offset'] = job.checkpoint_offset
+    return Response(data, status=status.HTTP_202_ACCEPTED)
+
+@extend_schema(
+    summary="Unduh Laporan Baris yang Ditolak",
+    description="""
+    Mengunduh laporan CSV berisi semua baris yang ditolak oleh sebuah impor
+    (rejected_rows_url pada respons impor). Setiap baris memuat nomor baris,
+    kolom, alasan penolakan, dan isi baris asli dari file yang diunggah.
+    
+    Laporan hanya dapat diunduh oleh pengguna yang menjalankan impor; staf dapat
+    mengunduh semua laporan. Laporan pengguna lain dijawab 404.
+    """,
+    responses={200: OpenApiTypes.BINARY}
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def download_rejected_rows(request, report_id):
+    """
+    Download the rejected-rows CSV report of an import; users only get their own reports, staff every report
+    """
+    path = find_rejected_rows_report(report_id.hex, request.user)
+    if path is None:
+        return Response({'error': 'Rejected rows report not found'}, status=status.HTTP_404_NOT_FOUND)
+    return FileResponse(
+        default_storage.open(path, 'rb'),
+        as_attachment=True,
+        filename=f'rejected_rows_{report_id.hex}.csv',
+        content_type='text/csv'
+    )
+
+@extend_schema(
+    summary="Impor Workbook Multi-Sheet",
+    description="""
+    Mengimpor beberapa jenis data sekaligus dari satu workbook Excel (.xlsx).
+    
+    Setiap sheet dikenali dari namanya (tanpa memperhatikan huruf besar/kecil dan spasi):
+    - ships / kapal
+    - fish_species / species / jenis_ikan
+    - fish / ikan
+    - fishing_areas / wilayah_penangkapan / wilayah
+    
+    Kolom setiap sheet sama dengan endpoint impor masing-masing. Sheet lain diabaikan
+    (ignored_sheets). Sheet di-parse secara paralel dalam beberapa proses, lalu diterapkan
+    berurutan: jenis ikan, ikan, kapal, wilayah penangkapan, sehingga ikan dapat merujuk
+    jenis ikan dari workbook yang sama. Seluruh workbook diimpor dalam satu transaksi.
+    
+    Respons memuat hasil per sheet beserta jumlah baris, waktu parsing, waktu impor,
+    dan throughput (rows_per_second). Dengan ?dry_run=1 workbook hanya divalidasi;
+    jenis ikan baru dari workbook belum ada sehingga ikan yang merujuknya dilaporkan.
+    """,
+    parameters=[DRY_RUN_PARAMETER],
+    request={
+        'multipart/form-data': {
+            'type': 'object',
+            'properties': {
+                'file': {
+                    'type': 'string',
+                    'format': 'binary'
+                }
+            }
+        }
+    },
+    responses={
+        201: {
+            'type': 'object',
+            'properties': {
+                'message': {'type': 'string'},
+                'error_count': {'type': 'integer'},
+                'sheets': {
+                    'type': 'array',
+                    'items': {
+                        'type': 'object',
+                        'properties': {
+                            'sheet': {'type': 'string'},
+                            'kind': {'type': 'string'},
+                            'rows': {'type': 'integer'},
+                            'parse_seconds': {'type': 'number'},
+                            'import_seconds': {'type': 'number'},
+                            'rows_per_second': {'type': 'number'},
+                            'result': {'type': 'object'}
+                        }
+                    }
+                },
+                'ignored_sheets': {
+                    'type': 'array',
+                    'items': {'type': 'string'}
+                }
+            }
+        },
+        400: {
+            'type': 'object',
+            'properties': {
+                'error': {'type': 'string'}
+            }
+        }
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def import_workbook_view(request):
+    """
+    Import ships, fish species, fish and fishing areas from the sheets of one workbook
+    """
+    try:
+        upload = receive_upload(request, stream=False)
+        if upload is not None:
+            upload.wait()
+        file = request.FILES.get('file')
+        if file:
+            check_upload_size(file)
+    except UploadTooLarge as e:
+        return Response({'error': str(e)}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+    if not file:
+        return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if not file.name.lower().endswith('.xlsx'):
+        return Response({'error': 'File must be an Excel workbook (.xlsx)'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    dry_run = is_dry_run_request(request)
+    try:
+        with transaction.atomic():
+            response_data = import_workbook(file, dry_run=dry_run, owner=request.user.pk)
+    except ImportFileError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({'error': f'Failed to process file: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if not response_data['sheets']:
+        return Response(
+            {'error': f'No importable sheets found. Expected sheets named: {", ".join(SHEET_KINDS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    error_count = sum(sheet['result']['error_count'] for sheet in response_data['sheets'])
+    response_data = {
+        'message': f"{'Dry run: ' if dry_run else ''}{len(response_data['sheets'])} sheets processed",
+        'error_count': error_count,
+        **response_data
+    }
+    if error_count:
+        response_data['warning'] = 'Some rows had errors during import'
+        return Response(response_data, status=status.HTTP_206_PARTIAL_CONTENT)
+    return Response(response_data, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
@@ -0,0 +1,85 @@
+"""
+Multi-sheet workbook imports.
+
+One .xlsx workbook can carry a sheet per import kind (ships, fish species,
+fish, fishing areas). Parsing the sheet XML is the CPU-bound part of an Excel
+import, so the sheets are parsed in parallel worker processes (see
+imports.parallel); their chunks are applied one sheet at a time in
+dependency order (species before the fish that reference them), all inside
+the caller's transaction. Every sheet is streamed in read-only mode and its
+chunks are passed on as they are parsed, so a large sheet is never held in
+memory as a whole.
+"""
+import time
+
+from openpyxl import load_workbook
+
+from .columns import ImportFileError, normalize_header
+from .engine import run_import
+from .parallel import PartParser, upload_path
+from .readers import get_chunk_size, read_xlsx_chunks
+from .specs import get_spec
+
+# Sheet titles (after normalize_header) accepted for each import kind
+SHEET_KINDS = {
+    'ships': ['ships', 'kapal'],
+    'fish_species': ['fish_species', 'species', 'jenis_ikan'],
+    'fish': ['fish', 'ikan'],
+    'fishing_areas': ['fishing_areas', 'wilayah_penangkapan', 'wilayah'],
+}
+
+# Kinds are applied in this order, so referenced rows exist before the rows referencing them
+APPLY_ORDER = ['fish_species', 'fish', 'ships', 'fishing_areas']
+
+_TITLE_KINDS = {alias: kind for kind, aliases in SHEET_KINDS.items() for alias in aliases}
+
+
+def sheet_kind(title):
+    """Import kind of a sheet title, or None for a sheet that is not imported"""
+    return _TITLE_KINDS.get(normalize_header(title))
+
+
+def import_workbook(file, dry_run=False, owner=None):
+    """
+    Import every recognised sheet of an uploaded .xlsx workbook.
+
+    Returns the per-sheet results, each with the rows read and the seconds
+    spent parsing and importing it, and the titles of the ignored sheets.
+    A ValueError raised for a sheet is wrapped in an ImportFileError naming that sheet.
+    ``owner`` is the id of the user the rejected-rows reports are stored for.
+    """
+    with upload_path(file, '.xlsx') as path:
+        workbook = load_workbook(path, read_only=True)
+        try:
+            titles = workbook.sheetnames
+        finally:
+            workbook.close()
+
+        kinds = {title: sheet_kind(title) for title in titles}
+        ignored = [title for title, kind in kinds.items() if kind is None]
+        selected = sorted(
+            (title for title, kind in kinds.items() if kind is not None),
+            key=lambda title: APPLY_ORDER.index(kinds[title])
+        )
+        sheets = []
+        chunk_size = get_chunk_size()
+        with PartParser(read_xlsx_chunks, [(path, chunk_size, title) for title in selected]) as parts:
+            for title, part in zip(selected, parts):
+                started = time.perf_counter()
+                try:
+                    result = run_import(get_spec(kinds[title]), iter(part), dry_run=dry_run, owner=owner)
+                except ValueError as e:
+                    raise ImportFileError(f"Sheet '{title}': {e}") from e
+                # Waiting for the parser is parse time, whether it ran in this process or a worker
+                import_seconds = time.perf_counter() - started - part.waited
+                total_seconds = part.seconds + import_seconds
+                sheets.append({
+                    'sheet': title,
+                    'kind': kinds[title],
+                    'rows': part.rows,
+                    'parse_seconds': round(part.seconds, 3),
+                    'import_seconds': round(import_seconds, 3),
+                    'rows_per_second': round(part.rows / total_seconds, 1) if total_seconds > 0 else None,
+                    'result': result,
+                })
+    return {'sheets': sheets, 'ignored_sheets': ignored}
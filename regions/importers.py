@@ -0,0 +1,60 @@
+from imports.specs import ImportSpec
+from imports.templates import ImportTemplate
+from .models import FishingArea
+
+# Fields written by the importer; code is the natural key
+FISHING_AREA_IMPORT_FIELDS = ['name', 'description', 'coordinates']
+
+# Accepted header spellings per column (case and spacing are ignored)
+FISHING_AREA_IMPORT_COLUMNS = {
+    'name': ['nama', 'nama_wilayah'],
+    'code': ['kode', 'kode_wilayah'],
+    'description': ['deskripsi'],
+    'coordinates': ['koordinat'],
+}
+
+
+def summarize_fishing_area_import(counts, dry_run):
+    """Response body of a fishing area import"""
+    updated_count = counts['updated'] + counts['repeated']
+    imported_count = counts['created'] + updated_count + counts['unchanged']
+    if dry_run:
+        return {
+            'message': f'Dry run completed. {imported_count} records checked, nothing was saved.',
+            'dry_run': True,
+            'imported': imported_count,
+            'created': counts['created'],
+            'updated': updated_count,
+            'unchanged': counts['unchanged'],
+            'duplicates': counts['duplicates'] + counts['repeated'],
+        }
+    return {
+        'message': f'Import completed. {imported_count} records processed.',
+        'imported': imported_count,
+        'created': counts['created'],
+        'updated': updated_count,
+        'unchanged': counts['unchanged'],
+    }
+
+
+# Areas whose stored digest matches are skipped without loading them, so large
+# coordinates of unchanged polygons are never even read
+FISHING_AREA_IMPORT_SPEC = ImportSpec(
+    kind='fishing_areas',
+    model=FishingArea,
+    columns=FISHING_AREA_IMPORT_COLUMNS,
+    fields=FISHING_AREA_IMPORT_FIELDS,
+    key='code',
+    required=['name', 'code'],
+    require_header=True,
+    extensions=('.csv', '.csv.gz', '.zip', '.xlsx'),
+    summarize=summarize_fishing_area_import,
+)
+
+
+# Sample rows of the downloadable template, in column order
+FISHING_AREA_IMPORT_TEMPLATE = ImportTemplate(FISHING_AREA_IMPORT_SPEC, 'fishing_area_template', rows=[
+    ['Perairan Utara', 'N001', 'Wilayah penangkapan di utara', '[[106.823, -6.234], [106.825, -6.232]]'],
+    ['Perairan Selatan', 'S001', 'Wilayah penangkapan di selatan', '[[106.820, -6.240], [106.822, -6.238]]'],
+    ['Perairan Timur', 'E001', 'Wilayah penangkapan di timur', '[[106.830, -6.230], [106.832, -6.228]]'],
+])
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('regions', '0003_fishingarea_import_digest'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fishingarea',
+            index=models.Index(fields=['name', 'id'], name='fishingarea_name_id_idx'),
+        ),
+    ]
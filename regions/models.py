@@ -1,6 +1,7 @@
 from django.db import models
+from imports.models import ImportDigestModel
 
-class FishingArea(models.Model):
+class FishingArea(ImportDigestModel):
     """Model representing fishing areas/regions"""
     name = models.CharField(max_length=200, verbose_name="Nama Wilayah")
     code = models.CharField(max_length=20, unique=True, verbose_name="Kode Wilayah")
@@ -14,4 +15,8 @@ class FishingArea(models.Model):
     
     class Meta:
         verbose_name = "Wilayah Penangkapan"
-        verbose_name_plural = "Wilayah Penangkapan"
\ No newline at end of file
+        verbose_name_plural = "Wilayah Penangkapan"
+        indexes = [
+            # Keyset pagination of the fishing area list
+            models.Index(fields=['name', 'id'], name='fishingarea_name_id_idx'),
+        ]
\ No newline at end of file
@@ -1,13 +1,14 @@
 from rest_framework import serializers
+from fish_chain_optimization.fieldsets import SparseFieldsetSerializerMixin
 from .models import FishingArea
 
-class FishingAreaSerializer(serializers.ModelSerializer):
+class FishingAreaSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for FishingArea model
     """
     class Meta:
         model = FishingArea
-        fields = '__all__'
+        exclude = ('import_digest',)
         read_only_fields = ('created_at', 'updated_at')
 
 class FishingAreaImportSerializer(serializers.Serializer):
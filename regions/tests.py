@@ -2,7 +2,11 @@ from django.test import TestCase
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import json
 from .models import FishingArea
+from imports.testing import AuthenticatedClientMixin, TemporaryMediaRootMixin, csv_upload
 
 User = get_user_model()
 
@@ -12,8 +16,7 @@ class FishingAreaAPITestCase(TestCase):
         self.user = User.objects.create_user(  # type: ignore
             username='testuser',
             email='test@example.com',
-            password='testpassword123',
-            user_type='ship_owner'
+            password='testpassword123'
         )
         self.client.force_authenticate(user=self.user)
         
@@ -36,7 +39,7 @@ class FishingAreaAPITestCase(TestCase):
         FishingArea.objects.create(**self.fishing_area_data)  # type: ignore
         response = self.client.get('/api/regions/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)  # type: ignore
-        self.assertEqual(len(response.data), 1)  # type: ignore
+        self.assertEqual(len(response.data['results']), 1)  # type: ignore
 
     def test_get_fishing_area(self):
         """Test getting a specific fishing area"""
@@ -45,6 +48,16 @@ class FishingAreaAPITestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)  # type: ignore
         self.assertEqual(response.data['name'], 'Test Area')  # type: ignore
 
+    def test_list_fishing_areas_with_fields(self):
+        """Test ?fields= trims the response and the columns read"""
+        FishingArea.objects.create(**self.fishing_area_data)  # type: ignore
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/regions/', {'fields': 'id,code'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'code'})  # type: ignore
+        self.assertFalse([q for q in queries if '"coordinates"' in q['sql'] or '"description"' in q['sql']])
+        response = self.client.get('/api/regions/', {'fields': 'geometry'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)  # type: ignore
+
     def test_update_fishing_area(self):
         """Test updating a fishing area"""
         area = FishingArea.objects.create(**self.fishing_area_data)  # type: ignore
@@ -70,4 +83,79 @@ class FishingAreaAPITestCase(TestCase):
         response = self.client.get('/api/regions/download-template/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)  # type: ignore
         self.assertEqual(response['Content-Type'], 'text/csv')  # type: ignore
-        self.assertIn('attachment; filename="fishing_area_template.csv"', response['Content-Disposition'])  # type: ignore
\ No newline at end of file
+        self.assertIn('attachment; filename="fishing_area_template.csv"', response['Content-Disposition'])  # type: ignore
+
+    def test_export_ndjson_parses_coordinates(self):
+        """Test the NDJSON export sends one area per line with coordinates as JSON"""
+        FishingArea.objects.create(**self.fishing_area_data)  # type: ignore
+        FishingArea.objects.create(name='Teks', code='TX001', coordinates='Selat Makassar')  # type: ignore
+        FishingArea.objects.create(name='Kosong', code='KS001')  # type: ignore
+        response = self.client.get('/api/regions/export.ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)  # type: ignore
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')  # type: ignore
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()  # type: ignore
+        areas = [json.loads(line) for line in lines]
+        self.assertEqual([area['code'] for area in areas], ['TA001', 'TX001', 'KS001'])
+        self.assertEqual(areas[0]['coordinates'], [[106.823, -6.234], [106.825, -6.232]])
+        self.assertEqual(areas[1]['coordinates'], 'Selat Makassar')
+        self.assertIsNone(areas[2]['coordinates'])
+        self.assertEqual(set(areas[0]), {'id', 'name', 'code', 'description', 'coordinates', 'created_at', 'updated_at'})
+
+    def test_export_ndjson_keeps_non_finite_coordinates_as_text(self):
+        """Test coordinates with NaN or Infinity are sent as text, so every line stays valid JSON"""
+        FishingArea.objects.create(name='NaN', code='NA001', coordinates='[[NaN, -6.2]]')  # type: ignore
+        FishingArea.objects.create(name='Inf', code='IN001', coordinates='[[1e999, -6.2]]')  # type: ignore
+        response = self.client.get('/api/regions/export.ndjson')
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()  # type: ignore
+        strict = {'parse_constant': lambda text: self.fail(f'{text} is not valid JSON')}
+        areas = [json.loads(line, **strict) for line in lines]
+        self.assertEqual([area['coordinates'] for area in areas], ['[[NaN, -6.2]]', '[[1e999, -6.2]]'])
+
+class FishingAreaImportTestCase(AuthenticatedClientMixin, TemporaryMediaRootMixin, TestCase):
+    def _csv_file(self, rows):
+        return csv_upload('areas.csv', ['name', 'code', 'description', 'coordinates'], rows)
+
+    def test_dry_run_reports_counts_without_saving(self):
+        """Test dry run classifies rows like a real import and writes nothing"""
+        FishingArea.objects.create(name='WPP 711', code='711', coordinates='[[1, 2]]')  # type: ignore
+        csv_file = self._csv_file([
+            ['WPP 711 Laut Natuna', '711', '', '[[1, 2]]'],
+            ['WPP 713', '713', '', '[[5, 6]]'],
+            ['WPP 713', '713', 'Selat Makassar', '[[5, 6]]'],
+        ])
+        response = self.client.post('/api/regions/import/?dry_run=1', {'file': csv_file})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)  # type: ignore
+        self.assertTrue(response.data['dry_run'])  # type: ignore
+        self.assertEqual(response.data['created'], 1)  # type: ignore
+        self.assertEqual(response.data['updated'], 1)  # type: ignore
+        self.assertEqual(response.data['duplicates'], 1)  # type: ignore
+        self.assertEqual(FishingArea.objects.count(), 1)  # type: ignore
+        self.assertEqual(FishingArea.objects.get(code='711').name, 'WPP 711')  # type: ignore
+
+    def test_import_reports_created_updated_unchanged(self):
+        """Test import upserts by code and counts unchanged areas"""
+        FishingArea.objects.create(name='WPP 711', code='711', coordinates='[[1, 2]]')  # type: ignore
+        FishingArea.objects.create(name='WPP 712', code='712', coordinates='[[3, 4]]')  # type: ignore
+        csv_file = self._csv_file([
+            ['WPP 711', '711', '', '[[1, 2]]'],
+            ['WPP 712 Laut Jawa', '712', '', '[[3, 4]]'],
+            ['WPP 713', '713', 'Selat Makassar', '[[5, 6]]'],
+        ])
+        response = self.client.post('/api/regions/import/', {'file': csv_file})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)  # type: ignore
+        self.assertEqual(response.data['created'], 1)  # type: ignore
+        self.assertEqual(response.data['updated'], 1)  # type: ignore
+        self.assertEqual(response.data['unchanged'], 1)  # type: ignore
+        self.assertEqual(FishingArea.objects.get(code='712').name, 'WPP 712 Laut Jawa')  # type: ignore
+        self.assertEqual(FishingArea.objects.count(), 3)  # type: ignore
+
+    def test_import_does_not_rewrite_unchanged_coordinates(self):
+        """Test only changed columns are written on update"""
+        FishingArea.objects.create(name='WPP 711', code='711', coordinates='[[1, 2]]')  # type: ignore
+        csv_file = self._csv_file([['WPP 711 Natuna', '711', '', '[[1, 2]]']])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/regions/import/', {'file': csv_file})
+        self.assertEqual(response.data['updated'], 1)  # type: ignore
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('coordinates', updates[0])
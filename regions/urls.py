@@ -9,4 +9,7 @@ urlpatterns = [
     path('<int:area_id>/delete/', views.delete_fishing_area, name='delete-fishing-area'),
     path('import/', views.import_fishing_areas, name='import-fishing-areas'),
     path('download-template/', views.download_import_template, name='download-fishing-area-template'),
+    path('export.csv', views.export_fishing_areas_csv, name='export-fishing-areas-csv'),
+    path('export.xlsx', views.export_fishing_areas_xlsx, name='export-fishing-areas-xlsx'),
+    path('export.ndjson', views.export_fishing_areas_ndjson, name='export-fishing-areas-ndjson'),
 ]
\ No newline at end of file
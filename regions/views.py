@@ -1,8 +1,6 @@
-import pandas as pd
-import io
+import json
+import math
 from typing import Any
-from django.db import transaction
-from django.http import HttpResponse
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
@@ -10,27 +8,48 @@ from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
 
+from fish_chain_optimization.fieldsets import FIELDS_PARAMETER, sparse_queryset
+from fish_chain_optimization.pagination import KeysetPagination
 from .models import FishingArea
 from .serializers import FishingAreaSerializer, FishingAreaImportSerializer
+from .importers import FISHING_AREA_IMPORT_SPEC
+from imports.views import (
+    csv_export_response, import_file_response, ndjson_export_response, template_response, xlsx_export_response
+)
+from imports.schema import (
+    ASYNC_IMPORT_PARAMETER, COMMIT_MODE_PARAMETER, DRY_RUN_PARAMETER, IMPORT_JOB_ACCEPTED_RESPONSE,
+    TEMPLATE_FORMAT_PARAMETER
+)
 
 @extend_schema(
     summary="Daftar Wilayah Penangkapan",
-    description="Mengambil daftar semua wilayah penangkapan ikan",
+    description="""
+    Mengambil daftar wilayah penangkapan ikan, diurutkan menurut nama.
+    
+    Hasil dibagi per halaman dengan pagination kursor (keyset): respons berisi next, previous, dan
+    results; ikuti tautan next untuk halaman berikutnya, ?page_size mengatur jumlah data per halaman
+    (maksimal API_MAX_PAGE_SIZE), dan ?count=1 menambahkan jumlah seluruh data.
+    Dengan ?fields=id,name hanya field tersebut yang dikembalikan dan dibaca dari database.
+    """,
+    parameters=[FIELDS_PARAMETER],
     responses={200: FishingAreaSerializer(many=True)}
 )
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def list_fishing_areas(request):
     """
-    List all fishing areas
+    List fishing areas by name, one keyset page at a time
     """
-    areas = FishingArea.objects.all().order_by('name')  # type: ignore
-    serializer = FishingAreaSerializer(areas, many=True)
-    return Response(serializer.data)
+    paginator = KeysetPagination(ordering='name')
+    areas = sparse_queryset(FishingArea.objects.all(), FishingAreaSerializer(context={'request': request}))  # type: ignore
+    areas = paginator.paginate_queryset(areas, request)
+    serializer = FishingAreaSerializer(areas, many=True, context={'request': request})
+    return paginator.get_paginated_response(serializer.data)
 
 @extend_schema(
     summary="Detail Wilayah Penangkapan",
-    description="Mengambil detail wilayah penangkapan berdasarkan ID",
+    description="Mengambil detail wilayah penangkapan berdasarkan ID; ?fields= membatasi field yang dikembalikan",
+    parameters=[FIELDS_PARAMETER],
     responses={200: FishingAreaSerializer}
 )
 @api_view(['GET'])
@@ -40,8 +59,9 @@ def get_fishing_area(request, area_id):
     Get a specific fishing area by ID
     """
     try:
-        area = FishingArea.objects.get(id=area_id)  # type: ignore
-        serializer = FishingAreaSerializer(area)
+        areas = sparse_queryset(FishingArea.objects.all(), FishingAreaSerializer(context={'request': request}))  # type: ignore
+        area = areas.get(id=area_id)
+        serializer = FishingAreaSerializer(area, context={'request': request})
         return Response(serializer.data)
     except FishingArea.DoesNotExist:  # type: ignore
         return Response({'error': 'Fishing area not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -111,15 +131,37 @@ def delete_fishing_area(request, area_id):
     Mengimpor data wilayah penangkapan dari file CSV atau Excel.
     
     Format file yang diterima:
-    - CSV atau Excel (.xlsx)
+    - CSV atau Excel (.xlsx); CSV juga boleh terkompresi gzip (.csv.gz) atau
+      beberapa file CSV dalam satu arsip ZIP (.zip)
     - Kolom yang diperlukan: name, code
     - Kolom opsional: description, coordinates
     
+    Wilayah dengan kode yang sama diperbarui. Hanya wilayah baru dan yang berubah
+    yang ditulis ke database secara massal per batch; jumlah wilayah yang dibuat,
+    diperbarui, dan tidak berubah dilaporkan dalam respons. Wilayah yang tidak berubah sejak
+    impor terakhir dikenali dari digest isi baris sehingga koordinatnya tidak dibaca ulang. File dibaca dan diproses
+    per potongan (chunk) sehingga penggunaan memori tetap kecil. Nama kolom dikenali
+    tanpa memperhatikan huruf besar/kecil dan spasi (alias: nama, kode, deskripsi, koordinat).
+    File CSV sudah diproses selagi masih diunggah; unggahan yang melebihi batas ukuran
+    (IMPORT_MAX_UPLOAD_SIZE) langsung ditolak dengan status 413. File CSV dalam arsip ZIP
+    diurai secara paralel lalu diterapkan berurutan; hasil per file ada pada kolom files.
+    
+    Dengan ?async=1 file diproses di latar belakang oleh worker impor; respons 202 berisi
+    job_id dan progres dapat dipantau di /api/imports/jobs/<job_id>/. Dengan ?dry_run=1 file
+    hanya divalidasi tanpa menyimpan apa pun dan respons berisi laporan yang sama (dry_run, duplicates).
+    
+    Respons hanya memuat jumlah error (error_count) dan contoh error pertama; semua baris yang
+    ditolak (baris asli, kolom, alasan) dapat diunduh sebagai CSV dari rejected_rows_url.
+    
+    Dengan ?commit=chunk setiap potongan di-commit sendiri bersama checkpoint_offset; impor yang
+    gagal dapat dilanjutkan dari checkpoint melalui /api/imports/jobs/<job_id>/resume/.
+    
     Contoh format CSV:
     name,code,description,coordinates
     "Perairan Utara","N001","Wilayah penangkapan di utara","[[106.823, -6.234], [106.825, -6.232]]"
     "Perairan Selatan","S001","Wilayah penangkapan di selatan","[[106.820, -6.240], [106.822, -6.238]]"
     """,
+    parameters=[ASYNC_IMPORT_PARAMETER, DRY_RUN_PARAMETER, COMMIT_MODE_PARAMETER],
     request={
         'multipart/form-data': {
             'type': 'object',
@@ -132,11 +174,19 @@ def delete_fishing_area(request, area_id):
         }
     },
     responses={
+        202: IMPORT_JOB_ACCEPTED_RESPONSE,
         200: {
             'type': 'object',
             'properties': {
                 'message': {'type': 'string'},
                 'imported': {'type': 'integer'},
+                'created': {'type': 'integer'},
+                'updated': {'type': 'integer'},
+                'unchanged': {'type': 'integer'},
+                'dry_run': {'type': 'boolean'},
+                'duplicates': {'type': 'integer'},
+                'error_count': {'type': 'integer'},
+                'rejected_rows_url': {'type': 'string', 'nullable': True},
                 'errors': {
                     'type': 'array',
                     'items': {'type': 'string'}
@@ -157,97 +207,111 @@ def import_fishing_areas(request):
     """
     Import fishing areas from CSV or Excel file
     """
-    if 'file' not in request.FILES:
-        return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
-    
-    file = request.FILES['file']
-    
-    # Check file extension
-    if not (file.name.endswith('.csv') or file.name.endswith('.xlsx')):
-        return Response({'error': 'File must be CSV or Excel format'}, status=status.HTTP_400_BAD_REQUEST)
-    
-    try:
-        # Read file based on extension
-        if file.name.endswith('.csv'):
-            df = pd.read_csv(file)
-        else:
-            df = pd.read_excel(file)
-        
-        # Required columns
-        required_columns = ['name', 'code']
-        
-        # Check if required columns exist
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            return Response({'error': f'Missing required columns: {missing_columns}'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Process data with transaction
-        with transaction.atomic():  # type: ignore
-            imported_count = 0
-            errors = []
-            
-            for index, row in df.iterrows():
-                try:
-                    # Prepare data
-                    data = {
-                        'name': row['name'],
-                        'code': row['code'],
-                        'description': row.get('description', ''),
-                        'coordinates': row.get('coordinates', '')
-                    }
-                    
-                    # Check if area with same code already exists
-                    area, created = FishingArea.objects.get_or_create(  # type: ignore
-                        code=data['code'],
-                        defaults=data
-                    )
-                    
-                    if not created:
-                        # Update existing area
-                        for key, value in data.items():
-                            setattr(area, key, value)
-                        area.save()
-                    
-                    imported_count += 1
-                    
-                except Exception as e:
-                    errors.append(f"Row {int(str(index)) + 1}: {str(e)}")
-            
-            return Response({
-                'message': f'Import completed. {imported_count} records processed.',
-                'imported': imported_count,
-                'errors': errors
-            })
-            
-    except Exception as e:
-        return Response({'error': f'Error processing file: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
+    return import_file_response(request, FISHING_AREA_IMPORT_SPEC, status.HTTP_200_OK, status.HTTP_200_OK)
 
 @extend_schema(
     summary="Download Template Import Wilayah Penangkapan",
-    description="Mengunduh template CSV untuk import data wilayah penangkapan",
-    responses={200: OpenApiTypes.BINARY}
+    description="""
+    Mengunduh template CSV (atau Excel dengan ?file_format=xlsx) untuk import data wilayah penangkapan.
+    Template dibuat sekali per proses dan dikirim dengan ETag; permintaan dengan If-None-Match
+    yang masih cocok dijawab 304 Not Modified tanpa isi.
+    """,
+    parameters=[TEMPLATE_FORMAT_PARAMETER],
+    responses={200: OpenApiTypes.BINARY, 304: None}
 )
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def download_import_template(request):
     """
-    Download CSV template for fishing area import
+    Download the CSV or XLSX template for fishing area import
     """
-    # Create sample data
-    template_data = [
-        ['name', 'code', 'description', 'coordinates'],
-        ['Perairan Utara', 'N001', 'Wilayah penangkapan di utara', '[[106.823, -6.234], [106.825, -6.232]]'],
-        ['Perairan Selatan', 'S001', 'Wilayah penangkapan di selatan', '[[106.820, -6.240], [106.822, -6.238]]'],
-        ['Perairan Timur', 'E001', 'Wilayah penangkapan di timur', '[[106.830, -6.230], [106.832, -6.228]]']
-    ]
-    
-    # Create CSV content
-    csv_buffer = io.StringIO()
-    for row in template_data:
-        csv_buffer.write(','.join(['"' + str(cell) + '"' for cell in row]) + '\n')
-    
-    # Create response
-    response = HttpResponse(csv_buffer.getvalue().encode('utf-8'), content_type='text/csv')  # type: ignore
-    response['Content-Disposition'] = 'attachment; filename="fishing_area_template.csv"'
+    return template_response(request, 'fishing_areas')
+
+@extend_schema(
+    summary="Ekspor Wilayah Penangkapan ke CSV",
+    description="""
+    Mengekspor seluruh wilayah penangkapan sebagai file CSV dengan kolom yang sama dengan template
+    import (name, code, description, coordinates), sehingga file dapat langsung diimpor kembali.
+    Data dikirim secara streaming per potongan (chunk) tanpa membangun objek model.
+    """,
+    responses={(200, 'text/csv'): OpenApiTypes.BINARY}
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_fishing_areas_csv(request):
+    """
+    Stream all fishing areas as a CSV file
+    """
+    return csv_export_response(FISHING_AREA_IMPORT_SPEC, FishingArea.objects.all(), 'fishing_areas.csv')  # type: ignore
+
+@extend_schema(
+    summary="Ekspor Wilayah Penangkapan ke Excel",
+    description="""
+    Mengekspor seluruh wilayah penangkapan sebagai file Excel (.xlsx) dengan kolom yang sama dengan
+    template import, sehingga file dapat langsung diimpor kembali. Workbook ditulis baris demi baris
+    dalam mode write-only dan disimpan ke file sementara, sehingga penggunaan memori tetap kecil.
+    """,
+    responses={(200, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'): OpenApiTypes.BINARY}
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_fishing_areas_xlsx(request):
+    """
+    Send all fishing areas as an XLSX workbook
+    """
+    return xlsx_export_response(FISHING_AREA_IMPORT_SPEC, FishingArea.objects.all(), 'fishing_areas.xlsx')  # type: ignore
+
+# Fields of each line of the NDJSON export, as in FishingAreaSerializer
+NDJSON_EXPORT_FIELDS = ['id', 'name', 'code', 'description', 'coordinates', 'created_at', 'updated_at']
+
+
+def _finite_number(text):
+    """A JSON number that is a finite float; NaN and Infinity (e.g. 1e999) are not valid JSON"""
+    number = float(text)
+    if not math.isfinite(number):
+        raise ValueError(f'Non-finite number: {text}')
+    return number
+
+
+def _reject_constant(text):
+    raise ValueError(f'Non-finite number: {text}')
+
+
+def parse_coordinates(value):
+    """
+    Stored coordinates as JSON (e.g. a list of [lon, lat] pairs).
+
+    Text that is not valid JSON is kept as it is, including text with NaN
+    or Infinity, which Python's json module would otherwise accept.
+    """
+    if value is None or not value.strip():
+        return None
+    try:
+        return json.loads(value, parse_float=_finite_number, parse_constant=_reject_constant)
+    except ValueError:
+        return value
+
+@extend_schema(
+    summary="Ekspor Wilayah Penangkapan ke NDJSON",
+    description="""
+    Mengekspor seluruh wilayah penangkapan sebagai NDJSON (application/x-ndjson): satu objek JSON
+    per baris dengan kolom yang sama seperti daftar wilayah penangkapan.
     
-    return response
\ No newline at end of file
+    Berbeda dengan daftar wilayah, coordinates sudah diurai di server menjadi array JSON
+    (teks yang bukan JSON dikirim apa adanya), sehingga klien peta tidak perlu mengurai ulang
+    setiap poligon. Data dikirim secara streaming per potongan (chunk), sehingga klien dapat
+    mulai merender wilayah pertama sebelum seluruh data terkirim dan memori server tidak
+    bertambah seiring jumlah wilayah.
+    """,
+    responses={(200, 'application/x-ndjson'): OpenApiTypes.BINARY}
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_fishing_areas_ndjson(request):
+    """
+    Stream all fishing areas as NDJSON with parsed coordinates
+    """
+    return ndjson_export_response(
+        FishingArea.objects.all(), NDJSON_EXPORT_FIELDS, 'fishing_areas.ndjson',  # type: ignore
+        converters={'coordinates': parse_coordinates}
+    )
@@ -6,6 +6,7 @@ from django.contrib.auth.models import Group, Permission
 from django.contrib.auth.decorators import permission_required
 from django.core.exceptions import ObjectDoesNotExist
 from users.models import User
+from fish_chain_optimization.pagination import KeysetPagination
 from .services import RoleManagementService
 from .serializers import (
     GroupSerializer, 
@@ -19,11 +20,12 @@ from .serializers import (
 @permission_classes([IsAuthenticated])
 def list_roles(request):
     """
-    List all roles (groups) in the system
+    List the roles (groups) in the system by name, one keyset page at a time
     """
-    roles = RoleManagementService.get_all_roles()
+    paginator = KeysetPagination(ordering='name')
+    roles = paginator.paginate_queryset(RoleManagementService.get_all_roles(), request)
     serializer = GroupSerializer(roles, many=True)
-    return Response(serializer.data)
+    return paginator.get_paginated_response(serializer.data)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -0,0 +1,57 @@
+from imports.specs import ImportSpec
+from imports.templates import ImportTemplate
+from .models import Ship
+
+# Fields written by the importer; reg_number is the natural key
+SHIP_IMPORT_FIELDS = ['name', 'length', 'width', 'gross_tonnage', 'year_built', 'home_port', 'active']
+
+# Accepted header spellings per column (case and spacing are ignored)
+SHIP_IMPORT_COLUMNS = {
+    'name': ['nama_kapal', 'nama'],
+    'reg_number': ['nomor_registrasi', 'no_registrasi', 'registration_number'],
+    'length': ['panjang'],
+    'width': ['lebar'],
+    'gross_tonnage': ['gross_tonase', 'gt'],
+    'year_built': ['tahun_dibuat', 'tahun_pembuatan'],
+    'home_port': ['pelabuhan_asal'],
+    'active': ['aktif'],
+}
+
+
+def summarize_ship_import(counts, dry_run):
+    """Response body of a ship import; rows repeating a reg_number of the file update that ship"""
+    created_count = counts['created']
+    duplicate_count = counts['duplicates'] + counts['repeated']
+    updated_count = duplicate_count + counts['updated'] + counts['unchanged']
+    if dry_run:
+        return {
+            'message': f'Dry run: {created_count} ships would be created ({updated_count} updated), nothing was saved',
+            'dry_run': True,
+            'created_count': created_count,
+            'updated_count': updated_count,
+            'duplicate_count': duplicate_count,
+        }
+    return {
+        'message': f'Successfully processed {created_count} ships ({updated_count} updated)',
+        'created_count': created_count,
+        'updated_count': updated_count,
+    }
+
+
+SHIP_IMPORT_SPEC = ImportSpec(
+    kind='ships',
+    model=Ship,
+    columns=SHIP_IMPORT_COLUMNS,
+    fields=SHIP_IMPORT_FIELDS,
+    key='reg_number',
+    required=['name', 'reg_number'],
+    summarize=summarize_ship_import,
+)
+
+
+# Sample rows of the downloadable template, in column order
+SHIP_IMPORT_TEMPLATE = ImportTemplate(SHIP_IMPORT_SPEC, 'ship_template', rows=[
+    ['MV Oceanic', 'SHIP001', 45.5, 8.2, 1200.5, 2010, 'Port of Jakarta', True],
+    ['MV Mariner', 'SHIP002', 38.0, 7.5, 850.0, 2015, 'Port of Surabaya', True],
+    ['MV Navigator', 'SHIP003', 52.3, 9.1, 1800.0, 2008, 'Port of Makassar', True],
+])
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ships', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ship',
+            name='import_digest',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ships', '0003_ship_ship_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ship',
+            index=models.Index(fields=['name', 'id'], name='ship_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ship',
+            index=models.Index(fields=['year_built', 'id'], name='ship_year_built_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ship',
+            index=models.Index(fields=['gross_tonnage', 'id'], name='ship_gross_tonnage_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ship',
+            index=models.Index(fields=['home_port', 'active'], name='ship_home_port_active_idx'),
+        ),
+    ]
@@ -1,7 +1,8 @@
 from django.db import models
+from imports.models import ImportDigestModel
 
 # Create your models here.
-class Ship(models.Model):
+class Ship(ImportDigestModel):
     """Model representing a fishing ship"""
     name = models.CharField(max_length=200, verbose_name="Nama Kapal")
     reg_number = models.CharField(max_length=100, unique=True, verbose_name="Nomor Registrasi")
@@ -19,4 +20,13 @@ class Ship(models.Model):
     
     class Meta:
         verbose_name = "Kapal"
-        verbose_name_plural = "Kapal"
\ No newline at end of file
+        verbose_name_plural = "Kapal"
+        indexes = [
+            # Keyset pagination of the ship list, per ordering of ShipFilterSerializer
+            models.Index(fields=['created_at', 'id'], name='ship_created_id_idx'),
+            models.Index(fields=['name', 'id'], name='ship_name_id_idx'),
+            models.Index(fields=['year_built', 'id'], name='ship_year_built_id_idx'),
+            models.Index(fields=['gross_tonnage', 'id'], name='ship_gross_tonnage_id_idx'),
+            # Port filter alone or with the active flag, which is too coarse to lead an index
+            models.Index(fields=['home_port', 'active'], name='ship_home_port_active_idx'),
+        ]
\ No newline at end of file
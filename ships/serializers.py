@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from fish_chain_optimization.fieldsets import SparseFieldsetSerializerMixin
 from .models import Ship
 
-class ShipSerializer(serializers.ModelSerializer):
+class ShipSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Serializer untuk informasi kapal.
     
@@ -9,7 +10,7 @@ class ShipSerializer(serializers.ModelSerializer):
     """
     class Meta:
         model = Ship
-        fields = '__all__'
+        exclude = ('import_digest',)
         read_only_fields = (
             'created_at', 
             'updated_at'
@@ -23,7 +24,7 @@ class ShipCreateSerializer(serializers.ModelSerializer):
     """
     class Meta:
         model = Ship
-        fields = '__all__'
+        exclude = ('import_digest',)
         read_only_fields = (
             'created_at', 
             'updated_at'
@@ -51,9 +52,47 @@ class ShipUpdateSerializer(serializers.ModelSerializer):
     """
     class Meta:
         model = Ship
-        fields = '__all__'
+        exclude = ('import_digest',)
         read_only_fields = (
             'created_at', 
             'updated_at', 
             'reg_number'
-        )  # Prevent changing reg_number
\ No newline at end of file
+        )  # Prevent changing reg_number
+
+
+class ShipFilterSerializer(serializers.Serializer):
+    """
+    Serializer untuk parameter filter dan urutan daftar kapal.
+    
+    Memvalidasi query parameter GET /api/ships/ sebelum diterapkan ke queryset;
+    setiap filter memakai indeks pada tabel kapal.
+    """
+    # Ordering fields clients may ask for; each has a (field, id) index for keyset pagination
+    ORDERING_FIELDS = ('created_at', 'name', 'year_built', 'gross_tonnage')
+
+    home_port = serializers.CharField(required=False, max_length=100)
+    active = serializers.BooleanField(required=False, allow_null=True, default=None)
+    year_built_min = serializers.IntegerField(required=False)
+    year_built_max = serializers.IntegerField(required=False)
+    gross_tonnage_min = serializers.DecimalField(required=False, max_digits=10, decimal_places=2)
+    gross_tonnage_max = serializers.DecimalField(required=False, max_digits=10, decimal_places=2)
+    name_prefix = serializers.CharField(required=False, max_length=200)
+    ordering = serializers.ChoiceField(
+        required=False,
+        choices=[prefix + field for field in ORDERING_FIELDS for prefix in ('', '-')]
+    )
+
+    def filter_queryset(self, queryset):
+        """Apply the validated filters to ``queryset``"""
+        data = self.validated_data
+        lookups = {
+            'home_port': 'home_port',
+            'active': 'active',
+            'year_built_min': 'year_built__gte',
+            'year_built_max': 'year_built__lte',
+            'gross_tonnage_min': 'gross_tonnage__gte',
+            'gross_tonnage_max': 'gross_tonnage__lte',
+            'name_prefix': 'name__startswith',
+        }
+        filters = {lookup: data[param] for param, lookup in lookups.items() if data.get(param) is not None}
+        return queryset.filter(**filters) if filters else queryset
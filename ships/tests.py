@@ -1,11 +1,15 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from openpyxl import Workbook
 import io
 import csv
 from .models import Ship
+from imports.testing import AuthenticatedClientMixin, TemporaryMediaRootMixin, csv_upload
 
 User = get_user_model()
 
@@ -80,9 +84,9 @@ class ShipAPITest(TestCase):
         self.client.force_authenticate(user=self.user)
         response = self.client.get('/api/ships/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)  # type: ignore
-        self.assertEqual(len(response.data), 1)  # type: ignore
+        self.assertEqual(len(response.data['results']), 1)  # type: ignore
 
-class ShipImportTest(TestCase):
+class ShipImportTest(TemporaryMediaRootMixin, TestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user(  # type: ignore
@@ -128,4 +132,351 @@ class ShipImportTest(TestCase):
         self.client.force_authenticate(user=self.user)
         response = self.client.post('/api/ships/import/', {'file': csv_file})
         self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)  # type: ignore
-        self.assertEqual(Ship.objects.count(), 0)  # type: ignore
\ No newline at end of file
+        self.assertEqual(Ship.objects.count(), 0)  # type: ignore
+
+class ShipBulkImportTest(AuthenticatedClientMixin, TemporaryMediaRootMixin, TestCase):
+    def _csv_file(self, rows, header=None):
+        header = header or ['name', 'reg_number', 'length', 'width', 'gross_tonnage', 'year_built', 'home_port', 'active']
+        return csv_upload('ships.csv', header, rows)
+        
+    def test_import_creates_and_updates_ships(self):
+        Ship.objects.create(name='Old Name', reg_number='TS001', home_port='Old Port')  # type: ignore
+        csv_file = self._csv_file([
+            ['Ship 1', 'TS001', '20.5', '5.2', '100.5', '2020', 'Port 1', 'True'],
+            ['Ship 2', 'TS002', '25.0', '6.5', '150.0', '2021', 'Port 2', 'False'],
+        ])
+        response = self.client.post('/api/ships/import/', {'file': csv_file})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)  # type: ignore
+        self.assertEqual(response.data['created_count'], 1)  # type: ignore
+        self.assertEqual(response.data['updated_count'], 1)  # type: ignore
+        ship = Ship.objects.get(reg_number='TS001')  # type: ignore
+        self.assertEqual(ship.name, 'Ship 1')
+        self.assertEqual(ship.home_port, 'Port 1')
+        self.assertFalse(Ship.objects.get(reg_number='TS002').active)  # type: ignore
+        
+    def test_import_skips_unchanged_ships(self):
+        ship = Ship.objects.create(  # type: ignore
+            name='Ship 1', reg_number='TS001', length=20.5, width=5.2,
+            gross_tonnage=100.5, year_built=2020, home_port='Port 1'
+        )
+        csv_file = self._csv_file([['Ship 1', 'TS001', '20.5', '5.2', '100.5', '2020', 'Port 1', 'True']])
+        response = self.client.post('/api/ships/import/', {'file': csv_file})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)  # type: ignore
+        self.assertEqual(response.data['updated_count'], 1)  # type: ignore
+        self.assertEqual(Ship.objects.get(pk=ship.pk).updated_at, ship.updated_at)  # type: ignore
+        
+    def test_import_reports_invalid_rows(self):
+        csv_file = self._csv_file([
+            ['Ship 1', 'TS001', '20.5', '5.2', '100.5', '2020', 'Port 1', 'True'],
+            ['Ship 2', 'TS002', '12345.0', '6.5', '150.0', '2021', 'Port 2', 'True'],
+        ])
+        response = self.client.post('/api/ships/import/', {'file': csv_file})
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)  # type: ignore
+        self.assertEqual(len(response.data['errors']), 1)  # type: ignore
+        self.assertTrue(response.data['errors'][0].startswith('Row 2: length'))  # type: ignore
+        self.assertEqual(Ship.objects.count(), 1)  # type: ignore
+        
+    def test_import_query_count_does_not_grow_with_rows(self):
+        def run(count, offset):
+            rows = [[f'Ship {i}', f'BULK{i:05d}', '20.5', '5.2', '100.5', '2020', 'Port', 'True'] for i in range(offset, offset + count)]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post('/api/ships/import/', {'file': self._csv_file(rows)})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)  # type: ignore
+            return len(queries)
+        
+        # One lookup plus a few insert batches, not one query per row
+        self.assertLess(run(5, 0), 10)
+        self.assertLess(run(500, 100), 20)
+        
+    @override_settings(IMPORT_CHUNK_SIZE=2)
+    def test_import_in_chunks_keeps_counts_and_errors(self):
+        csv_file = self._csv_file([
+            ['Ship 1', 'TS001', '20.5', '5.2', '100.5', '2020', 'Port 1', 'True'],
+            ['', 'TS002', '25.0', '6.5', '150.0', '2021', 'Port 2', 'True'],
+            ['Ship 3', 'TS003', '25.0', '6.5', '150.0', '2021', 'Port 3', 'True'],
+            ['Ship 1 Renamed', 'TS001', '20.5', '5.2', '100.5', '2020', 'Port 1', 'True'],
+            ['Ship 5', 'TS005', '25.0', '6.5', '150.0', '2021', 'Port 5', 'True'],
+        ])
+        response = self.client.post('/api/ships/import/', {'file': csv_file})
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)  # type: ignore
+        self.assertEqual(response.data['created_count'], 3)  # type: ignore
+        self.assertEqual(response.data['updated_count'], 1)  # type: ignore
+        self.assertEqual(response.data['errors'], ["Row 2: Missing required 'name' field"])  # type: ignore
+        self.assertEqual(Ship.objects.get(reg_number='TS001').name, 'Ship 1 Renamed')  # type: ignore
+        
+    def test_import_ships_xlsx(self):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['name', 'reg_number', 'length', 'year_built', 'active'])
+        sheet.append(['Ship 1', 'TS001', 20.5, 2020, True])
+        sheet.append(['Ship 2', 'TS002', None, None, False])
+        output = io.BytesIO()
+        workbook.save(output)
+        xlsx_file = SimpleUploadedFile("ships.xlsx", output.getvalue())
+        response = self.client.post('/api/ships/import/', {'file': xlsx_file})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)  # type: ignore
+        self.assertEqual(response.data['created_count'], 2)  # type: ignore
+        ship = Ship.objects.get(reg_number='TS002')  # type: ignore
+        self.assertIsNone(ship.length)
+        self.assertFalse(ship.active)
+        
+    def test_import_resolves_indonesian_headers_and_reports_bad_cells(self):
+        csv_file = self._csv_file(
+            [
+                ['KM Bahari', 'KB001', '20,5', '2020', 'Ya'],
+                ['KM Nusantara', 'KN001', '18.0', '2019', 'tidak'],
+            ],
+            header=['Nama Kapal', 'Nomor Registrasi', 'Panjang', 'Tahun Dibuat', 'AKTIF']
+        )
+        response = self.client.post('/api/ships/import/', {'file': csv_file})
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)  # type: ignore
+        self.assertEqual(response.data['errors'], ['Row 1: length: “20,5” value must be a decimal number.'])  # type: ignore
+        ship = Ship.objects.get(reg_number='KN001')  # type: ignore
+        self.assertEqual(ship.name, 'KM Nusantara')
+        self.assertEqual(ship.year_built, 2019)
+        self.assertFalse(ship.active)
+        
+    def test_reimport_of_unchanged_file_only_reads_digests(self):
+        rows = [[f'Ship {i}', f'TS{i:03d}', '20.5', '5.2', '100.5', '2020', 'Port 1', 'True'] for i in range(30)]
+        self.client.post('/api/ships/import/', {'file': self._csv_file(rows)})
+        self.assertTrue(all(Ship.objects.values_list('import_digest', flat=True)))  # type: ignore
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/ships/import/', {'file': self._csv_file(rows)})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)  # type: ignore
+        self.assertEqual(response.data['updated_count'], 30)  # type: ignore
+        self.assertFalse([q for q in queries if q['sql'].startswith(('INSERT', 'UPDATE'))])
+        selects = [q['sql'] for q in queries if q['sql'].startswith('SELECT') and 'ships_ship' in q['sql']]
+        self.assertEqual(len(selects), 1)
+        self.assertNotIn('"home_port"', selects[0])
+        
+    def test_ship_saved_outside_import_is_compared_again(self):
+        row = ['Ship 1', 'TS001', '20.5', '5.2', '100.5', '2020', 'Port 1', 'True']
+        self.client.post('/api/ships/import/', {'file': self._csv_file([row])})
+        ship = Ship.objects.get(reg_number='TS001')  # type: ignore
+        ship.home_port = 'Edited Port'
+        ship.save()
+        self.assertIsNone(ship.import_digest)
+        
+        self.client.post('/api/ships/import/', {'file': self._csv_file([row])})
+        ship.refresh_from_db()
+        self.assertEqual(ship.home_port, 'Port 1')
+        self.assertIsNotNone(ship.import_digest)
+        
+    def test_dry_run_reports_like_a_real_import_and_writes_nothing(self):
+        Ship.objects.create(name='Old Name', reg_number='TS001')  # type: ignore
+        rows = [
+            ['Ship 1', 'TS001', '20.5', '5.2', '100.5', '2020', 'Port 1', 'True'],
+            ['Ship 2', 'TS002', 'abc', '6.5', '150.0', '2021', 'Port 2', 'False'],
+            ['Ship 3', 'TS003', '25.0', '6.5', '150.0', '2021', 'Port 3', 'False'],
+            ['Ship 3b', 'TS003', '25.0', '6.5', '150.0', '2021', 'Port 3', 'False'],
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/ships/import/?dry_run=1', {'file': self._csv_file(rows)})
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)  # type: ignore
+        self.assertTrue(response.data['dry_run'])  # type: ignore
+        self.assertEqual(response.data['created_count'], 1)  # type: ignore
+        self.assertEqual(response.data['updated_count'], 2)  # type: ignore
+        self.assertEqual(response.data['duplicate_count'], 1)  # type: ignore
+        self.assertFalse([q for q in queries if q['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))])
+        self.assertEqual(Ship.objects.count(), 1)  # type: ignore
+        
+        dry_run_errors = response.data['errors']  # type: ignore
+        response = self.client.post('/api/ships/import/', {'file': self._csv_file(rows)})
+        self.assertEqual(response.data['errors'], dry_run_errors)  # type: ignore
+        self.assertEqual(response.data['created_count'], 1)  # type: ignore
+        self.assertEqual(response.data['updated_count'], 2)  # type: ignore
+        
+    @override_settings(IMPORT_CHUNK_SIZE=2)
+    def test_dry_run_counts_keys_repeated_across_chunks(self):
+        rows = [
+            ['Ship 1', 'TS001', '20.5', '', '', '', '', ''],
+            ['Ship 2', 'TS002', '20.5', '', '', '', '', ''],
+            ['Ship 1', 'TS001', '21.5', '', '', '', '', ''],
+        ]
+        response = self.client.post('/api/ships/import/?dry_run=true', {'file': self._csv_file(rows)})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)  # type: ignore
+        self.assertEqual(response.data['created_count'], 2)  # type: ignore
+        self.assertEqual(response.data['updated_count'], 1)  # type: ignore
+        self.assertEqual(response.data['duplicate_count'], 1)  # type: ignore
+        self.assertFalse(Ship.objects.exists())  # type: ignore
+        
+    @override_settings(IMPORT_ERROR_SAMPLE_SIZE=2, IMPORT_CHUNK_SIZE=2)
+    def test_rejected_rows_are_reported_as_downloadable_csv(self):
+        rows = [
+            ['Ship 1', 'TS001', 'abc', '', '', '', '', ''],
+            ['', 'TS002', '', '', '', '', '', ''],
+            ['Ship 3', 'TS003', '', '', '', '', '', ''],
+            ['Ship 4', 'TS004', '', '', '', 'soon', '', ''],
+        ]
+        response = self.client.post('/api/ships/import/', {'file': self._csv_file(rows)})
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)  # type: ignore
+        self.assertEqual(response.data['error_count'], 3)  # type: ignore
+        self.assertEqual(response.data['errors'], [  # type: ignore
+            'Row 1: length: “abc” value must be a decimal number.',
+            "Row 2: Missing required 'name' field",
+        ])
+        
+        download = self.client.get(response.data['rejected_rows_url'])  # type: ignore
+        self.assertEqual(download.status_code, status.HTTP_200_OK)  # type: ignore
+        report = list(csv.reader(io.StringIO(b''.join(download.streaming_content).decode('utf-8'))))  # type: ignore
+        self.assertEqual(report[0][:4], ['row', 'column', 'reason', 'name'])
+        self.assertEqual(report[1][:5], ['1', 'length', 'length: “abc” value must be a decimal number.', 'Ship 1', 'TS001'])
+        self.assertEqual(report[2][:3], ['2', 'name', "Missing required 'name' field"])
+        self.assertEqual(report[3][:2], ['4', 'year_built'])
+        self.assertEqual(report[3][8], 'soon')
+        self.assertEqual(len(report), 4)
+        
+    def test_rejected_rows_report_is_only_served_to_its_owner_and_staff(self):
+        response = self.client.post('/api/ships/import/', {'file': self._csv_file([['Ship 1', 'TS001', 'abc', '', '', '', '', '']])})
+        url = response.data['rejected_rows_url']  # type: ignore
+        
+        other = APIClient()
+        other.force_authenticate(user=User.objects.create_user(username='other', password='testpass123'))  # type: ignore
+        self.assertEqual(other.get(url).status_code, status.HTTP_404_NOT_FOUND)  # type: ignore
+        
+        staff = APIClient()
+        staff.force_authenticate(user=User.objects.create_user(username='staff', password='testpass123', is_staff=True))  # type: ignore
+        self.assertEqual(staff.get(url).status_code, status.HTTP_200_OK)  # type: ignore
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)  # type: ignore
+        
+    def test_import_without_errors_has_no_rejected_rows_report(self):
+        response = self.client.post('/api/ships/import/', {'file': self._csv_file([['Ship 1', 'TS001', '', '', '', '', '', '']])})
+        self.assertEqual(response.data['error_count'], 0)  # type: ignore
+        self.assertIsNone(response.data['rejected_rows_url'])  # type: ignore
+
+
+class ShipPaginationTest(AuthenticatedClientMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for number in range(7):
+            Ship.objects.create(name=f'KM {number}', reg_number=f'R{number}')  # type: ignore
+        # Same created_at for some ships, so the id has to break the tie
+        Ship.objects.filter(reg_number__in=['R2', 'R3', 'R4']).update(  # type: ignore
+            created_at=Ship.objects.get(reg_number='R2').created_at  # type: ignore
+        )
+
+    def _reg_numbers(self, response):
+        return [ship['reg_number'] for ship in response.data['results']]  # type: ignore
+
+    def test_pages_follow_next_and_previous_cursors(self):
+        response = self.client.get('/api/ships/', {'page_size': 3})
+        self.assertEqual(self._reg_numbers(response), ['R0', 'R1', 'R2'])
+        self.assertIsNone(response.data['previous'])  # type: ignore
+        self.assertNotIn('count', response.data)  # type: ignore
+
+        response = self.client.get(response.data['next'])  # type: ignore
+        self.assertEqual(self._reg_numbers(response), ['R3', 'R4', 'R5'])
+        second_page = response
+
+        response = self.client.get(response.data['next'])  # type: ignore
+        self.assertEqual(self._reg_numbers(response), ['R6'])
+        self.assertIsNone(response.data['next'])  # type: ignore
+
+        response = self.client.get(second_page.data['previous'])  # type: ignore
+        self.assertEqual(self._reg_numbers(response), ['R0', 'R1', 'R2'])
+        self.assertIsNone(response.data['previous'])  # type: ignore
+
+    def test_page_reads_one_query_without_count(self):
+        first = self.client.get('/api/ships/', {'page_size': 2})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(first.data['next'])  # type: ignore
+        self.assertEqual(self._reg_numbers(response), ['R2', 'R3'])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('COUNT', queries[0]['sql'].upper())
+        self.assertNotIn('OFFSET', queries[0]['sql'].upper())
+
+    def test_count_is_opt_in(self):
+        response = self.client.get('/api/ships/', {'count': 1})
+        self.assertEqual(response.data['count'], 7)  # type: ignore
+
+    @override_settings(API_MAX_PAGE_SIZE=4)
+    def test_page_size_is_capped(self):
+        response = self.client.get('/api/ships/', {'page_size': 100})
+        self.assertEqual(len(response.data['results']), 4)  # type: ignore
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get('/api/ships/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)  # type: ignore
+
+
+class ShipFilterTest(AuthenticatedClientMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        ships = [
+            ('KM Bahari', 'R1', 'Bitung', True, 2001, '30.00'),
+            ('KM Bintang', 'R2', 'Bitung', False, 2010, '55.50'),
+            ('KM Camar', 'R3', 'Ambon', True, 2015, '120.00'),
+            ('MV Dewi', 'R4', 'Bitung', True, None, None),
+        ]
+        for name, reg_number, home_port, active, year_built, gross_tonnage in ships:
+            Ship.objects.create(  # type: ignore
+                name=name, reg_number=reg_number, home_port=home_port, active=active,
+                year_built=year_built, gross_tonnage=gross_tonnage
+            )
+
+    def _reg_numbers(self, params):
+        response = self.client.get('/api/ships/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)  # type: ignore
+        return [ship['reg_number'] for ship in response.data['results']]  # type: ignore
+
+    def test_filters(self):
+        self.assertEqual(self._reg_numbers({'home_port': 'Bitung'}), ['R1', 'R2', 'R4'])
+        self.assertEqual(self._reg_numbers({'home_port': 'Bitung', 'active': 'false'}), ['R2'])
+        self.assertEqual(self._reg_numbers({'year_built_min': 2005, 'year_built_max': 2015}), ['R2', 'R3'])
+        self.assertEqual(self._reg_numbers({'gross_tonnage_max': '55.5'}), ['R1', 'R2'])
+        self.assertEqual(self._reg_numbers({'name_prefix': 'KM B'}), ['R1', 'R2'])
+
+    def test_ordering_with_nulls_last_across_pages(self):
+        self.assertEqual(self._reg_numbers({'ordering': '-year_built'}), ['R3', 'R2', 'R1', 'R4'])
+        first = self.client.get('/api/ships/', {'ordering': '-gross_tonnage', 'page_size': 2})
+        self.assertEqual([ship['reg_number'] for ship in first.data['results']], ['R3', 'R2'])  # type: ignore
+        second = self.client.get(first.data['next'])  # type: ignore
+        self.assertEqual([ship['reg_number'] for ship in second.data['results']], ['R1', 'R4'])  # type: ignore
+
+    def test_invalid_filter_or_ordering_is_rejected(self):
+        response = self.client.get('/api/ships/', {'ordering': 'reg_number'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)  # type: ignore
+        self.assertIn('ordering', response.data)  # type: ignore
+        response = self.client.get('/api/ships/', {'year_built_min': 'old'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)  # type: ignore
+
+    def test_filters_use_indexes(self):
+        plan = Ship.objects.filter(home_port='Bitung', active=True).explain()  # type: ignore
+        self.assertIn('ship_home_port_active_idx', plan)
+        plan = Ship.objects.filter(year_built__gte=2005).order_by('year_built', 'id').explain()  # type: ignore
+        self.assertIn('ship_year_built_id_idx', plan)
+
+
+
+class ShipSparseFieldsetTest(AuthenticatedClientMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            Ship.objects.create(name=f'Ship {i}', reg_number=f'REG{i:03d}', home_port='Bitung')  # type: ignore
+
+    def test_list_returns_and_selects_only_requested_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/ships/', {'fields': 'id,name', 'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)  # type: ignore
+        self.assertEqual([set(ship) for ship in response.data['results']], [{'id', 'name'}] * 2)  # type: ignore
+        select = [q['sql'] for q in queries if 'FROM "ships_ship"' in q['sql']]
+        self.assertEqual(len(select), 1)
+        self.assertNotIn('"home_port"', select[0])
+        # The ordering field is still loaded, so the cursor links work
+        second = self.client.get(response.data['next'])  # type: ignore
+        self.assertEqual([ship['name'] for ship in second.data['results']], ['Ship 2'])  # type: ignore
+
+    def test_detail_with_fields(self):
+        ship = Ship.objects.get(reg_number='REG001')  # type: ignore
+        response = self.client.get(f'/api/ships/{ship.id}/', {'fields': 'reg_number'})
+        self.assertEqual(response.data, {'reg_number': 'REG001'})  # type: ignore
+
+    def test_without_fields_the_response_is_unchanged(self):
+        response = self.client.get('/api/ships/')
+        self.assertIn('home_port', response.data['results'][0])  # type: ignore
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get('/api/ships/', {'fields': 'id,owner'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)  # type: ignore
+        self.assertIn('fields', response.data)  # type: ignore
@@ -8,4 +8,6 @@ urlpatterns = [
     path('<int:pk>/', views.ShipRetrieveUpdateDestroyView.as_view(), name='ship-detail'),
     path('import/', views.ShipImportView.as_view(), name='ship-import'),
     path('template/', views.download_ship_template, name='ship-template'),
+    path('export.csv', views.export_ships_csv, name='ship-export-csv'),
+    path('export.xlsx', views.export_ships_xlsx, name='ship-export-xlsx'),
 ]
\ No newline at end of file
@@ -4,16 +4,19 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.views import APIView
 from rest_framework.decorators import api_view, permission_classes
-from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
-import pandas as pd
-import io
-from django.db import transaction
+from fish_chain_optimization.fieldsets import FIELDS_PARAMETER, SparseFieldsetViewMixin
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
-from django.http import HttpResponse
 from .models import Ship
-from .serializers import ShipSerializer, ShipCreateSerializer, ShipUpdateSerializer
+from .serializers import ShipSerializer, ShipCreateSerializer, ShipUpdateSerializer, ShipFilterSerializer
+from .importers import SHIP_IMPORT_SPEC
+from imports.views import csv_export_response, import_file_response, template_response, xlsx_export_response
+from imports.schema import (
+    ASYNC_IMPORT_PARAMETER, COMMIT_MODE_PARAMETER, DRY_RUN_PARAMETER, IMPORT_JOB_ACCEPTED_RESPONSE,
+    TEMPLATE_FORMAT_PARAMETER
+)
 
 @extend_schema(
     summary="Daftar dan Buat Kapal",
@@ -21,7 +24,15 @@ from .serializers import ShipSerializer, ShipCreateSerializer, ShipUpdateSeriali
     Endpoint ini digunakan untuk mendapatkan daftar semua kapal atau membuat kapal baru.
     
     Metode GET:
-    - Mengembalikan daftar semua kapal dalam sistem
+    - Mengembalikan daftar kapal dalam sistem, diurutkan menurut waktu dibuat
+    - Hasil dibagi per halaman dengan pagination kursor (keyset): respons berisi next, previous, dan results;
+      ikuti tautan next untuk halaman berikutnya, ?page_size mengatur jumlah data per halaman (maksimal
+      API_MAX_PAGE_SIZE), dan ?count=1 menambahkan jumlah seluruh data
+    - Filter (semuanya memakai indeks): home_port (sama persis), active (true/false),
+      year_built_min/year_built_max, gross_tonnage_min/gross_tonnage_max (rentang inklusif),
+      name_prefix (awalan nama kapal)
+    - Urutan dengan ?ordering=created_at, name, year_built, atau gross_tonnage (awali dengan - untuk
+      urutan menurun); nilai filter atau urutan yang tidak valid dijawab 400
     
     Metode POST:
     - Membuat kapal baru dengan data yang diberikan
@@ -50,21 +61,37 @@ from .serializers import ShipSerializer, ShipCreateSerializer, ShipUpdateSeriali
         }
     }
 )
-class ShipListCreateView(generics.ListCreateAPIView):
+class ShipListCreateView(SparseFieldsetViewMixin, generics.ListCreateAPIView):
     queryset = Ship.objects.all()  # type: ignore
     permission_classes = [IsAuthenticated]
+    keyset_ordering = 'created_at'
     
     def get_serializer_class(self):  # type: ignore
         if self.request.method == 'POST':
             return ShipCreateSerializer
         return ShipSerializer
     
+    def get_queryset(self):  # type: ignore
+        queryset = super().get_queryset()
+        if self.request.method != 'GET':
+            return queryset
+        # Filters and ordering come from validated query parameters; invalid values answer 400
+        params = ShipFilterSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        self.keyset_ordering = params.validated_data.get('ordering') or 'created_at'
+        return params.filter_queryset(queryset)
+    
+    @extend_schema(parameters=[ShipFilterSerializer, FIELDS_PARAMETER])
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+@extend_schema_view(get=extend_schema(parameters=[FIELDS_PARAMETER]))
 @extend_schema(
     summary="Detail, Update, dan Hapus Kapal",
     description="""
@@ -98,7 +125,7 @@ class ShipListCreateView(generics.ListCreateAPIView):
         }
     }
 )
-class ShipRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class ShipRetrieveUpdateDestroyView(SparseFieldsetViewMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Ship.objects.all()  # type: ignore
     serializer_class = ShipSerializer
     permission_classes = [IsAuthenticated]
@@ -117,39 +144,68 @@ class ShipRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     
     File yang diunduh:
     - ship_template.csv: Template CSV dengan kolom yang diperlukan dan opsional
+    - ship_template.xlsx: Template yang sama dalam format Excel (?file_format=xlsx)
+    
+    Template dibuat sekali per proses dan dikirim dengan ETag; permintaan dengan If-None-Match
+    yang masih cocok dijawab 304 Not Modified tanpa isi.
     """,
+    parameters=[TEMPLATE_FORMAT_PARAMETER],
     responses={
-        (200, 'text/csv'): OpenApiTypes.BINARY
+        (200, 'text/csv'): OpenApiTypes.BINARY,
+        (200, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'): OpenApiTypes.BINARY,
+        304: None
     }
 )
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def download_ship_template(request):
-    """Download CSV template for ship import"""
-    # Create a DataFrame with template data
-    template_data = {
-        'name': ['MV Oceanic', 'MV Mariner', 'MV Navigator'],
-        'reg_number': ['SHIP001', 'SHIP002', 'SHIP003'],
-        'length': [45.5, 38.0, 52.3],
-        'width': [8.2, 7.5, 9.1],
-        'gross_tonnage': [1200.5, 850.0, 1800.0],
-        'year_built': [2010, 2015, 2008],
-        'home_port': ['Port of Jakarta', 'Port of Surabaya', 'Port of Makassar'],
-        'active': [True, True, True]
-    }
+    """Download the CSV or XLSX template for ship import"""
+    return template_response(request, 'ships')
+
+@extend_schema(
+    summary="Ekspor Data Kapal ke CSV",
+    description="""
+    Endpoint ini digunakan untuk mengekspor seluruh data kapal sebagai file CSV.
     
-    df = pd.DataFrame(template_data)
+    Kolom file sama dengan template impor, sehingga file hasil ekspor dapat langsung diimpor kembali.
+    Data dikirim secara streaming per potongan (chunk) tanpa membangun objek model, sehingga
+    byte pertama langsung terkirim dan penggunaan memori tetap kecil berapa pun jumlah kapal.
     
-    # Create CSV response
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="ship_template.csv"'
+    File yang diunduh:
+    - ships.csv
+    """,
+    responses={
+        (200, 'text/csv'): OpenApiTypes.BINARY
+    }
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_ships_csv(request):
+    """Stream all ships as a CSV file"""
+    return csv_export_response(SHIP_IMPORT_SPEC, Ship.objects.all(), 'ships.csv')  # type: ignore
+
+@extend_schema(
+    summary="Ekspor Data Kapal ke Excel",
+    description="""
+    Endpoint ini digunakan untuk mengekspor seluruh data kapal sebagai file Excel (.xlsx).
     
-    # Write DataFrame to response
-    csv_buffer = io.StringIO()
-    df.to_csv(csv_buffer, index=False)
-    response.write(csv_buffer.getvalue())
+    Kolom file sama dengan template impor, sehingga file hasil ekspor dapat langsung diimpor kembali
+    (juga melalui impor workbook, karena sheet diberi nama sesuai jenis impor).
+    Workbook ditulis baris demi baris dalam mode write-only dan disimpan ke file sementara,
+    sehingga penggunaan memori tetap kecil berapa pun jumlah kapal.
     
-    return response
+    File yang diunduh:
+    - ships.xlsx
+    """,
+    responses={
+        (200, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'): OpenApiTypes.BINARY
+    }
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_ships_xlsx(request):
+    """Send all ships as an XLSX workbook"""
+    return xlsx_export_response(SHIP_IMPORT_SPEC, Ship.objects.all(), 'ships.xlsx')  # type: ignore
 
 @extend_schema(
     summary="Impor Data Kapal dari File",
@@ -158,7 +214,8 @@ def download_ship_template(request):
     Endpoint ini mendukung impor massal dengan fitur update otomatis untuk kapal yang sudah ada.
     
     Format file yang didukung:
-    - CSV (.csv)
+    - CSV (.csv), juga terkompresi gzip (.csv.gz)
+    - Arsip ZIP (.zip) berisi beberapa file CSV
     - Excel (.xlsx, .xls)
     
     Kolom yang diperlukan:
@@ -175,9 +232,19 @@ def download_ship_template(request):
     
     Fitur:
     - Jika kapal dengan reg_number yang sama sudah ada, data akan diperbarui
-    - Transaksi atomik (semua berhasil atau semua gagal)
-    - Laporan error per baris
+    - Kapal baru dan kapal yang berubah ditulis secara massal per batch
+    - Kapal yang tidak berubah sejak impor terakhir dilewati berdasarkan digest isi baris, tanpa dibaca maupun ditulis ulang
+    - File dibaca dan diproses per potongan (chunk) sehingga penggunaan memori tetap kecil
+    - File CSV sudah diproses selagi masih diunggah; unggahan yang melebihi batas ukuran (IMPORT_MAX_UPLOAD_SIZE) langsung ditolak dengan status 413
+    - File .csv.gz didekompresi selagi dibaca; file CSV dalam arsip ZIP diurai secara paralel lalu diterapkan berurutan, dengan hasil per file pada kolom files
+    - Nama kolom dikenali tanpa memperhatikan huruf besar/kecil dan spasi, termasuk alias bahasa Indonesia
+    - Nilai angka/boolean yang tidak valid dilaporkan per baris
+    - Transaksi atomik (semua berhasil atau semua gagal); dengan ?commit=chunk setiap potongan di-commit sendiri bersama checkpoint sehingga impor yang gagal dapat dilanjutkan (/api/imports/jobs/<job_id>/resume/)
+    - Dengan ?dry_run=1 file hanya divalidasi (termasuk pengecekan ke database) tanpa menyimpan apa pun; laporan error sama dengan impor sebenarnya
+    - Dengan ?async=1 file diproses di latar belakang oleh worker impor (202 + job_id); progres dipantau di /api/imports/jobs/<job_id>/
+    - Laporan error per baris: respons memuat jumlah error (error_count) dan contoh error pertama; semua baris yang ditolak (baris asli, kolom, alasan) dapat diunduh sebagai CSV dari rejected_rows_url
     """,
+    parameters=[ASYNC_IMPORT_PARAMETER, DRY_RUN_PARAMETER, COMMIT_MODE_PARAMETER],
     request={
         'multipart/form-data': {
             'type': 'object',
@@ -190,12 +257,15 @@ def download_ship_template(request):
         }
     },
     responses={
+        202: IMPORT_JOB_ACCEPTED_RESPONSE,
         201: {
             'type': 'object',
             'properties': {
                 'message': {'type': 'string'},
                 'created_count': {'type': 'integer'},
                 'updated_count': {'type': 'integer'},
+                'error_count': {'type': 'integer'},
+                'rejected_rows_url': {'type': 'string', 'nullable': True},
                 'errors': {
                     'type': 'array',
                     'items': {'type': 'string'}
@@ -208,6 +278,8 @@ def download_ship_template(request):
                 'message': {'type': 'string'},
                 'created_count': {'type': 'integer'},
                 'updated_count': {'type': 'integer'},
+                'error_count': {'type': 'integer'},
+                'rejected_rows_url': {'type': 'string', 'nullable': True},
                 'errors': {
                     'type': 'array',
                     'items': {'type': 'string'}
@@ -228,125 +300,5 @@ class ShipImportView(APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser)
     
-    @transaction.atomic
     def post(self, request):
-        file = request.FILES.get('file')
-        if not file:
-            return Response(
-                {'error': 'No file provided'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-            
-        try:
-            # Check file extension
-            if file.name.endswith('.csv'):
-                df = pd.read_csv(file)
-            elif file.name.endswith(('.xlsx', '.xls')):
-                df = pd.read_excel(file)
-            else:
-                return Response(
-                    {'error': 'Unsupported file format. Please upload CSV or Excel file.'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Process the data
-            created_count = 0
-            updated_count = 0
-            errors = []
-            
-            for index, row in df.iterrows():
-                try:
-                    # Extract data from row
-                    name = row.get('name') or row.get('Name') or row.get('nama_kapal') or row.get('Nama Kapal')
-                    reg_number = row.get('reg_number') or row.get('Reg Number') or row.get('nomor_registrasi') or row.get('Nomor Registrasi')
-                    length = row.get('length') or row.get('Length') or row.get('panjang')
-                    width = row.get('width') or row.get('Width') or row.get('lebar')
-                    gross_tonnage = row.get('gross_tonnage') or row.get('Gross Tonnage') or row.get('gross_tonase')
-                    year_built = row.get('year_built') or row.get('Year Built') or row.get('tahun_dibuat')
-                    home_port = row.get('home_port') or row.get('Home Port') or row.get('pelabuhan_asal') or row.get('Pelabuhan Asal')
-                    active = row.get('active', True)  # Default to True if not specified
-                    
-                    # Validate required fields
-                    if not name:
-                        errors.append(f"Row {int(index) + 1}: Missing required 'name' field")  # type: ignore
-                        continue
-                        
-                    if not reg_number:
-                        errors.append(f"Row {int(index) + 1}: Missing required 'reg_number' field")  # type: ignore
-                        continue
-                    
-                    # Convert data types if needed
-                    if length is not None:
-                        try:
-                            length = float(length)
-                        except (ValueError, TypeError):
-                            length = None
-                            
-                    if width is not None:
-                        try:
-                            width = float(width)
-                        except (ValueError, TypeError):
-                            width = None
-                            
-                    if gross_tonnage is not None:
-                        try:
-                            gross_tonnage = float(gross_tonnage)
-                        except (ValueError, TypeError):
-                            gross_tonnage = None
-                            
-                    if year_built is not None:
-                        try:
-                            year_built = int(year_built)
-                        except (ValueError, TypeError):
-                            year_built = None
-                    
-                    # Create or update Ship
-                    ship, created = Ship.objects.get_or_create(  # type: ignore
-                        reg_number=reg_number,
-                        defaults={
-                            'name': name,
-                            'length': length,
-                            'width': width,
-                            'gross_tonnage': gross_tonnage,
-                            'year_built': year_built,
-                            'home_port': home_port,
-                            'active': active
-                        }
-                    )
-                    
-                    # If ship already exists, update it
-                    if not created:
-                        ship.name = name
-                        ship.length = length
-                        ship.width = width
-                        ship.gross_tonnage = gross_tonnage
-                        ship.year_built = year_built
-                        ship.home_port = home_port
-                        ship.active = active
-                        ship.save()
-                        updated_count += 1
-                    else:
-                        created_count += 1
-                    
-                except Exception as e:
-                    errors.append(f"Row {int(index) + 1}: {str(e)}")  # type: ignore
-            
-            # Prepare response
-            response_data = {
-                'message': f'Successfully processed {created_count} ships ({updated_count} updated)',
-                'created_count': created_count,
-                'updated_count': updated_count,
-                'errors': errors
-            }
-            
-            if errors:
-                response_data['warning'] = 'Some rows had errors during import'
-                return Response(response_data, status=status.HTTP_206_PARTIAL_CONTENT)
-            else:
-                return Response(response_data, status=status.HTTP_201_CREATED)
-                
-        except Exception as e:
-            return Response(
-                {'error': f'Failed to process file: {str(e)}'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
\ No newline at end of file
+        return import_file_response(request, SHIP_IMPORT_SPEC)